@@ -0,0 +1,361 @@
+-- =====================================================
+-- WORLDPAV - KPIs DOS DASHBOARDS NO SERVIDOR
+-- =====================================================
+-- Os dashboards baixavam as linhas de obras_ruas, despesas, contas a
+-- pagar, licenças, seguros etc. só para somar e contar no navegador:
+-- o payload crescia com o histórico. Estas funções devolvem os KPIs já
+-- agregados, em uma única chamada RPC por dashboard:
+--
+--   supabase.rpc('dashboard_pavimentacao_kpis', { p_hoje, p_mes_inicio, p_mes_fim })
+--   supabase.rpc('dashboard_kpis', { p_hoje, p_semana_inicio, p_semana_fim, p_mes_inicio, p_mes_fim })
+--
+-- As datas vêm do cliente (horário de São Paulo), como nas consultas
+-- que estas funções substituem. As funções rodam com as permissões de
+-- quem chama (SECURITY INVOKER): o RLS continua valendo como antes.
+--
+-- Cada bloco de alerta/indicador é isolado com EXCEPTION, como os
+-- try/catch do cliente: se uma tabela ou coluna não existir nesta
+-- instalação, aquele indicador fica de fora (ou zerado) e o resto da
+-- chamada continua valendo.
+--
+-- DEPENDÊNCIAS: 02_obras.sql, 03_obras_financeiro.sql, 06_maquinarios.sql,
+--               07_programacao_pavimentacao.sql, 11_contas_pagar.sql
+-- =====================================================
+
+-- =====================================================
+-- 1. FUNCTION AUXILIAR: DASHBOARD_ALERTA
+-- =====================================================
+-- Alerta no formato do cliente (tipo Alerta), como array de 0 ou 1 item
+
+CREATE OR REPLACE FUNCTION public.dashboard_alerta(
+  p_tipo TEXT,
+  p_mensagem TEXT,
+  p_urgencia TEXT,
+  p_quantidade BIGINT
+)
+RETURNS JSONB AS $$
+  SELECT CASE
+    WHEN COALESCE(p_quantidade, 0) > 0 THEN jsonb_build_array(jsonb_build_object(
+      'tipo', p_tipo,
+      'mensagem', p_mensagem,
+      'urgencia', p_urgencia,
+      'quantidade', p_quantidade
+    ))
+    ELSE '[]'::jsonb
+  END;
+$$ LANGUAGE sql IMMUTABLE;
+
+COMMENT ON FUNCTION public.dashboard_alerta(TEXT, TEXT, TEXT, BIGINT)
+  IS 'Monta um alerta do dashboard (array vazio quando a quantidade é zero)';
+
+-- =====================================================
+-- 2. FUNCTION: DASHBOARD_PAVIMENTACAO_KPIS
+-- =====================================================
+-- KPIs e alertas do Dashboard de Pavimentação
+-- Retorna { "kpis": DashboardKPIs, "alertas": Alerta[] }
+
+CREATE OR REPLACE FUNCTION public.dashboard_pavimentacao_kpis(
+  p_hoje DATE,
+  p_mes_inicio DATE,
+  p_mes_fim DATE
+)
+RETURNS JSONB AS $$
+DECLARE
+  v_amanha DATE := p_hoje + 1;
+  v_7_dias DATE := p_hoje + 7;
+  v_30_dias DATE := p_hoje + 30;
+  v_kpis JSONB;
+  v_alertas JSONB := '[]'::jsonb;
+  v_vencidos BIGINT;
+  v_proximos BIGINT;
+  v_contas BIGINT := 0;
+BEGIN
+  -- Programações de hoje e amanhã
+  BEGIN
+    SELECT jsonb_build_object(
+      'programacao_hoje', COUNT(*) FILTER (WHERE date = p_hoje),
+      'programacao_amanha', COUNT(*) FILTER (WHERE date = v_amanha)
+    ) INTO v_kpis
+    FROM public.programacao_pavimentacao
+    WHERE date IN (p_hoje, v_amanha)
+      AND status = 'programado';
+  EXCEPTION WHEN undefined_column OR undefined_table THEN
+    v_kpis := jsonb_build_object('programacao_hoje', 0, 'programacao_amanha', 0);
+  END;
+
+  -- Ruas finalizadas no mês: faturamento, metragem e toneladas em uma varredura
+  BEGIN
+    SELECT v_kpis || jsonb_build_object(
+      'faturamento_mes', COALESCE(SUM(valor_total), 0),
+      'metragem_mes', COALESCE(SUM(metragem_executada), 0),
+      'toneladas_mes', COALESCE(SUM(toneladas_utilizadas), 0)
+    ) INTO v_kpis
+    FROM public.obras_ruas
+    WHERE status = 'concluida'
+      AND deleted_at IS NULL
+      AND created_at >= p_mes_inicio
+      AND created_at <= p_mes_fim;
+  EXCEPTION WHEN undefined_column OR undefined_table THEN
+    v_kpis := v_kpis || jsonb_build_object('faturamento_mes', 0, 'metragem_mes', 0, 'toneladas_mes', 0);
+  END;
+
+  -- Despesas do mês
+  BEGIN
+    SELECT v_kpis || jsonb_build_object('despesas_mes', COALESCE(SUM(valor), 0)) INTO v_kpis
+    FROM public.obras_financeiro_despesas
+    WHERE data_despesa >= p_mes_inicio
+      AND data_despesa <= p_mes_fim;
+  EXCEPTION WHEN undefined_column OR undefined_table THEN
+    v_kpis := v_kpis || jsonb_build_object('despesas_mes', 0);
+  END;
+
+  -- Alertas, na mesma ordem do cliente
+
+  -- 1. Manutenções vencidas e próximas (30 dias)
+  BEGIN
+    SELECT
+      COUNT(*) FILTER (WHERE data_proxima_manutencao < p_hoje),
+      COUNT(*) FILTER (WHERE data_proxima_manutencao BETWEEN p_hoje AND v_30_dias)
+    INTO v_vencidos, v_proximos
+    FROM public.maquinarios
+    WHERE status <> 'inativo';
+
+    v_alertas := v_alertas
+      || public.dashboard_alerta('manutencao', 'Manutenções VENCIDAS', 'alta', v_vencidos)
+      || public.dashboard_alerta('manutencao', 'Manutenções vencem em 30 dias', 'media', v_proximos);
+  EXCEPTION WHEN undefined_column OR undefined_table THEN
+    NULL;
+  END;
+
+  -- 2 e 3. Contas atrasadas e contas pendentes a vencer em 7 dias
+  BEGIN
+    SELECT
+      COUNT(*) FILTER (WHERE status IN ('pendente', 'atrasado') AND due_date < p_hoje),
+      COUNT(*) FILTER (WHERE status = 'pendente' AND due_date BETWEEN p_hoje AND v_7_dias)
+    INTO v_vencidos, v_proximos
+    FROM public.contas_pagar;
+
+    v_alertas := v_alertas
+      || public.dashboard_alerta('conta', 'Contas atrasadas', 'alta', v_vencidos)
+      || public.dashboard_alerta('conta', 'Contas vencem em 7 dias', 'media', v_proximos);
+    v_contas := v_vencidos + v_proximos;
+  EXCEPTION WHEN undefined_column OR undefined_table THEN
+    NULL;
+  END;
+
+  -- 4. Todas as contas pendentes (só sem alertas específicos de vencimento)
+  IF v_contas = 0 THEN
+    BEGIN
+      SELECT COUNT(*) INTO v_vencidos
+      FROM public.contas_pagar
+      WHERE status IN ('pendente', 'atrasado');
+
+      v_alertas := v_alertas || public.dashboard_alerta('conta', 'Contas pendentes', 'media', v_vencidos);
+    EXCEPTION WHEN undefined_column OR undefined_table THEN
+      NULL;
+    END;
+  END IF;
+
+  -- 5 e 6. Licenças de maquinários
+  BEGIN
+    SELECT
+      COUNT(*) FILTER (WHERE validade < p_hoje),
+      COUNT(*) FILTER (WHERE validade BETWEEN p_hoje AND v_30_dias)
+    INTO v_vencidos, v_proximos
+    FROM public.maquinarios_licencas;
+
+    v_alertas := v_alertas
+      || public.dashboard_alerta('licenca', 'Licenças VENCIDAS', 'alta', v_vencidos)
+      || public.dashboard_alerta('licenca', 'Licenças vencem em 30 dias', 'media', v_proximos);
+  EXCEPTION WHEN undefined_column OR undefined_table THEN
+    NULL;
+  END;
+
+  -- 7 e 8. Seguros de maquinários
+  BEGIN
+    SELECT
+      COUNT(*) FILTER (WHERE validade < p_hoje),
+      COUNT(*) FILTER (WHERE validade BETWEEN p_hoje AND v_30_dias)
+    INTO v_vencidos, v_proximos
+    FROM public.maquinarios_seguros;
+
+    v_alertas := v_alertas
+      || public.dashboard_alerta('documento', 'Seguros VENCIDOS', 'alta', v_vencidos)
+      || public.dashboard_alerta('documento', 'Seguros vencem em 30 dias', 'media', v_proximos);
+  EXCEPTION WHEN undefined_column OR undefined_table THEN
+    NULL;
+  END;
+
+  -- 9 e 10. Certificados de colaboradores
+  BEGIN
+    SELECT
+      COUNT(*) FILTER (WHERE validade < p_hoje),
+      COUNT(*) FILTER (WHERE validade BETWEEN p_hoje AND v_30_dias)
+    INTO v_vencidos, v_proximos
+    FROM public.colaboradores_certificados;
+
+    v_alertas := v_alertas
+      || public.dashboard_alerta('documento', 'Certificados VENCIDOS', 'alta', v_vencidos)
+      || public.dashboard_alerta('documento', 'Certificados vencem em 30 dias', 'media', v_proximos);
+  EXCEPTION WHEN undefined_column OR undefined_table THEN
+    NULL;
+  END;
+
+  -- 11 e 12. Documentos pessoais (RG, CNH etc.)
+  BEGIN
+    SELECT
+      COUNT(*) FILTER (WHERE expiry_date < p_hoje),
+      COUNT(*) FILTER (WHERE expiry_date BETWEEN p_hoje AND v_30_dias)
+    INTO v_vencidos, v_proximos
+    FROM public.colaboradores_documentos
+    WHERE expiry_date IS NOT NULL;
+
+    v_alertas := v_alertas
+      || public.dashboard_alerta('documento', 'Documentos pessoais VENCIDOS', 'alta', v_vencidos)
+      || public.dashboard_alerta('documento', 'Documentos pessoais vencem em 30 dias', 'media', v_proximos);
+  EXCEPTION WHEN undefined_column OR undefined_table THEN
+    NULL;
+  END;
+
+  RETURN jsonb_build_object('kpis', v_kpis, 'alertas', v_alertas);
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+COMMENT ON FUNCTION public.dashboard_pavimentacao_kpis(DATE, DATE, DATE)
+  IS 'KPIs e alertas do Dashboard de Pavimentação já agregados (uma chamada RPC)';
+
+-- =====================================================
+-- 3. FUNCTION: DASHBOARD_KPIS
+-- =====================================================
+-- Contadores e totais do Dashboard principal (DashboardApi.getStats)
+-- Retorna volumes, faturamento, contagens, notas e relatórios por status
+
+CREATE OR REPLACE FUNCTION public.dashboard_kpis(
+  p_hoje DATE,
+  p_semana_inicio DATE,
+  p_semana_fim DATE,
+  p_mes_inicio DATE,
+  p_mes_fim DATE
+)
+RETURNS JSONB AS $$
+DECLARE
+  v_result JSONB := '{}'::jsonb;
+  v_faturamento_dia NUMERIC := 0;
+  v_faturamento_mes NUMERIC := 0;
+BEGIN
+  -- Volume previsto do dia
+  BEGIN
+    SELECT v_result || jsonb_build_object('volume_previsto_dia', COALESCE(SUM(volume_previsto), 0))
+    INTO v_result
+    FROM public.programacao
+    WHERE data = p_hoje;
+  EXCEPTION WHEN undefined_column OR undefined_table THEN
+    v_result := v_result || jsonb_build_object('volume_previsto_dia', 0);
+  END;
+
+  -- Relatórios: volume da semana, contagens do dia/mês e totais por status
+  BEGIN
+    SELECT v_result || jsonb_build_object(
+      'volume_bombeado_semana',
+        COALESCE(SUM(realized_volume) FILTER (WHERE date BETWEEN p_semana_inicio AND p_semana_fim), 0),
+      'relatorios_dia', COUNT(*) FILTER (WHERE date = p_hoje),
+      'relatorios_mes', COUNT(*) FILTER (WHERE date BETWEEN p_mes_inicio AND p_mes_fim)
+    ) INTO v_result
+    FROM public.reports;
+
+    SELECT v_result || jsonb_build_object('relatorios_por_status', COALESCE(jsonb_agg(jsonb_build_object(
+      'status', status,
+      'quantidade', quantidade,
+      'valor_total', valor_total
+    )), '[]'::jsonb)) INTO v_result
+    FROM (
+      SELECT status, COUNT(*) AS quantidade, COALESCE(SUM(total_value), 0) AS valor_total
+      FROM public.reports
+      GROUP BY status
+    ) por_status;
+  EXCEPTION WHEN undefined_column OR undefined_table THEN
+    v_result := v_result || jsonb_build_object(
+      'volume_bombeado_semana', 0,
+      'relatorios_dia', 0,
+      'relatorios_mes', 0,
+      'relatorios_por_status', '[]'::jsonb
+    );
+  END;
+
+  -- Faturamento: view integrada de KPIs; sem ela, relatórios pagos
+  BEGIN
+    SELECT COALESCE(faturamento_hoje, 0), COALESCE(faturamento_mes, 0)
+    INTO v_faturamento_dia, v_faturamento_mes
+    FROM public.view_kpis_financeiros_unificados
+    LIMIT 1;
+  EXCEPTION WHEN undefined_column OR undefined_table THEN
+    BEGIN
+      SELECT
+        COALESCE(SUM(total_value) FILTER (WHERE date = p_hoje), 0),
+        COALESCE(SUM(total_value) FILTER (WHERE date BETWEEN p_mes_inicio AND p_mes_fim), 0)
+      INTO v_faturamento_dia, v_faturamento_mes
+      FROM public.reports
+      WHERE status = 'PAGO';
+    EXCEPTION WHEN undefined_column OR undefined_table THEN
+      NULL;
+    END;
+  END;
+  v_result := v_result || jsonb_build_object(
+    'faturamento_dia', COALESCE(v_faturamento_dia, 0),
+    'faturamento_mes', COALESCE(v_faturamento_mes, 0)
+  );
+
+  -- Colaboradores registrados e clientes
+  BEGIN
+    SELECT v_result || jsonb_build_object('colaboradores', COUNT(*)) INTO v_result
+    FROM public.colaboradores
+    WHERE registrado = true;
+  EXCEPTION WHEN undefined_column OR undefined_table THEN
+    v_result := v_result || jsonb_build_object('colaboradores', 0);
+  END;
+
+  BEGIN
+    SELECT v_result || jsonb_build_object('clientes', COUNT(*)) INTO v_result
+    FROM public.clients;
+  EXCEPTION WHEN undefined_column OR undefined_table THEN
+    v_result := v_result || jsonb_build_object('clientes', 0);
+  END;
+
+  -- Notas fiscais do mês
+  BEGIN
+    SELECT v_result || jsonb_build_object('notas', jsonb_build_object(
+      'quantidade', COUNT(*),
+      'valor_total', COALESCE(SUM(valor), 0)
+    )) INTO v_result
+    FROM public.notas_fiscais
+    WHERE data_emissao BETWEEN p_mes_inicio AND p_mes_fim;
+  EXCEPTION WHEN undefined_column OR undefined_table THEN
+    v_result := v_result || jsonb_build_object('notas', jsonb_build_object('quantidade', 0, 'valor_total', 0));
+  END;
+
+  RETURN v_result;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+COMMENT ON FUNCTION public.dashboard_kpis(DATE, DATE, DATE, DATE, DATE)
+  IS 'Contadores e totais do Dashboard principal já agregados (uma chamada RPC)';
+
+-- =====================================================
+-- 4. ÍNDICES DE APOIO
+-- =====================================================
+
+-- Ruas finalizadas por data de criação (KPIs do mês)
+CREATE INDEX IF NOT EXISTS idx_obras_ruas_concluidas_created
+  ON public.obras_ruas(created_at)
+  WHERE status = 'concluida' AND deleted_at IS NULL;
+
+-- Despesas de obra por data (mesmo nome do create_obras_financeiro_MINIMO.sql)
+CREATE INDEX IF NOT EXISTS idx_despesas_data
+  ON public.obras_financeiro_despesas(data_despesa);
+
+-- =====================================================
+-- 5. PERMISSÕES
+-- =====================================================
+
+GRANT EXECUTE ON FUNCTION public.dashboard_pavimentacao_kpis(DATE, DATE, DATE) TO authenticated;
+GRANT EXECUTE ON FUNCTION public.dashboard_kpis(DATE, DATE, DATE, DATE, DATE) TO authenticated;
@@ -0,0 +1,363 @@
+-- =====================================================
+-- WORLDPAV - ROLLUPS DIÁRIOS DO FINANCEIRO CONSOLIDADO
+-- =====================================================
+-- As telas do financeiro consolidado (resumo, gráfico receitas x
+-- despesas, despesas por categoria) buscavam o mês inteiro de ruas
+-- executadas, faturamentos e despesas e agrupavam tudo no navegador a
+-- cada visualização. Esta tabela guarda os totais já agrupados por
+-- dia × obra × categoria, mantidos por triggers nas tabelas de origem:
+-- ler um mês custa O(dias), não O(lançamentos).
+--
+-- Cada mudança em uma linha de origem recalcula só o(s) balde(s)
+-- (dia, obra) afetado(s), a partir das tabelas de origem (e não por
+-- soma de deltas), então os totais não acumulam erro. Um advisory lock
+-- por balde serializa recálculos concorrentes do mesmo dia/obra.
+--
+-- Tipos:
+--   receita_rua          ruas concluídas com metragem executada (data_finalizacao)
+--   receita_faturamento  faturamentos formais (data_finalizacao)
+--   despesa              obras_financeiro_despesas, por categoria (data_despesa)
+--
+-- Cada linha leva o company_id da obra e o RLS só mostra as linhas da
+-- empresa do usuário, como nas tabelas de origem (03_obras_financeiro.sql).
+-- As functions de recálculo rodam como dono (SECURITY DEFINER), com
+-- search_path fixo, e não podem ser chamadas pelos clientes: só pelos
+-- triggers e por quem administra o banco.
+--
+-- Requer PostgreSQL 15+ (UNIQUE NULLS NOT DISTINCT: despesas sem obra).
+--
+-- As tabelas e colunas de origem não são criadas pelos scripts numerados:
+-- rode antes os scripts avulsos abaixo. A seção 0 confere tudo e para a
+-- migração, sem criar nada, se faltar alguma peça.
+--
+-- DEPENDÊNCIAS: 02_obras.sql, 03_obras_financeiro.sql,
+--   create_obras_financeiro.sql (obras_financeiro_faturamentos, obras_financeiro_despesas),
+--   corrigir_tabelas_notas_ruas.sql (obras_ruas.data_finalizacao, metragem_executada,
+--     valor_total, preco_por_m2),
+--   fix_obras_preco_por_m2.sql (obras.preco_por_m2),
+--   add_soft_delete_to_faturamentos.sql (obras_financeiro_faturamentos.deleted_at)
+-- =====================================================
+
+-- =====================================================
+-- 0. VERIFICAÇÃO DAS DEPENDÊNCIAS
+-- =====================================================
+
+DO $$
+DECLARE
+  v_faltando TEXT;
+BEGIN
+  SELECT string_agg(format('%s.%s (%s)', esperado.tabela, esperado.coluna, esperado.script), ', ')
+  INTO v_faltando
+  FROM (VALUES
+    ('obras_ruas', 'data_finalizacao', 'corrigir_tabelas_notas_ruas.sql'),
+    ('obras_ruas', 'metragem_executada', 'corrigir_tabelas_notas_ruas.sql'),
+    ('obras_ruas', 'valor_total', 'corrigir_tabelas_notas_ruas.sql'),
+    ('obras_ruas', 'preco_por_m2', 'corrigir_tabelas_notas_ruas.sql'),
+    ('obras', 'preco_por_m2', 'fix_obras_preco_por_m2.sql'),
+    ('obras_financeiro_faturamentos', 'data_finalizacao', 'create_obras_financeiro.sql'),
+    ('obras_financeiro_faturamentos', 'deleted_at', 'add_soft_delete_to_faturamentos.sql'),
+    ('obras_financeiro_despesas', 'data_despesa', 'create_obras_financeiro.sql')
+  ) AS esperado(tabela, coluna, script)
+  WHERE NOT EXISTS (
+    SELECT 1 FROM information_schema.columns c
+    WHERE c.table_schema = 'public'
+      AND c.table_name = esperado.tabela
+      AND c.column_name = esperado.coluna
+  );
+
+  IF v_faltando IS NOT NULL THEN
+    RAISE EXCEPTION 'Rollups financeiros: faltam colunas de origem: %', v_faltando
+      USING HINT = 'Rode os scripts indicados entre parênteses e depois esta migração de novo';
+  END IF;
+END $$;
+
+-- =====================================================
+-- 1. TABELA: FINANCEIRO_ROLLUP_DIARIO
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS public.financeiro_rollup_diario (
+  dia DATE NOT NULL,
+  company_id UUID,
+  obra_id UUID,
+  tipo TEXT NOT NULL CHECK (tipo IN ('receita_rua', 'receita_faturamento', 'despesa')),
+  categoria TEXT NOT NULL DEFAULT '',
+  valor NUMERIC(14, 2) NOT NULL DEFAULT 0,
+  quantidade INTEGER NOT NULL DEFAULT 0,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Instalações que já tinham a tabela sem a empresa: a carga no fim
+-- desta migração preenche a coluna
+ALTER TABLE public.financeiro_rollup_diario ADD COLUMN IF NOT EXISTS company_id UUID;
+
+ALTER TABLE public.financeiro_rollup_diario DROP CONSTRAINT IF EXISTS financeiro_rollup_diario_balde;
+ALTER TABLE public.financeiro_rollup_diario
+  ADD CONSTRAINT financeiro_rollup_diario_balde
+  UNIQUE NULLS NOT DISTINCT (company_id, dia, obra_id, tipo, categoria);
+
+COMMENT ON TABLE public.financeiro_rollup_diario
+  IS 'Totais diários de receitas e despesas por obra e categoria (mantidos por triggers)';
+
+-- Leitura por período (o índice da constraint já começa por company_id, dia)
+CREATE INDEX IF NOT EXISTS idx_financeiro_rollup_obra_dia
+  ON public.financeiro_rollup_diario(obra_id, dia);
+
+-- Índices das tabelas de origem usados no recálculo de um balde
+CREATE INDEX IF NOT EXISTS idx_obras_ruas_finalizacao_obra
+  ON public.obras_ruas(data_finalizacao, obra_id)
+  WHERE status = 'concluida' AND deleted_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_faturamentos_finalizacao_obra
+  ON public.obras_financeiro_faturamentos(data_finalizacao, obra_id)
+  WHERE deleted_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_despesas_data_obra
+  ON public.obras_financeiro_despesas(data_despesa, obra_id);
+
+-- =====================================================
+-- 2. FUNCTION: FINANCEIRO_ROLLUP_REFRESH
+-- =====================================================
+-- Recalcula o balde (dia, obra) a partir das tabelas de origem
+-- A empresa vem da obra (despesas sem obra ficam sem empresa e, como nas
+-- tabelas de origem, não aparecem para nenhum usuário)
+-- Mesmas regras do financialConsolidadoApi.ts:
+--   valor da rua = valor_total || metragem_executada * (preço da rua || preço da obra || 0)
+--   categoria da despesa = categoria || 'outros'
+
+CREATE OR REPLACE FUNCTION public.financeiro_rollup_refresh(
+  p_dia DATE,
+  p_obra_id UUID
+)
+RETURNS VOID AS $$
+DECLARE
+  v_company_id UUID;
+BEGIN
+  IF p_dia IS NULL THEN
+    RETURN;
+  END IF;
+
+  PERFORM pg_catalog.pg_advisory_xact_lock(
+    pg_catalog.hashtext('financeiro_rollup:' || p_dia || ':' || COALESCE(p_obra_id::text, '-'))
+  );
+
+  SELECT o.company_id INTO v_company_id
+  FROM public.obras o
+  WHERE o.id = p_obra_id;
+
+  DELETE FROM public.financeiro_rollup_diario
+  WHERE dia = p_dia
+    AND obra_id IS NOT DISTINCT FROM p_obra_id;
+
+  INSERT INTO public.financeiro_rollup_diario (dia, company_id, obra_id, tipo, categoria, valor, quantidade)
+  SELECT p_dia, v_company_id, p_obra_id, 'receita_rua', '',
+    SUM(COALESCE(
+      NULLIF(r.valor_total, 0),
+      r.metragem_executada * COALESCE(NULLIF(r.preco_por_m2, 0), NULLIF(o.preco_por_m2, 0), 0)
+    )),
+    COUNT(*)
+  FROM public.obras_ruas r
+  LEFT JOIN public.obras o ON o.id = r.obra_id
+  WHERE r.data_finalizacao = p_dia
+    AND r.obra_id IS NOT DISTINCT FROM p_obra_id
+    AND r.status = 'concluida'
+    AND r.metragem_executada > 0
+    AND r.deleted_at IS NULL
+  HAVING COUNT(*) > 0;
+
+  INSERT INTO public.financeiro_rollup_diario (dia, company_id, obra_id, tipo, categoria, valor, quantidade)
+  SELECT p_dia, v_company_id, p_obra_id, 'receita_faturamento', '', SUM(COALESCE(f.valor_total, 0)), COUNT(*)
+  FROM public.obras_financeiro_faturamentos f
+  WHERE f.data_finalizacao = p_dia
+    AND f.obra_id IS NOT DISTINCT FROM p_obra_id
+    AND f.deleted_at IS NULL
+  HAVING COUNT(*) > 0;
+
+  INSERT INTO public.financeiro_rollup_diario (dia, company_id, obra_id, tipo, categoria, valor, quantidade)
+  SELECT p_dia, v_company_id, p_obra_id, 'despesa', COALESCE(NULLIF(d.categoria::text, ''), 'outros'),
+    SUM(COALESCE(d.valor, 0)), COUNT(*)
+  FROM public.obras_financeiro_despesas d
+  WHERE d.data_despesa = p_dia
+    AND d.obra_id IS NOT DISTINCT FROM p_obra_id
+  GROUP BY COALESCE(NULLIF(d.categoria::text, ''), 'outros');
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public, pg_temp;
+
+COMMENT ON FUNCTION public.financeiro_rollup_refresh(DATE, UUID)
+  IS 'Recalcula os totais de um dia/obra em financeiro_rollup_diario';
+
+-- =====================================================
+-- 3. TRIGGERS DAS TABELAS DE ORIGEM
+-- =====================================================
+-- Recalculam o balde antigo e o novo (mudança de data ou de obra)
+-- Rodam como dono (SECURITY DEFINER): quem altera a linha de origem não
+-- precisa (nem pode) chamar financeiro_rollup_refresh diretamente
+
+CREATE OR REPLACE FUNCTION public.trg_financeiro_rollup_ruas()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM public.financeiro_rollup_refresh(OLD.data_finalizacao, OLD.obra_id);
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') AND (
+    TG_OP = 'INSERT'
+    OR NEW.data_finalizacao IS DISTINCT FROM OLD.data_finalizacao
+    OR NEW.obra_id IS DISTINCT FROM OLD.obra_id
+  ) THEN
+    PERFORM public.financeiro_rollup_refresh(NEW.data_finalizacao, NEW.obra_id);
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public, pg_temp;
+
+CREATE OR REPLACE FUNCTION public.trg_financeiro_rollup_faturamentos()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM public.financeiro_rollup_refresh(OLD.data_finalizacao, OLD.obra_id);
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') AND (
+    TG_OP = 'INSERT'
+    OR NEW.data_finalizacao IS DISTINCT FROM OLD.data_finalizacao
+    OR NEW.obra_id IS DISTINCT FROM OLD.obra_id
+  ) THEN
+    PERFORM public.financeiro_rollup_refresh(NEW.data_finalizacao, NEW.obra_id);
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public, pg_temp;
+
+CREATE OR REPLACE FUNCTION public.trg_financeiro_rollup_despesas()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM public.financeiro_rollup_refresh(OLD.data_despesa, OLD.obra_id);
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') AND (
+    TG_OP = 'INSERT'
+    OR NEW.data_despesa IS DISTINCT FROM OLD.data_despesa
+    OR NEW.obra_id IS DISTINCT FROM OLD.obra_id
+  ) THEN
+    PERFORM public.financeiro_rollup_refresh(NEW.data_despesa, NEW.obra_id);
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public, pg_temp;
+
+-- O valor das ruas sem preço próprio usa o preço da obra, e todas as
+-- linhas da obra levam a empresa dela
+CREATE OR REPLACE FUNCTION public.trg_financeiro_rollup_obras()
+RETURNS TRIGGER AS $$
+DECLARE
+  v_dia DATE;
+BEGIN
+  FOR v_dia IN
+    SELECT data_finalizacao
+    FROM public.obras_ruas
+    WHERE obra_id = NEW.id
+      AND status = 'concluida'
+      AND data_finalizacao IS NOT NULL
+      AND deleted_at IS NULL
+    UNION
+    SELECT data_finalizacao
+    FROM public.obras_financeiro_faturamentos
+    WHERE NEW.company_id IS DISTINCT FROM OLD.company_id
+      AND obra_id = NEW.id
+      AND data_finalizacao IS NOT NULL
+      AND deleted_at IS NULL
+    UNION
+    SELECT data_despesa
+    FROM public.obras_financeiro_despesas
+    WHERE NEW.company_id IS DISTINCT FROM OLD.company_id
+      AND obra_id = NEW.id
+      AND data_despesa IS NOT NULL
+  LOOP
+    PERFORM public.financeiro_rollup_refresh(v_dia, NEW.id);
+  END LOOP;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public, pg_temp;
+
+DROP TRIGGER IF EXISTS financeiro_rollup_ruas ON public.obras_ruas;
+CREATE TRIGGER financeiro_rollup_ruas
+  AFTER INSERT OR DELETE OR UPDATE OF data_finalizacao, obra_id, status, metragem_executada,
+    preco_por_m2, valor_total, deleted_at
+  ON public.obras_ruas
+  FOR EACH ROW EXECUTE FUNCTION public.trg_financeiro_rollup_ruas();
+
+DROP TRIGGER IF EXISTS financeiro_rollup_faturamentos ON public.obras_financeiro_faturamentos;
+CREATE TRIGGER financeiro_rollup_faturamentos
+  AFTER INSERT OR DELETE OR UPDATE OF data_finalizacao, obra_id, valor_total, deleted_at
+  ON public.obras_financeiro_faturamentos
+  FOR EACH ROW EXECUTE FUNCTION public.trg_financeiro_rollup_faturamentos();
+
+DROP TRIGGER IF EXISTS financeiro_rollup_despesas ON public.obras_financeiro_despesas;
+CREATE TRIGGER financeiro_rollup_despesas
+  AFTER INSERT OR DELETE OR UPDATE OF data_despesa, obra_id, categoria, valor
+  ON public.obras_financeiro_despesas
+  FOR EACH ROW EXECUTE FUNCTION public.trg_financeiro_rollup_despesas();
+
+DROP TRIGGER IF EXISTS financeiro_rollup_obras ON public.obras;
+CREATE TRIGGER financeiro_rollup_obras
+  AFTER UPDATE OF preco_por_m2, company_id
+  ON public.obras
+  FOR EACH ROW
+  WHEN (NEW.preco_por_m2 IS DISTINCT FROM OLD.preco_por_m2
+    OR NEW.company_id IS DISTINCT FROM OLD.company_id)
+  EXECUTE FUNCTION public.trg_financeiro_rollup_obras();
+
+-- =====================================================
+-- 4. FUNCTION: FINANCEIRO_ROLLUP_REBUILD
+-- =====================================================
+-- Reconstrói a tabela inteira (carga inicial ou conferência)
+
+CREATE OR REPLACE FUNCTION public.financeiro_rollup_rebuild()
+RETURNS INTEGER AS $$
+DECLARE
+  v_balde RECORD;
+  v_total INTEGER := 0;
+BEGIN
+  TRUNCATE public.financeiro_rollup_diario;
+
+  FOR v_balde IN
+    SELECT data_finalizacao AS dia, obra_id FROM public.obras_ruas
+    WHERE status = 'concluida' AND data_finalizacao IS NOT NULL AND deleted_at IS NULL
+    UNION
+    SELECT data_finalizacao, obra_id FROM public.obras_financeiro_faturamentos
+    WHERE data_finalizacao IS NOT NULL AND deleted_at IS NULL
+    UNION
+    SELECT data_despesa, obra_id FROM public.obras_financeiro_despesas
+    WHERE data_despesa IS NOT NULL
+  LOOP
+    PERFORM public.financeiro_rollup_refresh(v_balde.dia, v_balde.obra_id);
+    v_total := v_total + 1;
+  END LOOP;
+
+  RETURN v_total;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public, pg_temp;
+
+COMMENT ON FUNCTION public.financeiro_rollup_rebuild()
+  IS 'Reconstrói financeiro_rollup_diario a partir das tabelas de origem; retorna quantos baldes';
+
+-- =====================================================
+-- 5. PERMISSÕES, RLS E CARGA INICIAL
+-- =====================================================
+
+-- Recálculo só pelos triggers: nenhuma function fica exposta via RPC
+REVOKE EXECUTE ON FUNCTION public.financeiro_rollup_refresh(DATE, UUID) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.financeiro_rollup_rebuild() FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.trg_financeiro_rollup_ruas() FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.trg_financeiro_rollup_faturamentos() FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.trg_financeiro_rollup_despesas() FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.trg_financeiro_rollup_obras() FROM PUBLIC, anon, authenticated;
+
+ALTER TABLE public.financeiro_rollup_diario ENABLE ROW LEVEL SECURITY;
+
+-- Somente leitura, só da própria empresa; escrita só pelos triggers
+DROP POLICY IF EXISTS "Enable read access for all authenticated users" ON public.financeiro_rollup_diario;
+DROP POLICY IF EXISTS "Users can view own company financeiro_rollup_diario" ON public.financeiro_rollup_diario;
+CREATE POLICY "Users can view own company financeiro_rollup_diario"
+  ON public.financeiro_rollup_diario FOR SELECT
+  USING (company_id = get_user_company_id());
+
+SELECT public.financeiro_rollup_rebuild();
@@ -0,0 +1,166 @@
+-- =====================================================
+-- WORLDPAV - SINCRONIZAÇÃO EM LOTE DO FATURAMENTO DE RELATÓRIOS
+-- =====================================================
+-- syncFaturamentoFromReports (src/lib/financialApi.ts) criava a entrada
+-- de faturamento de cada relatório pago com um INSERT por relatório.
+-- Agora ela busca só os relatórios que faltam (anti-join na view abaixo)
+-- e grava as entradas em lotes com
+--
+--   upsert(linhas, { onConflict: 'relatorio_id,tipo_transacao', ignoreDuplicates: true })
+--
+-- A constraint única em (relatorio_id, tipo_transacao) é o que torna a
+-- sincronização idempotente: duas execuções simultâneas não duplicam
+-- entradas, a segunda só ignora as que já existem.
+--
+-- ATENÇÃO: a constraint vale para qualquer tipo de transação. Depois
+-- desta migração um relatório pode ter no máximo uma 'Entrada' e uma
+-- 'Saída' vinculadas (relatorio_id); despesas manuais sem relatório não
+-- são afetadas.
+--
+-- expenses e reports vêm do sistema anterior e não existem em toda
+-- instalação: sem elas, esta migração não faz nada.
+--
+-- DEPENDÊNCIAS: tabelas legadas expenses, reports, pumps, clients, companies
+-- =====================================================
+
+-- =====================================================
+-- 1. EXPENSES.TIPO_TRANSACAO
+-- =====================================================
+-- O cliente não envia tipo_transacao no insert (createExpense remove o
+-- campo): o tipo sai do sinal do valor, como em createExpense
+-- (Entrada positiva, Saída negativa).
+
+CREATE OR REPLACE FUNCTION public.expenses_tipo_transacao_padrao()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF NEW.tipo_transacao IS NULL THEN
+    NEW.tipo_transacao := CASE WHEN NEW.valor < 0 THEN 'Saída' ELSE 'Entrada' END;
+  END IF;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+BEGIN
+  IF to_regclass('public.expenses') IS NULL THEN
+    RAISE NOTICE 'Tabela expenses não existe: migração ignorada';
+    RETURN;
+  END IF;
+
+  ALTER TABLE public.expenses ADD COLUMN IF NOT EXISTS tipo_transacao TEXT;
+
+  UPDATE public.expenses
+  SET tipo_transacao = CASE WHEN valor < 0 THEN 'Saída' ELSE 'Entrada' END
+  WHERE tipo_transacao IS NULL;
+
+  DROP TRIGGER IF EXISTS trg_expenses_tipo_transacao ON public.expenses;
+  CREATE TRIGGER trg_expenses_tipo_transacao
+    BEFORE INSERT OR UPDATE ON public.expenses
+    FOR EACH ROW
+    EXECUTE FUNCTION public.expenses_tipo_transacao_padrao();
+END $$;
+
+-- =====================================================
+-- 2. CONSTRAINT ÚNICA (RELATORIO_ID, TIPO_TRANSACAO)
+-- =====================================================
+-- Entradas de faturamento duplicadas por execuções anteriores da
+-- sincronização são removidas antes (fica a mais antiga de cada
+-- relatório). Só entram na limpeza as entradas criadas pela sincronização
+-- (descrição/observações geradas por buildFaturamentoRow e
+-- createFaturamentoFromReport). Qualquer outra duplicata, Entrada ou
+-- Saída, é lançamento dos usuários: nada é apagado, a migração para e
+-- lista os relatórios para revisão manual.
+-- Lançamentos sem relatório (relatorio_id nulo) não entram na constraint.
+
+DO $$
+DECLARE
+  v_duplicados TEXT;
+BEGIN
+  IF to_regclass('public.expenses') IS NULL THEN
+    RETURN;
+  END IF;
+
+  DELETE FROM public.expenses e
+  USING (
+    SELECT id,
+           ROW_NUMBER() OVER (
+             PARTITION BY relatorio_id
+             ORDER BY created_at, id
+           ) AS ordem
+    FROM public.expenses
+    WHERE relatorio_id IS NOT NULL
+      AND tipo_transacao = 'Entrada'
+      AND (descricao LIKE 'Faturamento - Relatório %'
+           OR observacoes LIKE 'Faturamento automático do relatório %')
+  ) duplicadas
+  WHERE e.id = duplicadas.id
+    AND duplicadas.ordem > 1;
+
+  SELECT string_agg(format('%s (%s: %s lançamentos)', relatorio_id, tipo_transacao, quantidade), ', ')
+  INTO v_duplicados
+  FROM (
+    SELECT relatorio_id, tipo_transacao, COUNT(*) AS quantidade
+    FROM public.expenses
+    WHERE relatorio_id IS NOT NULL
+    GROUP BY relatorio_id, tipo_transacao
+    HAVING COUNT(*) > 1
+    ORDER BY relatorio_id
+  ) duplicadas;
+
+  IF v_duplicados IS NOT NULL THEN
+    RAISE EXCEPTION 'Relatórios com mais de um lançamento do mesmo tipo: %', v_duplicados
+      USING HINT = 'Una ou desvincule (relatorio_id = NULL) os lançamentos duplicados e rode a migração de novo';
+  END IF;
+
+  IF NOT EXISTS (
+    SELECT 1 FROM pg_constraint
+    WHERE conname = 'expenses_relatorio_tipo_transacao_key'
+  ) THEN
+    ALTER TABLE public.expenses
+      ADD CONSTRAINT expenses_relatorio_tipo_transacao_key
+      UNIQUE (relatorio_id, tipo_transacao);
+  END IF;
+END $$;
+
+-- =====================================================
+-- 3. VIEW: REPORTS_PAGOS_SEM_FATURAMENTO
+-- =====================================================
+-- Anti-join: relatórios pagos sem entrada de faturamento, já com os
+-- dados que a entrada precisa (empresa da bomba, nome da empresa do
+-- cliente). security_invoker mantém o RLS de quem consulta.
+
+DO $$
+BEGIN
+  IF to_regclass('public.expenses') IS NULL OR to_regclass('public.reports') IS NULL THEN
+    RETURN;
+  END IF;
+
+  EXECUTE $view$
+    CREATE OR REPLACE VIEW public.reports_pagos_sem_faturamento
+    WITH (security_invoker = true) AS
+    SELECT
+      r.id,
+      r.report_number,
+      r.total_value,
+      r.date,
+      r.pump_id,
+      r.client_id,
+      p.company_id AS pump_company_id,
+      co.name AS client_company_name
+    FROM public.reports r
+    LEFT JOIN public.pumps p ON p.id = r.pump_id
+    LEFT JOIN public.clients c ON c.id = r.client_id
+    LEFT JOIN public.companies co ON co.id = c.company_id
+    WHERE r.status = 'PAGO'
+      AND r.total_value IS NOT NULL
+      AND NOT EXISTS (
+        SELECT 1 FROM public.expenses e
+        WHERE e.relatorio_id = r.id
+          AND e.tipo_transacao = 'Entrada'
+      )
+  $view$;
+
+  GRANT SELECT ON public.reports_pagos_sem_faturamento TO authenticated;
+EXCEPTION WHEN undefined_column OR undefined_table THEN
+  RAISE NOTICE 'View reports_pagos_sem_faturamento não criada: %', SQLERRM;
+END $$;
@@ -0,0 +1,41 @@
+-- =====================================================
+-- WORLDPAV - ÍNDICES DA LISTAGEM DE DESPESAS POR CURSOR
+-- =====================================================
+-- getExpensesPaginated (src/lib/financialApi.ts) pagina expenses por
+-- cursor: ordena por (data_despesa, id) decrescentes e cada página
+-- começa depois do último item da anterior:
+--
+--   WHERE data_despesa < :data OR (data_despesa = :data AND id < :id)
+--   ORDER BY data_despesa DESC, id DESC
+--   LIMIT :limite
+--
+-- Com um índice na mesma ordem, o Postgres desce direto até o cursor e
+-- lê só as linhas da página: a página N custa o mesmo que a primeira.
+-- Os filtros mais usados da tela (empresa, bomba) ganham índices com a
+-- coluna de igualdade na frente.
+--
+-- expenses vem do sistema anterior e não existe em toda instalação:
+-- sem ela, esta migração não faz nada.
+--
+-- DEPENDÊNCIAS: tabela legada expenses
+-- =====================================================
+
+DO $$
+BEGIN
+  IF to_regclass('public.expenses') IS NULL THEN
+    RAISE NOTICE 'Tabela expenses não existe: migração ignorada';
+    RETURN;
+  END IF;
+
+  -- Listagem geral
+  CREATE INDEX IF NOT EXISTS idx_expenses_data_id
+    ON public.expenses(data_despesa DESC, id DESC);
+
+  -- Listagem filtrada por empresa
+  CREATE INDEX IF NOT EXISTS idx_expenses_company_data_id
+    ON public.expenses(company_id, data_despesa DESC, id DESC);
+
+  -- Listagem filtrada por bomba
+  CREATE INDEX IF NOT EXISTS idx_expenses_pump_data_id
+    ON public.expenses(pump_id, data_despesa DESC, id DESC);
+END $$;
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Benchmark da passada única do ``RuleSet`` contra um ``re.sub`` por regra
+
+Mede as duas formas de aplicar cada arquivo de regras (por padrão, todos
+os rules/*.toml) e confere que a saída é idêntica, em três corpus gerados
+de forma determinística (mesma semente, mesmos arquivos):
+
+- ``atual``: os arquivos do ``directory`` do arquivo de regras como estão;
+- ``src``: os mesmos arquivos, com
+  ``--inject`` imports antigos inseridos em cada um (a maior parte do
+  texto não casa com nenhuma regra, como no projeto real);
+- ``denso``: ``--dense-files`` arquivos sintéticos de 40 linhas só de
+  imports, 30% deles antigos (quase toda linha é candidata).
+
+Os imports antigos são exemplos literais tirados dos próprios padrões;
+regras cujo exemplo não casa com o padrão ficam de fora da injeção::
+
+    python3 bench-ruleset.py
+    python3 bench-ruleset.py rules/fix-final.toml --repeat 10
+    python3 bench-ruleset.py --repeat 1     # só a conferência, rápido
+
+Sai com código 1 se alguma saída for diferente da aplicação regra a regra.
+
+O ganho depende do corpus: com poucos candidatos a passada única só
+varre o texto uma vez; com muitos, o custo de cada substituição pesa.
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+from codemod import RULES_DIR, iter_source_files, load_rule_file
+
+
+def legacy_examples(rules):
+    """Um import antigo por regra, que casa com o padrão da própria regra"""
+    examples = []
+    for rule in rules.rules:
+        # Classe de aspas vira ", escapes viram o próprio caractere
+        text = re.sub(r"\[[^\]]*[\"'][^\]]*\]", '"', rule.pattern)
+        text = re.sub(r"\\(.)", r"\1", text)
+        if text.endswith("/"):
+            text += 'modulo"'
+        line = f"import x {text};"
+        if re.search(rule.pattern, line, rule.flags):
+            examples.append(line)
+    return examples
+
+
+def corpus_current(rule_file):
+    return [
+        Path(path).read_text(encoding='utf-8')
+        for path in sorted(iter_source_files(rule_file.directory, rule_file.extensions, rule_file.exclude))
+    ]
+
+
+def corpus_src(rule_file, examples, inject, rng):
+    corpus = []
+    for path in sorted(iter_source_files(rule_file.directory, rule_file.extensions, rule_file.exclude)):
+        lines = Path(path).read_text(encoding='utf-8').split('\n')
+        for _ in range(inject):
+            lines.insert(rng.randrange(len(lines) + 1), rng.choice(examples))
+        corpus.append('\n'.join(lines))
+    return corpus
+
+
+def corpus_dense(examples, files, rng):
+    return [
+        ''.join(
+            (rng.choice(examples) if rng.random() < 0.3 else 'import { useState } from "react";') + '\n'
+            for _ in range(40)
+        )
+        for _ in range(files)
+    ]
+
+
+def best_of(transform, corpus, repeat):
+    """Menor tempo em ``repeat`` execuções e as saídas da última"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        outputs = [transform(text) for text in corpus]
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, outputs
+
+
+def bench(rule_file, args):
+    """Mede e confere um arquivo de regras; retorna False se alguma saída divergiu"""
+    rules = rule_file.rules
+    examples = legacy_examples(rules)
+    if not examples:
+        print(f"❌ {rule_file.path.name}: nenhuma regra gerou um import de exemplo que case com o próprio padrão")
+        return False
+    sequential_rules = [(re.compile(rule.pattern, rule.flags), rule.replacement) for rule in rules.rules]
+
+    def sequential(text):
+        for regex, replacement in sequential_rules:
+            text = regex.sub(replacement, text)
+        return text
+
+    def single_pass(text):
+        return rules.apply(text)[0]
+
+    print(
+        f"🔧 {rule_file.description}: {len(rules)} regras em {len(rules.passes)} passada(s), "
+        f"{len(examples)} com import de exemplo\n"
+    )
+    corpora = [
+        ("atual", corpus_current(rule_file)),
+        ("src", corpus_src(rule_file, examples, args.inject, random.Random(args.seed))),
+        ("denso", corpus_dense(examples, args.dense_files, random.Random(args.seed))),
+    ]
+    print(f"   {'corpus':<8} {'arquivos':>9} {'KB':>8} {'re.sub (ms)':>12} {'passada (ms)':>13} {'ganho':>7}")
+    identical = True
+    for name, corpus in corpora:
+        sequential_time, expected = best_of(sequential, corpus, args.repeat)
+        single_time, outputs = best_of(single_pass, corpus, args.repeat)
+        differing = sum(output != reference for output, reference in zip(outputs, expected))
+        identical = identical and not differing
+        icon = "✅" if not differing else "❌"
+        print(
+            f"{icon} {name:<8} {len(corpus):>9} {sum(map(len, corpus)) / 1024:>8.0f} "
+            f"{sequential_time * 1000:>12.1f} {single_time * 1000:>13.1f} {sequential_time / single_time:>6.1f}x"
+            + (f"  ({differing} arquivo(s) com saída diferente)" if differing else "")
+        )
+    print()
+    return identical
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara a passada única do RuleSet com um re.sub por regra")
+    parser.add_argument("rule_files", nargs="*", help="arquivos .toml com as regras (padrão: todos em rules/)")
+    parser.add_argument("--inject", type=int, default=3, help="imports antigos por arquivo no corpus src (padrão: 3)")
+    parser.add_argument("--dense-files", type=int, default=2000, help="arquivos do corpus denso (padrão: 2000)")
+    parser.add_argument("--repeat", type=int, default=7, help="execuções por medição; vale a menor (padrão: 7)")
+    parser.add_argument("--seed", type=int, default=0, help="semente dos corpus (padrão: 0)")
+    args = parser.parse_args(argv)
+
+    paths = args.rule_files or sorted(str(path) for path in RULES_DIR.glob("*.toml"))
+    results = [bench(load_rule_file(path), args) for path in paths]
+    if not all(results):
+        print("❌ Saída diferente da aplicação regra a regra")
+        return 1
+    print("✅ Saída idêntica à aplicação regra a regra em todos os corpus")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
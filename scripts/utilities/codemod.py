@@ -0,0 +1,1251 @@
+#!/usr/bin/env python3
+"""
+Motor compartilhado dos scripts de codemod do projeto WorldPav
+
+Compila todas as regras de substituição de um script em uma única
+expressão regular (alternação com um grupo nomeado por regra) e reescreve
+cada arquivo em uma única passada, em vez de chamar ``re.sub`` uma vez por
+regra.
+
+Os padrões são fatorados em uma árvore de prefixos (``from ["']\\.\\./``
+aparece uma vez só na expressão final). Assim o ``re`` consegue pular
+direto para os candidatos pelo prefixo literal; uma alternação simples
+seria testada em cada posição do arquivo e ficaria mais lenta que as
+substituições separadas.
+
+Semântica: a mesma de aplicar as regras uma a uma, em ordem, com
+``re.sub``. Quando o resultado de uma regra pode casar com uma regra
+seguinte (regras encadeadas, como ``../../lib/`` -> ``../lib/`` ->
+``../../lib/``), a tabela é dividida em passadas sucessivas nesse ponto;
+dentro de cada passada nenhuma regra casa com o que as anteriores
+escreveram, então uma varredura única dá o mesmo texto. Quando duas
+regras da mesma passada casam na mesma posição vence a que aparece
+primeiro na lista, como aconteceria aplicando-as em sequência.
+
+As migrações de imports ficam em arquivos TOML em ``rules/`` e rodam por
+este mesmo módulo::
+
+    python3 codemod.py rules/fix-final.toml --dry-run
+
+    description = "O que a migração faz"
+    directory = "src"              # relativo à raiz do projeto
+    extensions = [".ts", ".tsx"]
+    exclude = [".d.ts"]            # sufixos ignorados (opcional)
+    flags = ["IGNORECASE"]         # flags do re para todas as regras (opcional)
+
+    [[rules]]
+    pattern = '''from ["']\.\./Button["']'''
+    replacement = 'from "../shared/Button"'
+    description = "Button -> shared"   # opcional; padrão: o próprio pattern
+    flags = ["MULTILINE"]              # opcional; somadas às do arquivo
+
+O conjunto compilado de cada arquivo fica em ``rules/__pycache__``,
+identificado pelo hash do arquivo, do motor, do caminho do arquivo e da
+raiz do projeto; as execuções seguintes (e cada processo do --jobs) só
+carregam o pickle. O cache não guarda caminhos absolutos: ``path`` e
+``directory`` são montados de novo a cada carga.
+"""
+
+import argparse
+import contextlib
+import contextvars
+import difflib
+import hashlib
+import itertools
+import json
+import os
+import pickle
+import re
+import shutil
+import sys
+import tempfile
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python < 3.11
+    import tomli as tomllib
+
+# Raiz do projeto (scripts/utilities/ fica dois níveis abaixo)
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Arquivos de regras declarativas e cache dos conjuntos compilados
+RULES_DIR = Path(__file__).resolve().parent / "rules"
+RULES_CACHE = "__pycache__"
+
+# Diretórios que nunca são percorridos
+SKIP_DIRS = {'node_modules', '.git', 'dist', 'build'}
+
+# Manifesto das execuções anteriores, gravado ao lado dos scripts
+MANIFEST_NAME = ".codemod-manifest.json"
+
+# Sufixos dos arquivos auxiliares do WriteBatch, criados ao lado dos alvos
+STAGED_SUFFIX = ".codemod-tmp"
+BACKUP_SUFFIX = ".codemod-bak"
+
+# Tempo máximo padrão (segundos) gasto em um único arquivo
+DEFAULT_BUDGET = 10.0
+
+Rule = namedtuple("Rule", ["pattern", "replacement", "description", "flags"])
+
+# Flags que podem ser aplicadas só a um trecho via (?imsx:...)
+_SCOPED_FLAGS = (
+    (re.IGNORECASE, "i"),
+    (re.MULTILINE, "m"),
+    (re.DOTALL, "s"),
+    (re.VERBOSE, "x"),
+)
+
+
+def _scoped(pattern, flags):
+    """Envolve o padrão com as flags locais da regra"""
+    letters = "".join(letter for flag, letter in _SCOPED_FLAGS if flags & flag)
+    if letters:
+        return f"(?{letters}:{pattern})"
+    return f"(?:{pattern})"
+
+
+_QUANTIFIERS = "*+?{"
+_SPECIAL = ".^$*+?{}[]()|\\"
+
+
+def _next_atom(pattern, index):
+    """
+    Lê o próximo átomo fatorável do padrão a partir de ``index``.
+
+    Retorna ((tipo, texto), proximo_indice) ou None quando o que vem a
+    seguir não pode ser fatorado (grupo, âncora, átomo quantificado...).
+    Tipos: "lit" para um caractere literal e "set" para classes como
+    ``[...]`` e ``\\s``.
+    """
+    if index >= len(pattern):
+        return None
+    char = pattern[index]
+    if char == "\\":
+        escaped = pattern[index + 1:index + 2]
+        if not escaped:
+            return None
+        if escaped.isalnum():
+            if escaped not in "sSdDwW":
+                return None
+            atom, end = ("set", pattern[index:index + 2]), index + 2
+        else:
+            atom, end = ("lit", escaped), index + 2
+    elif char == "[":
+        end = index + 1
+        if pattern[end:end + 1] == "^":
+            end += 1
+        if pattern[end:end + 1] == "]":
+            end += 1
+        while end < len(pattern) and pattern[end] != "]":
+            end += 2 if pattern[end] == "\\" else 1
+        if end >= len(pattern):
+            return None
+        end += 1
+        atom = ("set", pattern[index:end])
+    elif char in _SPECIAL:
+        return None
+    else:
+        atom, end = ("lit", char), index + 1
+    if pattern[end:end + 1] and pattern[end] in _QUANTIFIERS:
+        return None
+    return atom, end
+
+
+class _Node:
+    """Nó da árvore de prefixos; ``entries`` preserva a ordem das regras"""
+
+    def __init__(self):
+        # ("child", átomo, _Node) ou ("tail", índice_da_regra, resto_do_padrão)
+        self.entries = []
+
+    def insert(self, index, pattern, position, casefold):
+        step = _next_atom(pattern, position)
+        if step is not None:
+            atom, end = step
+            child = self._mergeable(atom, casefold)
+            if child is None:
+                child = _Node()
+                self.entries.append(("child", atom, child))
+            child.insert(index, pattern, end, casefold)
+        else:
+            self.entries.append(("tail", index, pattern[position:]))
+
+    def _mergeable(self, atom, casefold):
+        """
+        Filho com o mesmo átomo em que a regra pode entrar sem alterar a
+        prioridade: ou ele é a última entrada, ou todas as entradas depois
+        dele são literais distintos, que nunca casam na mesma posição.
+        """
+        def key(entry_atom):
+            kind, text = entry_atom
+            return (kind, text.casefold() if casefold else text)
+
+        for position in range(len(self.entries) - 1, -1, -1):
+            kind, entry_atom, child = self.entries[position]
+            if kind == "child" and key(entry_atom) == key(atom):
+                later = self.entries[position + 1:]
+                if not later or atom[0] == "lit" and all(
+                    entry[0] == "child" and entry[1][0] == "lit" for entry in later
+                ):
+                    return child
+                return None
+        return None
+
+    def render(self, groups):
+        branches = []
+        for kind, value, extra in self.entries:
+            if kind == "child":
+                atom_kind, text = value
+                atom = re.escape(text) if atom_kind == "lit" else text
+                branches.append(atom + extra.render(groups))
+            else:
+                # Grupo vazio no fim do caminho identifica a regra que casou
+                tail = f"(?:{extra})" if extra else ""
+                branches.append(f"{tail}(?P<{groups[value]}>)")
+        if len(branches) == 1:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")"
+
+
+def _make_rule(entry, flags):
+    """Aceita (padrão, substituição) ou (padrão, substituição, descrição)"""
+    if isinstance(entry, Rule):
+        return entry
+    pattern, replacement, *rest = entry
+    description = rest[0] if rest else pattern
+    return Rule(pattern, replacement, description, flags)
+
+
+_BACKREFERENCE = re.compile(r"\\(?:\d|g<)")
+
+
+class RuleSet:
+    """Conjunto de regras compilado em uma alternação por passada"""
+
+    def __init__(self, rules, flags=0):
+        self.rules = [_make_rule(entry, flags) for entry in rules]
+        # Cada regra também é compilada isoladamente para expandir
+        # referências a grupos (\1, \g<nome>) e substituições via função;
+        # compilar todas aqui já valida cada padrão
+        self._compiled = [re.compile(rule.pattern, rule.flags) for rule in self.rules]
+        self._groups = [f"_r{index}" for index in range(len(self.rules))]
+        self._index_of = {group: index for index, group in enumerate(self._groups)}
+        self.passes = [re.compile(*self._combine(indices)) for indices in self._split_passes()]
+
+    def _feeds(self, earlier, later):
+        """
+        Se o texto escrito pela regra ``earlier`` pode casar com ``later``.
+        Substituições por função ou com referências a grupos não têm texto
+        conhecido: contam como encadeadas (passada nova, por segurança).
+        """
+        replacement = self.rules[earlier].replacement
+        if callable(replacement) or _BACKREFERENCE.search(replacement):
+            return True
+        return self._compiled[later].search(replacement) is not None
+
+    def _split_passes(self):
+        """Índices das regras de cada passada, na ordem da lista"""
+        passes = [[]]
+        for index in range(len(self.rules)):
+            if any(self._feeds(earlier, index) for earlier in passes[-1]):
+                passes.append([])
+            passes[-1].append(index)
+        return passes if passes[0] else []
+
+    def _combine(self, indices):
+        rules = [self.rules[index] for index in indices]
+        flags = {rule.flags for rule in rules}
+        if len(flags) == 1:
+            # Mesmas flags em todas as regras: monta a árvore de prefixos
+            # e aplica as flags no padrão inteiro
+            (common,) = flags
+            root = _Node()
+            for index in indices:
+                root.insert(index, self.rules[index].pattern, 0, bool(common & re.IGNORECASE))
+            return root.render(self._groups), common
+        branches = "|".join(
+            f"{_scoped(self.rules[index].pattern, self.rules[index].flags)}(?P<{self._groups[index]}>)"
+            for index in indices
+        )
+        return branches, 0
+
+    @property
+    def fingerprint(self):
+        """Hash das regras; muda sempre que alguma regra é alterada"""
+        digest = hashlib.sha256()
+        for rule in self.rules:
+            replacement = rule.replacement
+            if callable(replacement):
+                replacement = f"{replacement.__module__}.{replacement.__qualname__}"
+            digest.update(repr((rule.pattern, replacement, rule.flags)).encode("utf-8"))
+        return digest.hexdigest()
+
+    def __len__(self):
+        return len(self.rules)
+
+    def __getstate__(self):
+        # Objetos do re são recompilados ao sair do pickle; guarda só o
+        # padrão combinado (a árvore já montada) e compila as regras
+        # isoladas apenas quando alguma for usada
+        state = self.__dict__.copy()
+        state["passes"] = [(regex.pattern, regex.flags) for regex in self.passes]
+        state["_compiled"] = [None] * len(self.rules)
+        return state
+
+    def __setstate__(self, state):
+        state["passes"] = [re.compile(pattern, flags) for pattern, flags in state["passes"]]
+        self.__dict__.update(state)
+
+    def _rule_regex(self, index):
+        regex = self._compiled[index]
+        if regex is None:
+            rule = self.rules[index]
+            regex = self._compiled[index] = re.compile(rule.pattern, rule.flags)
+        return regex
+
+    def _expand(self, index, match):
+        replacement = self.rules[index].replacement
+        if not callable(replacement) and "\\" not in replacement:
+            return replacement
+        # Refaz o casamento só com a regra vencedora para que os grupos
+        # numerados correspondam aos da regra original
+        own = self._rule_regex(index).match(match.string, match.start())
+        if callable(replacement):
+            return replacement(own)
+        return own.expand(replacement)
+
+    def apply(self, content):
+        """
+        Aplica todas as regras, uma varredura por passada.
+
+        Retorna (novo_conteudo, contagens) onde contagens é uma lista com o
+        número de substituições feitas por cada regra, na ordem da lista.
+        """
+        counts = [0] * len(self.rules)
+        if not self.rules:
+            return content, counts
+
+        def substitute(match):
+            index = self._index_of[match.lastgroup]
+            counts[index] += 1
+            return self._expand(index, match)
+
+        started = time.perf_counter()
+        result = content
+        for regex in self.passes:
+            result = regex.sub(substitute, result)
+        if _profile.get() is not None:
+            self._profile(content, counts, time.perf_counter() - started)
+        return result, counts
+
+    def _profile(self, content, counts, elapsed):
+        """
+        Na passada única o custo de varrer o texto é compartilhado entre as
+        regras; para o perfil, cada padrão é medido varrendo o arquivo
+        sozinho. O tempo da passada combinada fica em uma linha própria.
+        """
+        record_rule(
+            f"(passada combinada: {len(self.rules)} regras, {len(self.passes)} passada(s))", sum(counts), elapsed
+        )
+        for index, rule in enumerate(self.rules):
+            started = time.perf_counter()
+            for _ in self._rule_regex(index).finditer(content):
+                pass
+            record_rule(f"#{index} {rule.description}", counts[index], time.perf_counter() - started)
+
+    def changes(self, counts):
+        """Agrupa as contagens por descrição, ignorando regras sem casamentos"""
+        summary = {}
+        for rule, count in zip(self.rules, counts):
+            if count:
+                summary[rule.description] = summary.get(rule.description, 0) + count
+        return list(summary.items())
+
+
+RuleFile = namedtuple("RuleFile", ["path", "description", "directory", "extensions", "exclude", "rules"])
+
+_FLAG_NAMES = {
+    "IGNORECASE": re.IGNORECASE,
+    "MULTILINE": re.MULTILINE,
+    "DOTALL": re.DOTALL,
+    "VERBOSE": re.VERBOSE,
+}
+
+
+def _parse_flags(names, where):
+    flags = 0
+    for name in names:
+        if name not in _FLAG_NAMES:
+            raise ValueError(f"{where}: flag desconhecida {name!r} (use {', '.join(_FLAG_NAMES)})")
+        flags |= _FLAG_NAMES[name]
+    return flags
+
+
+def _parse_rule_file(path, data):
+    """
+    Compila o TOML nos campos do RuleFile que não dependem de onde o
+    projeto está (``directory`` continua relativo à raiz); erros de
+    formato viram ValueError
+    """
+    try:
+        config = tomllib.loads(data.decode("utf-8"))
+    except (UnicodeDecodeError, tomllib.TOMLDecodeError) as e:
+        raise ValueError(f"{path.name}: {e}") from None
+
+    flags = _parse_flags(config.get("flags", []), path.name)
+    rules = []
+    for number, entry in enumerate(config.get("rules", []), 1):
+        where = f"{path.name}, regra {number}"
+        if "pattern" not in entry or "replacement" not in entry:
+            raise ValueError(f"{where}: 'pattern' e 'replacement' são obrigatórios")
+        rule_flags = flags | _parse_flags(entry.get("flags", []), where)
+        try:
+            re.compile(entry["pattern"], rule_flags)
+        except re.error as e:
+            raise ValueError(f"{where}: padrão inválido: {e}") from None
+        description = entry.get("description", entry["pattern"])
+        rules.append(Rule(entry["pattern"], entry["replacement"], description, rule_flags))
+    if not rules:
+        raise ValueError(f"{path.name}: nenhuma regra em [[rules]]")
+
+    return {
+        "description": config.get("description", path.stem),
+        "directory": config.get("directory", "src"),
+        "extensions": tuple(config.get("extensions", (".ts", ".tsx"))),
+        "exclude": tuple(config.get("exclude", ())),
+        "rules": RuleSet(rules),
+    }
+
+
+def load_rule_file(path):
+    """
+    Carrega um arquivo de regras TOML já compilado. O cache em
+    ``__pycache__`` ao lado do arquivo é identificado pelo hash do TOML,
+    do motor, do caminho do arquivo e da raiz do projeto; qualquer
+    alteração em um deles gera um cache novo. ``path`` e ``directory``
+    nunca vêm do cache: uma cópia do checkout sempre age na própria árvore.
+    """
+    path = Path(path).resolve()
+    data = path.read_bytes()
+    key = "\0".join([fingerprint_files(__file__), str(path), str(PROJECT_ROOT.resolve())])
+    digest = hashlib.sha256(data + key.encode("utf-8")).hexdigest()
+    cache_dir = path.parent / RULES_CACHE
+    cache = cache_dir / f"{path.stem}.{digest[:16]}.pickle"
+    try:
+        with open(cache, 'rb') as f:
+            compiled = pickle.load(f)
+    except Exception:
+        # Sem cache, ou cache corrompido/de outra versão do Python: recompila
+        compiled = None
+    if compiled is None:
+        compiled = _parse_rule_file(path, data)
+        _write_rule_cache(path, cache, compiled)
+
+    return RuleFile(
+        path=path,
+        description=compiled["description"],
+        directory=PROJECT_ROOT / compiled["directory"],
+        extensions=compiled["extensions"],
+        exclude=compiled["exclude"],
+        rules=compiled["rules"],
+    )
+
+
+def _write_rule_cache(path, cache, compiled):
+    cache_dir = cache.parent
+    try:
+        cache_dir.mkdir(exist_ok=True)
+        for stale in cache_dir.glob(f"{path.stem}.*.pickle"):
+            stale.unlink()
+        temp = cache.with_suffix(".tmp")
+        with open(temp, 'wb') as f:
+            pickle.dump(compiled, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, cache)
+    except OSError:
+        pass
+
+
+# Arquivos de regras já carregados neste processo (um por worker)
+_loaded_rule_files = {}
+
+
+def apply_rule_file(path, content):
+    """Transform para ``process_file``: aplica as regras de um arquivo TOML"""
+    rule_file = _loaded_rule_files.get(path)
+    if rule_file is None:
+        rule_file = _loaded_rule_files[path] = load_rule_file(path)
+    content, counts = rule_file.rules.apply(content)
+    return content, rule_file.rules.changes(counts)
+
+
+class Result:
+    """
+    Resultado de um arquivo processado por ``process_file``.
+
+    É verdadeiro quando o arquivo mudou. ``report`` é o que a transformação
+    do script devolveu, ``diff`` o diff unificado em dry-run, ``staged`` o
+    arquivo temporário com o novo conteúdo, à espera do ``WriteBatch``, e
+    ``profile`` o custo de cada regra no arquivo, com --profile.
+    """
+
+    __slots__ = ("changed", "report", "diff", "staged", "profile")
+
+    def __init__(self, changed, report=None, diff=None, staged=None, profile=None):
+        self.changed = changed
+        self.report = report
+        self.diff = diff
+        self.staged = staged
+        self.profile = profile
+
+    def __bool__(self):
+        return self.changed
+
+    def __repr__(self):
+        return f"Result(changed={self.changed!r}, report={self.report!r})"
+
+
+class Failed:
+    """
+    Resultado de um arquivo que não pôde ser processado.
+
+    É falso como "arquivo não alterado", mas nunca é registrado como limpo
+    no manifesto: o arquivo volta a ser processado na próxima execução.
+    """
+
+    def __init__(self, reason):
+        self.reason = reason
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return f"Failed({self.reason!r})"
+
+
+class BudgetExceeded(Exception):
+    """O arquivo estourou o tempo máximo de processamento"""
+
+
+_deadline = contextvars.ContextVar("codemod_deadline", default=None)
+
+
+class time_budget:
+    """
+    Limita o tempo gasto em um arquivo. Dentro do bloco ``check_budget()``
+    levanta BudgetExceeded quando o prazo passa; None desliga o limite.
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self._token = None
+
+    def __enter__(self):
+        deadline = None if self.seconds is None else time.monotonic() + self.seconds
+        self._token = _deadline.set(deadline)
+        return self
+
+    def __exit__(self, *exc_info):
+        _deadline.reset(self._token)
+        return False
+
+
+def check_budget():
+    deadline = _deadline.get()
+    if deadline is not None and time.monotonic() > deadline:
+        raise BudgetExceeded("tempo máximo por arquivo esgotado")
+
+
+# Perfil do arquivo em processamento: {regra: [casamentos, segundos]}
+_profile = contextvars.ContextVar("codemod_profile", default=None)
+
+
+@contextlib.contextmanager
+def profiling(enabled):
+    """Ativa o perfil por regra para o arquivo atual; produz o dicionário ou None"""
+    if not enabled:
+        yield None
+        return
+    stats = {}
+    token = _profile.set(stats)
+    try:
+        yield stats
+    finally:
+        _profile.reset(token)
+
+
+def record_rule(name, matches, seconds):
+    """Soma casamentos e tempo de uma regra no perfil do arquivo atual, se houver"""
+    stats = _profile.get()
+    if stats is None:
+        return
+    entry = stats.setdefault(name, [0, 0.0])
+    entry[0] += matches
+    entry[1] += seconds
+
+
+def apply_step(name, function, content):
+    """
+    Aplica ``function(content)`` registrando no perfil o tempo gasto. Sem
+    contagem de casamentos disponível, conta 1 quando o conteúdo mudou.
+    """
+    started = time.perf_counter()
+    result = function(content)
+    record_rule(name, int(result != content), time.perf_counter() - started)
+    return result
+
+
+class Profile:
+    """
+    Custo acumulado de cada regra em uma execução: casamentos, arquivos em
+    que ela casou, tempo total e maior tempo em um único arquivo.
+    """
+
+    SORT_KEYS = ("time", "peak", "matches", "files", "rule")
+
+    def __init__(self):
+        self.files = 0
+        self.rules = {}
+
+    def add(self, result):
+        stats = getattr(result, "profile", None)
+        if stats is None:
+            return
+        self.files += 1
+        for name, (matches, seconds) in stats.items():
+            row = self.rules.setdefault(name, {"matches": 0, "files": 0, "time": 0.0, "peak": 0.0})
+            row["matches"] += matches
+            row["files"] += bool(matches)
+            row["time"] += seconds
+            row["peak"] = max(row["peak"], seconds)
+
+    def rows(self, sort="time"):
+        rows = [{"rule": name, **row} for name, row in self.rules.items()]
+        return sorted(rows, key=lambda row: row[sort], reverse=sort != "rule")
+
+    def print_table(self, sort="time"):
+        print(f"\n📊 Perfil por regra ({self.files} arquivo(s), ordenado por {sort})")
+        print(f"   {'casamentos':>10} {'arquivos':>8} {'tempo (ms)':>11} {'pico (ms)':>10}  regra")
+        for row in self.rows(sort):
+            rule = row["rule"] if len(row["rule"]) <= 80 else row["rule"][:77] + "..."
+            print(
+                f"   {row['matches']:>10} {row['files']:>8} {row['time'] * 1000:>11.2f}"
+                f" {row['peak'] * 1000:>10.2f}  {rule}"
+            )
+        dead = sum(1 for row in self.rules.values() if not row["matches"])
+        if dead:
+            print(f"   💤 {dead} regra(s) sem nenhum casamento")
+
+    def save(self, path, sort="time"):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"files": self.files, "rules": self.rows(sort)}, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+
+
+def contains_any(content, tokens):
+    """Pré-filtro barato: algum dos termos aparece no texto (sem diferenciar maiúsculas)?"""
+    lowered = content.lower()
+    return any(token in lowered for token in tokens)
+
+
+def iter_source_files(directory, extensions, exclude_suffixes=()):
+    """Percorre ``directory`` em ordem alfabética, produzindo os arquivos com as extensões dadas"""
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS)
+        for file in sorted(files):
+            if file.endswith(tuple(extensions)) and not file.endswith(tuple(exclude_suffixes)):
+                yield Path(root) / file
+
+
+def argument_parser(description):
+    """Parser com os argumentos comuns a todos os codemods"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=1, metavar="N",
+        help="processos em paralelo (0 = um por CPU; padrão: 1)",
+    )
+    parser.add_argument(
+        "--budget", type=float, default=DEFAULT_BUDGET, metavar="SEGUNDOS",
+        help=f"tempo máximo por arquivo; arquivos que estouram ficam intactos (padrão: {DEFAULT_BUDGET:g})",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true",
+        help="não grava nada; escreve no stdout o diff unificado de cada arquivo",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help=f"reprocessa todos os arquivos, ignorando o {MANIFEST_NAME}",
+    )
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="mede o custo de cada regra e mostra uma tabela no final (implica --no-cache)",
+    )
+    parser.add_argument(
+        "--profile-sort", choices=Profile.SORT_KEYS, default="time",
+        help="coluna usada para ordenar o perfil (padrão: time)",
+    )
+    parser.add_argument(
+        "--profile-json", metavar="ARQUIVO",
+        help="também grava o perfil em JSON (implica --profile)",
+    )
+    return parser
+
+
+def fingerprint_files(*paths):
+    """Hash do conteúdo de arquivos, para scripts cujas regras são código"""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()
+
+
+def _file_state(filepath):
+    """(tamanho, mtime_ns, sha256) do arquivo"""
+    data = Path(filepath).read_bytes()
+    stat = os.stat(filepath)
+    return stat.st_size, stat.st_mtime_ns, hashlib.sha256(data).hexdigest()
+
+
+class Manifest:
+    """
+    Registro dos arquivos já conhecidos como limpos para um conjunto de
+    regras: caminho -> tamanho, mtime, hash do conteúdo e hash das regras.
+
+    Cada script tem sua própria seção no arquivo, então rodar um codemod
+    não invalida o registro dos outros.
+    """
+
+    def __init__(self, path, namespace, rules_hash):
+        self.path = Path(path)
+        self.namespace = namespace
+        # O motor também faz parte das regras: mudar codemod.py invalida tudo
+        self.rules_hash = hashlib.sha256(
+            (rules_hash + fingerprint_files(__file__)).encode("utf-8")
+        ).hexdigest()
+        self.skipped = 0
+        self._entries = self._load().get(namespace, {})
+
+    @classmethod
+    def for_script(cls, script, rules_hash, namespace=None):
+        script = Path(script).resolve()
+        return cls(script.parent / MANIFEST_NAME, namespace or script.name, rules_hash)
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def is_clean(self, filepath):
+        entry = self._entries.get(str(Path(filepath).resolve()))
+        if entry is None or entry["rules"] != self.rules_hash:
+            return False
+        try:
+            stat = os.stat(filepath)
+            if stat.st_size != entry["size"]:
+                return False
+            if stat.st_mtime_ns == entry["mtime_ns"]:
+                return True
+            # mtime mudou (checkout, touch...): decide pelo conteúdo
+            size, mtime_ns, sha256 = _file_state(filepath)
+        except OSError:
+            return False
+        if sha256 != entry["sha256"]:
+            return False
+        entry["mtime_ns"] = mtime_ns
+        return True
+
+    def record(self, filepath, state):
+        """Marca o arquivo como limpo (``state`` de _file_state) ou o esquece (None)"""
+        key = str(Path(filepath).resolve())
+        if state is None:
+            self._entries.pop(key, None)
+            return
+        size, mtime_ns, sha256 = state
+        self._entries[key] = {
+            "size": size,
+            "mtime_ns": mtime_ns,
+            "sha256": sha256,
+            "rules": self.rules_hash,
+        }
+
+    def filter(self, paths):
+        """Remove de ``paths`` os arquivos limpos desde a última execução"""
+        pending = []
+        for path in paths:
+            if self.is_clean(path):
+                self.skipped += 1
+            else:
+                pending.append(path)
+        return pending
+
+    def save(self):
+        data = self._load()
+        data[self.namespace] = self._entries
+        temp = self.path.with_name(self.path.name + ".tmp")
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(temp, self.path)
+
+
+def display_path(filepath):
+    """Caminho relativo à raiz do projeto, como aparece nos diffs
+
+    Relativo a ``PROJECT_ROOT`` (e não ao diretório atual) para que o diff
+    aplique com ``git apply``/``patch -p1`` na raiz, de onde quer que o
+    script tenha rodado.
+    """
+    path = Path(filepath).resolve()
+    try:
+        return path.relative_to(PROJECT_ROOT).as_posix()
+    except ValueError:
+        return Path(os.path.relpath(path)).as_posix()
+
+
+def unified_diff(filepath, original, content):
+    """Diff unificado aplicável com ``patch -p1``/``git apply``"""
+    name = display_path(filepath)
+    return "".join(difflib.unified_diff(
+        original.splitlines(keepends=True), content.splitlines(keepends=True),
+        fromfile=f"a/{name}", tofile=f"b/{name}",
+    ))
+
+
+def deletion_diff(filepath):
+    """Diff de remoção de um arquivo inteiro"""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        original = f.read()
+    name = display_path(filepath)
+    return "".join(difflib.unified_diff(
+        original.splitlines(keepends=True), [],
+        fromfile=f"a/{name}", tofile="/dev/null",
+    ))
+
+
+def stage_write(filepath, content, newline=None):
+    """
+    Grava ``content`` em um arquivo temporário ao lado de ``filepath`` (no
+    mesmo sistema de arquivos, para o ``os.replace`` do commit ser atômico)
+    e retorna o caminho dele. O alvo não é tocado.
+    """
+    filepath = Path(filepath)
+    fd, staged = tempfile.mkstemp(
+        dir=filepath.parent, prefix=f".{filepath.name}.", suffix=STAGED_SUFFIX
+    )
+    try:
+        # Sem fsync por arquivo: o commit faz um fsync por diretório no final
+        with open(fd, 'w', encoding='utf-8', newline=newline) as f:
+            f.write(content)
+        if filepath.exists():
+            shutil.copymode(filepath, staged)
+    except BaseException:
+        os.unlink(staged)
+        raise
+    return Path(staged)
+
+
+_backup_ids = itertools.count()
+
+
+def _backup_path(filepath):
+    unique = f"{os.getpid()}-{next(_backup_ids)}"
+    return filepath.with_name(f".{filepath.name}.{unique}{BACKUP_SUFFIX}")
+
+
+def _backup(filepath):
+    """
+    Guarda o original de ``filepath`` para desfazer o commit, sem copiar o
+    arquivo no disco: um hard link ao lado dele ou, onde não há hard link
+    (alguns compartilhamentos de rede), o conteúdo e o modo em memória.
+    """
+    backup = _backup_path(filepath)
+    try:
+        os.link(filepath, backup)
+        return backup
+    except OSError:
+        with open(filepath, 'rb') as f:
+            return f.read(), os.stat(filepath).st_mode
+
+
+def _set_aside(filepath):
+    """Remove ``filepath`` renomeando-o para um backup ao lado (desfazível)"""
+    backup = _backup_path(filepath)
+    os.replace(filepath, backup)
+    return backup
+
+
+def _restore(backup, target):
+    if isinstance(backup, Path):
+        os.replace(backup, target)
+        return
+    content, mode = backup
+    fd, staged = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=STAGED_SUFFIX)
+    with open(fd, 'wb') as f:
+        f.write(content)
+    os.chmod(staged, mode & 0o7777)
+    os.replace(staged, target)
+
+
+def _fsync_dir(directory):
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class WriteBatch:
+    """
+    Todas as alterações de uma execução, aplicadas de uma vez no final.
+
+    Os novos conteúdos são preparados em arquivos temporários (pelos
+    próprios workers, em paralelo) e só no ``commit`` substituem os
+    originais com ``os.replace``, na ordem em que foram registrados. Se a
+    execução falhar antes disso, a árvore fica intacta e os temporários são
+    apagados; se o commit falhar no meio, as substituições já feitas são
+    desfeitas a partir dos originais guardados (hard links, ou o conteúdo
+    em memória onde não há hard link; nenhum arquivo é copiado). Cada diretório tocado
+    recebe um único fsync no final, em vez de um por arquivo.
+
+    Como context manager, faz o commit na saída normal e o rollback quando
+    há exceção::
+
+        with WriteBatch() as batch:
+            batch.write(path, content)
+            batch.delete(other_path)
+    """
+
+    def __init__(self):
+        self._operations = []
+
+    def __len__(self):
+        return len(self._operations)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+    def add(self, filepath, staged):
+        """Registra um arquivo já preparado por ``stage_write``"""
+        self._operations.append(("write", Path(filepath), Path(staged)))
+
+    def write(self, filepath, content, newline=None):
+        self.add(filepath, stage_write(filepath, content, newline))
+
+    def delete(self, filepath):
+        self._operations.append(("delete", Path(filepath), None))
+
+    def move(self, source, destination):
+        self._operations.append(("move", Path(destination), Path(source)))
+
+    def rollback(self):
+        """Descarta as alterações ainda não aplicadas"""
+        for kind, _, staged in self._operations:
+            if kind == "write":
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(staged)
+        self._operations = []
+
+    def commit(self):
+        operations, self._operations = self._operations, []
+        undo = []
+        try:
+            for kind, target, source in operations:
+                if kind == "write":
+                    backup = _backup(target) if target.exists() else None
+                    os.replace(source, target)
+                elif kind == "delete":
+                    backup = _set_aside(target)
+                else:
+                    if target.exists():
+                        raise FileExistsError(f"{target} já existe")
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    os.replace(source, target)
+                    backup = source
+                undo.append((kind, target, backup))
+        except BaseException:
+            self._operations = operations[len(undo):]
+            self.rollback()
+            self._undo(undo)
+            raise
+
+        for kind, target, backup in undo:
+            if kind != "move" and isinstance(backup, Path):
+                os.unlink(backup)
+        directories = {target.parent for _, target, _ in undo}
+        directories.update(source.parent for kind, _, source in undo if kind == "move")
+        for directory in sorted(directories):
+            _fsync_dir(directory)
+
+    @staticmethod
+    def _undo(undo):
+        for kind, target, backup in reversed(undo):
+            if kind == "move":
+                os.replace(target, backup)
+            elif backup is None:
+                os.unlink(target)
+            else:
+                _restore(backup, target)
+
+
+def process_file(transform, filepath, dry_run=False, budget=DEFAULT_BUDGET, profile=False):
+    """
+    Worker genérico: lê o arquivo, aplica ``transform(conteudo)`` ->
+    ``(novo_conteudo, relatorio)`` dentro do tempo máximo e prepara o
+    resultado para o ``WriteBatch``, ou em dry-run só calcula o diff. O
+    arquivo original não é alterado aqui.
+
+    Com ``profile``, as regras registram seu custo em ``Result.profile``.
+
+    Retorna ``Result`` ou ``Failed``. Use com ``functools.partial`` para
+    passar a ``run_files``/``iter_files``, que aplicam as alterações.
+    """
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            original = f.read()
+        with time_budget(budget), profiling(profile) as stats:
+            content, report = transform(original)
+        if content == original:
+            return Result(False, report, profile=stats)
+        if dry_run:
+            return Result(True, report, unified_diff(filepath, original, content), profile=stats)
+        return Result(True, report, staged=stage_write(filepath, content), profile=stats)
+    except Exception as e:
+        print(f"❌ Erro em {filepath}: {e}", file=sys.stderr)
+        return Failed(str(e))
+
+
+def _tracked(worker, filepath):
+    """Executa o worker e, se o arquivo ficou inalterado, devolve seu estado"""
+    result = worker(filepath)
+    state = None
+    if not result and not isinstance(result, Failed):
+        try:
+            state = _file_state(filepath)
+        except OSError:
+            pass
+    return result, state
+
+
+def _batch(worker, paths):
+    return [worker(path) for path in paths]
+
+
+def _results(worker, paths, jobs):
+    """Resultados na ordem de ``paths``, com no máximo alguns lotes em andamento"""
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    if jobs <= 1 or len(paths) <= 1:
+        for path in paths:
+            yield worker(path)
+        return
+
+    # Lotes maiores reduzem o custo de comunicação entre processos; a
+    # janela limita quantos resultados (diffs, por exemplo) ficam em memória
+    chunksize = max(1, min(32, len(paths) // (jobs * 4)))
+    chunks = [paths[start:start + chunksize] for start in range(0, len(paths), chunksize)]
+    window = jobs * 2
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = deque()
+        ready = deque()
+
+        def drain():
+            ready.extend(pending.popleft().result())
+            while ready:
+                yield ready.popleft()
+
+        try:
+            for chunk in chunks:
+                pending.append(executor.submit(_batch, worker, chunk))
+                if len(pending) >= window:
+                    yield from drain()
+            while pending:
+                yield from drain()
+        except BaseException:
+            # Interrompido: o que já foi processado mas não entregue não
+            # pode deixar arquivos preparados para trás
+            for future in pending:
+                if not future.cancel():
+                    with contextlib.suppress(Exception):
+                        ready.extend(future.result())
+            for item in ready:
+                _discard(item)
+            raise
+
+
+def _discard(item):
+    """Apaga o arquivo preparado de um resultado que não chegou a ser entregue"""
+    result = item[0] if isinstance(item, tuple) else item
+    if isinstance(result, Result) and result.staged is not None:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(result.staged)
+
+
+def _iter_results(worker, paths, jobs, manifest):
+    paths = list(paths)
+    if manifest is None:
+        yield from zip(paths, _results(worker, paths, jobs))
+        return
+
+    paths = manifest.filter(paths)
+    try:
+        for path, (result, state) in zip(paths, _results(partial(_tracked, worker), paths, jobs)):
+            manifest.record(path, state)
+            yield path, result
+    finally:
+        manifest.save()
+
+
+def iter_files(worker, paths, jobs=1, manifest=None, batch=None, profile=None):
+    """
+    Aplica ``worker`` a cada arquivo e produz (caminho, resultado) à medida
+    que ficam prontos, sempre na ordem de ``paths``, independentemente do
+    número de processos.
+
+    ``worker`` precisa ser uma função de módulo (serializável pelo pickle)
+    e retornar um valor falso quando não altera o arquivo, ou ``Failed``
+    quando não consegue processá-lo. Com um ``manifest``, arquivos já
+    conhecidos como limpos nem são abertos e os que continuarem
+    inalterados são registrados para a próxima execução.
+
+    Os arquivos preparados pelo worker (``Result.staged``) entram em
+    ``batch``. Sem um batch, um é criado aqui: as alterações só chegam à
+    árvore quando a iteração termina, e são descartadas se ela for
+    interrompida por uma exceção. Com um ``Profile``, o perfil de cada
+    arquivo é acumulado nele.
+    """
+    if batch is None:
+        with WriteBatch() as batch:
+            yield from iter_files(worker, paths, jobs, manifest, batch, profile)
+        return
+
+    for path, result in _iter_results(worker, paths, jobs, manifest):
+        if isinstance(result, Result) and result.staged is not None:
+            batch.add(path, result.staged)
+        if profile is not None:
+            profile.add(result)
+        yield path, result
+
+
+def run_files(worker, paths, jobs=1, manifest=None, batch=None, profile=None):
+    """Como ``iter_files``, mas retorna a lista completa [(caminho, resultado), ...]"""
+    return list(iter_files(worker, paths, jobs, manifest, batch, profile))
+
+
+@contextlib.contextmanager
+def status_output(dry_run):
+    """
+    Em dry-run as mensagens de andamento vão para o stderr e o stdout fica
+    só com os diffs, que podem ir direto para ``less`` ou um arquivo .patch.
+    Produz o stream onde os diffs devem ser escritos.
+    """
+    diffs = sys.stdout
+    if not dry_run:
+        yield diffs
+        return
+    with contextlib.redirect_stdout(sys.stderr):
+        yield diffs
+
+
+def emit_diff(stream, result):
+    if result and result.diff:
+        stream.write(result.diff)
+        stream.flush()
+
+
+def open_manifest(args, script, rules_hash, namespace=None):
+    """Manifesto do script, ou None quando --no-cache ou --profile foi pedido"""
+    # Com perfil, arquivos pulados pelo manifesto esconderiam o custo das regras
+    if args.no_cache or args.profile or args.profile_json:
+        return None
+    return Manifest.for_script(script, rules_hash, namespace)
+
+
+def report_skipped(manifest):
+    if manifest is not None and manifest.skipped:
+        print(f"⏭️  {manifest.skipped} arquivo(s) sem alterações desde a última execução")
+
+
+def open_profile(args):
+    """Profile vazio quando --profile ou --profile-json foi pedido, senão None"""
+    if args.profile or args.profile_json:
+        return Profile()
+    return None
+
+
+def report_profile(profile, args):
+    if profile is None:
+        return
+    profile.print_table(args.profile_sort)
+    if args.profile_json:
+        profile.save(args.profile_json, args.profile_sort)
+        print(f"💾 Perfil salvo em {args.profile_json}")
+
+
+def main(argv=None):
+    parser = argument_parser("Aplica um arquivo de regras declarativas (rules/*.toml)")
+    parser.add_argument("rule_file", help="arquivo .toml com as regras (veja rules/)")
+    parser.add_argument("--dir", help="diretório percorrido, no lugar do 'directory' do arquivo")
+    args = parser.parse_args(argv)
+    try:
+        rule_file = load_rule_file(args.rule_file)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    directory = Path(args.dir) if args.dir else rule_file.directory
+    rules = rule_file.rules
+
+    with status_output(args.dry_run) as diffs:
+        print(f"🔧 {rule_file.description}")
+        print(f"📁 Diretório: {directory}\n")
+
+        manifest = open_manifest(
+            args, __file__, rules.fingerprint, namespace=f"rules/{rule_file.path.name}"
+        )
+        profile = open_profile(args)
+        worker = partial(
+            process_file, partial(apply_rule_file, str(rule_file.path)),
+            dry_run=args.dry_run, budget=args.budget, profile=profile is not None,
+        )
+        paths = iter_source_files(directory, rule_file.extensions, rule_file.exclude)
+        fixed_count = 0
+        totals = {}
+        for filepath, result in iter_files(worker, paths, args.jobs, manifest, profile=profile):
+            if not result:
+                continue
+            fixed_count += 1
+            emit_diff(diffs, result)
+            print(f"  📝 {display_path(filepath)}")
+            for desc, count in result.report:
+                print(f"     - {desc}: {count} correção(ões)")
+                totals[desc] = totals.get(desc, 0) + count
+
+        report_skipped(manifest)
+        if totals:
+            print("\n📊 Total por correção:")
+            for desc, count in totals.items():
+                print(f"   - {desc}: {count}")
+        report_profile(profile, args)
+        print(f"\n✅ Total de arquivos corrigidos: {fixed_count}")
+
+
+if __name__ == "__main__":
+    # Roda pelo módulo importado, e não como __main__, para que os workers
+    # do --jobs usem as mesmas funções (e o mesmo estado) do codemod
+    import codemod
+    codemod.main()
@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+Índice do grafo de imports de src/ para os codemods do projeto WorldPav
+
+Cada arquivo ``src/**/*.{ts,tsx,js,jsx}`` é tokenizado uma vez (comentários,
+strings e template literals são respeitados, então um ``from "..."``
+dentro de um comentário não conta) e seus imports são resolvidos para
+arquivos reais, inclusive o alias ``@/`` do tsconfig. O resultado fica
+salvo em ``.import-graph.json`` ao lado dos scripts; execuções seguintes
+só tokenizam os arquivos cujo tamanho ou mtime mudou. Os demais arquivos
+de src/ (css, json, svg...) também entram no índice, sem imports próprios:
+podem ser alvo de um import e são movidos junto com o diretório.
+
+Com as arestas reversas (quem importa cada arquivo), mover um componente
+reescreve exatamente os imports afetados, sem varrer a árvore com
+padrões ``../``/``../../`` especulativos:
+
+    python3 importgraph.py mv src/components/Button.tsx src/components/shared/
+    python3 importgraph.py importers src/components/shared/Button.tsx
+"""
+
+import argparse
+import json
+import os
+import posixpath
+import re
+from collections import namedtuple
+from pathlib import Path
+
+from codemod import WriteBatch
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+GRAPH_NAME = ".import-graph.json"
+GRAPH_VERSION = 2
+
+# Arquivos tokenizados em busca de imports; os demais só são indexados
+SOURCE_EXTENSIONS = ('.ts', '.tsx', '.js', '.jsx')
+# Ordem de resolução de um especificador sem extensão
+RESOLVE_EXTENSIONS = ('.ts', '.tsx', '.d.ts', '.js', '.jsx')
+ALIAS = "@/"
+
+# Um import: tipo (static, side-effect, dynamic, export, require),
+# especificador e posição do texto do especificador (sem as aspas)
+Import = namedtuple("Import", ["kind", "specifier", "start", "end"])
+
+_TOKEN = re.compile(r"""
+      (?P<space>\s+)
+    | (?P<line_comment>//[^\n]*)
+    | (?P<block_comment>/\*[\s\S]*?(?:\*/|\Z))
+    | (?P<string>"(?:\\.|[^"\\\n])*"?|'(?:\\.|[^'\\\n])*'?)
+    | (?P<name>[A-Za-z_$][\w$]*)
+    | (?P<number>\d[\w.]*)
+    | (?P<punct>.)
+""", re.VERBOSE | re.DOTALL)
+
+# Depois destes tokens uma barra começa uma regex literal, não uma divisão
+_REGEX_AFTER = set("(,=:[!&|?{};+-*%<>~^") | {"return", "typeof", "case", "do", "else", None}
+
+
+def _skip_template(text, index):
+    """``index`` aponta para a crase; retorna a posição após o fechamento"""
+    depth = 0
+    index += 1
+    while index < len(text):
+        char = text[index]
+        if char == "\\":
+            index += 2
+            continue
+        if depth == 0 and char == "`":
+            return index + 1
+        if text.startswith("${", index):
+            depth += 1
+            index += 2
+            continue
+        if depth and char == "}":
+            depth -= 1
+        elif depth and char == "{":
+            depth += 1
+        index += 1
+    return len(text)
+
+
+def _skip_regex(text, index):
+    """``index`` aponta para a barra inicial de uma regex literal"""
+    in_class = False
+    index += 1
+    while index < len(text):
+        char = text[index]
+        if char == "\\":
+            index += 2
+            continue
+        if char == "\n":
+            return index
+        if char == "[":
+            in_class = True
+        elif char == "]":
+            in_class = False
+        elif char == "/" and not in_class:
+            index += 1
+            while index < len(text) and (text[index].isalnum() or text[index] == "_"):
+                index += 1
+            return index
+        index += 1
+    return index
+
+
+def tokenize(text):
+    """Produz tokens significativos (tipo, valor, início, fim) de um arquivo TS/TSX"""
+    index = 0
+    previous = None
+    while index < len(text):
+        if text[index] == "`":
+            end = _skip_template(text, index)
+            yield ("template", text[index:end], index, end)
+            previous, index = "`", end
+            continue
+        if text[index] == "/" and previous in _REGEX_AFTER and text[index + 1:index + 2] not in ("/", "*"):
+            end = _skip_regex(text, index)
+            yield ("regex", text[index:end], index, end)
+            previous, index = "/regex/", end
+            continue
+        match = _TOKEN.match(text, index)
+        kind = match.lastgroup
+        index = match.end()
+        if kind in ("space", "line_comment", "block_comment"):
+            continue
+        value = match.group()
+        yield (kind, value, match.start(), index)
+        previous = value if kind in ("name", "punct") else kind
+
+
+def parse_imports(text):
+    """Lista os imports do arquivo, na ordem em que aparecem"""
+    tokens = list(tokenize(text))
+    imports = []
+
+    def string_at(position):
+        if position < len(tokens) and tokens[position][0] == "string":
+            _, value, start, end = tokens[position]
+            if len(value) >= 2 and value[-1] == value[0]:
+                return value[1:-1], start + 1, end - 1
+        return None
+
+    def value_at(position):
+        return tokens[position][1] if position < len(tokens) else None
+
+    def find_from(position):
+        """Procura ``from "..."`` até o fim da declaração"""
+        while position < len(tokens):
+            kind, value, _, _ = tokens[position]
+            if kind == "punct" and value == ";":
+                return None
+            if kind == "name" and value in ("import", "export"):
+                return None
+            if kind == "name" and value == "from":
+                return string_at(position + 1)
+            position += 1
+        return None
+
+    for position, (kind, value, _, _) in enumerate(tokens):
+        if kind != "name" or position and value_at(position - 1) == ".":
+            continue  # propriedade (obj.import), não palavra-chave
+        found = None
+        if value == "import":
+            following = value_at(position + 1)
+            if following == "(":
+                found = ("dynamic", string_at(position + 2))
+            elif following == ".":
+                continue  # import.meta
+            elif string_at(position + 1):
+                found = ("side-effect", string_at(position + 1))
+            else:
+                found = ("static", find_from(position + 1))
+        elif value == "export":
+            following = value_at(position + 1)
+            if following == "type":
+                following = value_at(position + 2)
+            if following in ("{", "*"):
+                found = ("export", find_from(position + 1))
+        elif value == "require" and value_at(position + 1) == "(":
+            found = ("require", string_at(position + 2))
+        if found and found[1]:
+            specifier, start, end = found[1]
+            imports.append(Import(found[0], specifier, start, end))
+    return imports
+
+
+def _read(path):
+    # newline='' mantém \r\n, para que as posições batam com o arquivo
+    with open(path, 'r', encoding='utf-8', errors='replace', newline='') as f:
+        return f.read()
+
+
+def _strip_extension(path):
+    for extension in ('.d.ts',) + RESOLVE_EXTENSIONS:
+        if path.endswith(extension):
+            return path[:-len(extension)]
+    return path
+
+
+class ImportGraph:
+    """
+    Grafo arquivo -> imports resolvidos, com arestas reversas.
+
+    Os caminhos são relativos à raiz do projeto e usam sempre ``/``.
+    """
+
+    def __init__(self, root=PROJECT_ROOT, src="src", cache_path=None):
+        self.root = Path(root)
+        self.src = src
+        self.cache_path = Path(cache_path) if cache_path else Path(__file__).resolve().parent / GRAPH_NAME
+        # caminho -> {"size", "mtime_ns", "imports": [Import...], "targets": [caminho|None...]}
+        self.files = {}
+        self.importers = {}
+        self.reindexed = 0
+
+    @classmethod
+    def load(cls, root=PROJECT_ROOT, src="src", cache_path=None):
+        """Carrega o índice salvo e o atualiza com o estado atual de src/"""
+        graph = cls(root, src, cache_path)
+        try:
+            with open(graph.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == GRAPH_VERSION and data.get("src") == src:
+                for path, entry in data["files"].items():
+                    entry["imports"] = [Import(*item) for item in entry["imports"]]
+                    graph.files[path] = entry
+        except (OSError, ValueError, KeyError, TypeError):
+            graph.files = {}
+        graph.refresh()
+        return graph
+
+    def save(self):
+        data = {
+            "version": GRAPH_VERSION,
+            "src": self.src,
+            "files": {
+                path: {**entry, "imports": [list(item) for item in entry["imports"]]}
+                for path, entry in sorted(self.files.items())
+            },
+        }
+        temp = self.cache_path.with_name(self.cache_path.name + ".tmp")
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(temp, self.cache_path)
+
+    def _walk(self):
+        base = self.root / self.src
+        for root, dirs, files in os.walk(base):
+            dirs[:] = sorted(d for d in dirs if d not in {'node_modules', '.git', 'dist', 'build'})
+            for file in sorted(files):
+                path = Path(root) / file
+                yield path.relative_to(self.root).as_posix(), path
+
+    def refresh(self):
+        """Retokeniza só os arquivos novos ou alterados e refaz a resolução"""
+        current = {}
+        known = set(self.files)
+        self.reindexed = 0
+        for path, full_path in self._walk():
+            stat = full_path.stat()
+            entry = self.files.get(path)
+            if entry is None or entry["size"] != stat.st_size or entry["mtime_ns"] != stat.st_mtime_ns:
+                imports = parse_imports(_read(full_path)) if path.endswith(SOURCE_EXTENSIONS) else []
+                entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                         "imports": imports, "targets": None}
+                self.reindexed += 1
+            current[path] = entry
+        file_set_changed = set(current) != known
+        self.files = current
+        for path, entry in self.files.items():
+            # Um arquivo novo ou removido pode mudar a resolução de qualquer import
+            if entry["targets"] is None or file_set_changed:
+                entry["targets"] = [self.resolve(path, item.specifier) for item in entry["imports"]]
+        self._build_reverse()
+
+    def _build_reverse(self):
+        self.importers = {}
+        for path, entry in self.files.items():
+            for item, target in zip(entry["imports"], entry["targets"]):
+                if target is not None:
+                    self.importers.setdefault(target, []).append((path, item))
+
+    def resolve(self, importer, specifier):
+        """Arquivo de src/ apontado pelo especificador, ou None (pacote externo ou inexistente)"""
+        if specifier.startswith(ALIAS):
+            base = posixpath.join(self.src, specifier[len(ALIAS):])
+        elif specifier.startswith("."):
+            base = posixpath.normpath(posixpath.join(posixpath.dirname(importer), specifier))
+        else:
+            return None
+        candidates = [base]
+        candidates += [base + extension for extension in RESOLVE_EXTENSIONS]
+        candidates += [posixpath.join(base, "index" + extension) for extension in RESOLVE_EXTENSIONS]
+        for candidate in candidates:
+            if candidate in self.files:
+                return candidate
+        return None
+
+    def imports_of(self, path):
+        entry = self.files.get(path)
+        if entry is None:
+            return []
+        return list(zip(entry["imports"], entry["targets"]))
+
+    def importers_of(self, path):
+        return sorted(self.importers.get(path, []), key=lambda edge: (edge[0], edge[1].start))
+
+    def _specifier(self, importer, target, item, old_target):
+        """Novo especificador de ``importer`` para ``target``, no mesmo estilo do original"""
+        original = item.specifier
+        if _strip_extension(posixpath.basename(old_target)) == "index" \
+                and not _strip_extension(original).endswith("index") \
+                and _strip_extension(posixpath.basename(target)) == "index":
+            # Import do diretório (resolvido via index)
+            path = posixpath.dirname(target)
+        elif original.endswith(posixpath.basename(old_target)):
+            path = target
+        else:
+            path = _strip_extension(target)
+
+        if original.startswith(ALIAS):
+            return ALIAS + posixpath.relpath(path, self.src)
+        relative = posixpath.relpath(path, posixpath.dirname(importer))
+        return relative if relative.startswith(".") else "./" + relative
+
+    def plan_moves(self, moves):
+        """
+        Calcula as edições de import para mover arquivos (``{antigo: novo}``).
+
+        Só visita as arestas que tocam os arquivos movidos: os imports dos
+        próprios arquivos e os de quem os importa. Retorna
+        ``{arquivo_atual: [(início, fim, novo_especificador), ...]}``.
+        """
+        edges = []
+        for old in moves:
+            edges += [(old, item, target) for item, target in self.imports_of(old) if target]
+            edges += [(importer, item, old) for importer, item in self.importers_of(old)
+                      if importer not in moves]
+        edits = {}
+        for importer, item, target in edges:
+            new_importer = moves.get(importer, importer)
+            new_target = moves.get(target, target)
+            if (new_importer, new_target) == (importer, target):
+                continue
+            specifier = self._specifier(new_importer, new_target, item, target)
+            if specifier != item.specifier:
+                edits.setdefault(importer, []).append((item.start, item.end, specifier))
+        return edits
+
+    def apply_moves(self, moves, edits):
+        """
+        Aplica as edições e move os arquivos no disco, tudo em um único
+        ``WriteBatch``: ou a operação inteira acontece, ou nada muda.
+        """
+        with WriteBatch() as batch:
+            for path, changes in sorted(edits.items()):
+                full_path = self.root / path
+                content = _read(full_path)
+                for start, end, specifier in sorted(changes, reverse=True):
+                    content = content[:start] + specifier + content[end:]
+                batch.write(full_path, content, newline='')
+            for old, new in moves.items():
+                batch.move(self.root / old, self.root / new)
+        self.refresh()
+
+
+def _relative(graph, path):
+    return Path(os.path.abspath(path)).relative_to(graph.root).as_posix()
+
+
+def _expand_moves(graph, source, destination):
+    """Mapa {antigo: novo} para mover um arquivo ou um diretório inteiro"""
+    source = _relative(graph, source)
+    destination = _relative(graph, destination)
+    if source in graph.files:
+        if (graph.root / destination).is_dir() or destination.endswith("/"):
+            destination = posixpath.join(destination, posixpath.basename(source))
+        return {source: destination}
+    prefix = source.rstrip("/") + "/"
+    return {
+        path: posixpath.join(destination, path[len(prefix):])
+        for path in graph.files if path.startswith(prefix)
+    }
+
+
+def _left_behind(graph, source, moves):
+    """Arquivos no disco sob ``source`` que o índice não moveria (ex.: fora de src/)"""
+    base = graph.root / _relative(graph, source)
+    if not base.is_dir():
+        return []
+    left = []
+    for root, _, files in os.walk(base):
+        for file in files:
+            path = (Path(root) / file).relative_to(graph.root).as_posix()
+            if path not in moves:
+                left.append(path)
+    return sorted(left)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Índice do grafo de imports de src/")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("build", help="atualiza o índice")
+    for name in ("importers", "imports"):
+        command = commands.add_parser(name, help=f"lista os {name} de um arquivo")
+        command.add_argument("path")
+    move = commands.add_parser("mv", help="move arquivo/diretório e corrige quem o importa")
+    move.add_argument("source")
+    move.add_argument("destination")
+    move.add_argument("--dry-run", action="store_true", help="só mostra as alterações")
+    args = parser.parse_args()
+
+    graph = ImportGraph.load()
+
+    if args.command == "build":
+        edges = sum(len(entry["imports"]) for entry in graph.files.values())
+        print(f"📊 {len(graph.files)} arquivo(s), {edges} import(s); {graph.reindexed} reindexado(s)")
+    elif args.command == "importers":
+        for importer, item in graph.importers_of(_relative(graph, args.path)):
+            print(f"   {importer}: {item.specifier}")
+    elif args.command == "imports":
+        for item, target in graph.imports_of(_relative(graph, args.path)):
+            print(f"   {item.specifier} -> {target or '(externo)'}")
+    else:
+        moves = _expand_moves(graph, args.source, args.destination)
+        if not moves:
+            parser.error(f"nada para mover em {args.source}")
+        left = _left_behind(graph, args.source, moves)
+        if left:
+            parser.error(f"{len(left)} arquivo(s) fora do índice ficariam para trás, ex.: {left[0]}")
+        existing = [new for new in moves.values() if (graph.root / new).exists()]
+        if existing:
+            parser.error(f"destino já existe: {existing[0]}")
+        edits = graph.plan_moves(moves)
+        for old, new in moves.items():
+            print(f"🚚 {old} -> {new}")
+        for path, changes in sorted(edits.items()):
+            print(f"  📝 {path}: {len(changes)} import(s)")
+        if not args.dry_run:
+            graph.apply_moves(moves, edits)
+            print(f"\n✅ {len(moves)} arquivo(s) movido(s), {len(edits)} arquivo(s) corrigido(s)")
+
+    graph.save()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Localizador estrutural de construções JSX/TS para os codemods
+
+Substitui padrões como ``<NextBombaCard[\\s\\S]*?/>`` e
+``{item\\.bomba_prefix\\s*&&[\\s\\S]*?}``, que podem voltar atrás pelo
+arquivo inteiro a cada candidato, por um scanner de chaves/tags
+balanceadas. Strings, template literals e comentários são ignorados e o
+fim de cada construção percorrida fica memorizado, então o custo é
+linear no tamanho do arquivo mesmo com muitos candidatos sem fechamento.
+O scanner também consulta ``check_budget()`` para respeitar o tempo
+máximo por arquivo.
+
+Quando a estrutura não fecha (arquivo malformado ou heurística de JSX
+enganada), o candidato é simplesmente mantido.
+"""
+
+import re
+
+from codemod import check_budget
+
+_CLOSERS = {"{": "}", "(": ")", "[": "]"}
+
+# Caracteres depois dos quais um "<" inicia JSX, e não uma comparação
+_JSX_CONTEXT = "(,=:?&|{[;"
+
+# Passos do scanner entre duas consultas ao relógio
+_CHECK_EVERY = 1024
+
+_UNSCANNED = object()
+
+
+class _Scanner:
+    """
+    Máquina de pilha sobre o texto. Cada construção aberta (chave,
+    parêntese, colchete, template literal ou elemento JSX) vira um quadro
+    na pilha; ao fechar, a posição final fica guardada em ``ends``. Se a
+    construção não fecha, todos os quadros abertos ficam registrados como
+    None. Um candidato seguinte que já foi percorrido é resolvido na hora,
+    então vários candidatos sem fechamento custam uma passada só, e não
+    uma por candidato.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.ends = {}
+        self._steps = 0
+
+    def _tick(self):
+        self._steps += 1
+        if self._steps % _CHECK_EVERY == 0:
+            check_budget()
+
+    def _skip_string(self, index):
+        """``index`` aponta para ' ou "; retorna a posição após o fechamento"""
+        text = self.text
+        quote = text[index]
+        index += 1
+        while index < len(text):
+            self._tick()
+            char = text[index]
+            if char == "\\":
+                index += 2
+            elif char == quote:
+                return index + 1
+            elif char == "\n":
+                # String sem fechamento: não deixa o erro se espalhar
+                return index
+            else:
+                index += 1
+        return len(text)
+
+    def _starts_jsx(self, index):
+        text = self.text
+        following = text[index + 1:index + 2]
+        if not (following.isalpha() or following == ">"):
+            return False
+        # Olha só o último caractere relevante, sem copiar o prefixo
+        before = index - 1
+        while before >= 0 and text[before].isspace():
+            before -= 1
+        if before < 0 or text[before] in _JSX_CONTEXT:
+            return True
+        return text.endswith(("=>", "return"), 0, before + 1)
+
+    def end_of(self, start):
+        """
+        Posição logo após a construção que começa em ``start`` (``{``,
+        ``(``, ``[`` ou o ``<`` de um elemento JSX), ou None.
+        """
+        cached = self.ends.get(start, _UNSCANNED)
+        if cached is not _UNSCANNED:
+            return cached
+
+        text = self.text
+        if text[start] == "<":
+            stack = [["tag", start]]
+        else:
+            stack = [["code", start, _CLOSERS[text[start]]]]
+        index = start + 1
+
+        def enter(kind, position, *extra):
+            """Abre uma construção, ou pula direto se ela já é conhecida"""
+            known = self.ends.get(position, _UNSCANNED)
+            if known is _UNSCANNED:
+                stack.append([kind, position, *extra])
+                return position + 1
+            return known
+
+        def close(end):
+            frame = stack.pop()
+            self.ends[frame[1]] = end
+            return end
+
+        while stack:
+            if index is None or index >= len(text):
+                for frame in stack:
+                    self.ends[frame[1]] = None
+                return None
+            self._tick()
+            frame = stack[-1]
+            kind = frame[0]
+            char = text[index]
+
+            if kind == "code":
+                if char in "\"'":
+                    index = self._skip_string(index)
+                elif char == "`":
+                    index = enter("template", index)
+                elif text.startswith("//", index):
+                    end = text.find("\n", index)
+                    index = None if end == -1 else end
+                elif text.startswith("/*", index):
+                    end = text.find("*/", index + 2)
+                    index = None if end == -1 else end + 2
+                elif char in _CLOSERS:
+                    index = enter("code", index, _CLOSERS[char])
+                elif char in "})]":
+                    if char != frame[2]:
+                        index = None
+                    else:
+                        index = close(index + 1)
+                elif char == "<" and self._starts_jsx(index):
+                    index = enter("tag", index)
+                else:
+                    index += 1
+
+            elif kind == "template":
+                if char == "\\":
+                    index += 2
+                elif char == "`":
+                    index = close(index + 1)
+                elif text.startswith("${", index):
+                    index = enter("code", index + 1, "}")
+                else:
+                    index += 1
+
+            elif kind == "tag":
+                # Atributos da tag de abertura
+                if char == "{":
+                    index = enter("code", index, "}")
+                elif char in "\"'":
+                    end = text.find(char, index + 1)
+                    index = None if end == -1 else end + 1
+                elif text.startswith("/>", index):
+                    index = close(index + 2)
+                elif char == ">":
+                    frame[0] = "children"
+                    index += 1
+                elif char == "<":
+                    index = None
+                else:
+                    index += 1
+
+            else:
+                # Filhos: texto puro (aspas não abrem strings), expressões e elementos
+                if char == "{":
+                    index = enter("code", index, "}")
+                elif text.startswith("</", index):
+                    end = text.find(">", index)
+                    index = None if end == -1 else close(end + 1)
+                elif char == "<":
+                    following = text[index + 1:index + 2]
+                    if following.isalpha() or following == ">":
+                        index = enter("tag", index)
+                    else:
+                        index = None
+                else:
+                    index += 1
+
+        return self.ends[start]
+
+    def skip_whitespace(self, index):
+        while index < len(self.text) and self.text[index].isspace():
+            index += 1
+        return index
+
+
+def _remove_spans(content, starts, end_of):
+    """
+    Remove de ``content`` os trechos que começam em cada casamento de
+    ``starts`` e terminam em ``end_of(scanner, match)``. Candidatos
+    dentro de um trecho já removido são ignorados.
+    """
+    scanner = _Scanner(content)
+    pieces = []
+    last = 0
+    for match in starts.finditer(content):
+        if match.start() < last:
+            continue
+        check_budget()
+        end = end_of(scanner, match)
+        if end is None:
+            continue
+        pieces.append(content[last:match.start()])
+        last = end
+    if not pieces:
+        return content
+    pieces.append(content[last:])
+    return "".join(pieces)
+
+
+def remove_jsx_elements(content, tag, flags=0):
+    """Remove todos os elementos ``<tag .../>`` ou ``<tag ...>...</tag>``"""
+    starts = re.compile(rf"<{re.escape(tag)}(?![\w.])", flags)
+    return _remove_spans(content, starts, lambda scanner, match: scanner.end_of(match.start()))
+
+
+def remove_expressions(content, head, flags=0):
+    """
+    Remove expressões JSX ``{...}`` inteiras cujo início casa com ``head``
+    (que precisa começar pela chave), respeitando chaves aninhadas.
+    """
+    starts = re.compile(head, flags)
+    return _remove_spans(content, starts, lambda scanner, match: scanner.end_of(match.start()))
+
+
+def remove_labeled_blocks(content, label, flags=0):
+    """
+    Remove um comentário JSX ``{/* ... */}`` que casa com ``label`` junto
+    com o elemento que vem logo depois dele. Sem elemento em seguida, só o
+    comentário é removido.
+    """
+    starts = re.compile(label, flags)
+
+    def end_of(scanner, match):
+        index = scanner.skip_whitespace(match.end())
+        if scanner.text.startswith("<", index):
+            end = scanner.end_of(index)
+            if end is not None:
+                return end
+        return match.end()
+
+    return _remove_spans(content, starts, end_of)
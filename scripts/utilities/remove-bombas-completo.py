@@ -4,11 +4,16 @@ Script completo para remover todas as referências a bombas de concreto,
 WorldRental e FelixMix do projeto WorldPav
 """
 
-import os
 import re
-from pathlib import Path
+from functools import partial
+
+import jsxscan
+from codemod import (
+    DEFAULT_BUDGET, PROJECT_ROOT, Result, WriteBatch, apply_step, argument_parser, check_budget,
+    contains_any, deletion_diff, emit_diff, fingerprint_files, iter_files, iter_source_files,
+    open_manifest, open_profile, process_file, report_profile, report_skipped, status_output,
+)
 
-PROJECT_ROOT = Path(__file__).parent
 SRC_DIR = PROJECT_ROOT / "src"
 
 def remove_bomba_fields_from_typescript(content):
@@ -63,18 +68,13 @@ def remove_company_enum_values(content):
 def remove_bomba_jsx_elements(content):
     """Remove elementos JSX relacionados a bombas"""
     
-    # Remover card de próxima bomba
-    patterns = [
-        r"<NextBombaCard[\s\S]*?/>",
-        r"{/\*\s*Próxima Bomba[^}]*\*/}[\s\S]*?</div>\s*</div>",
-        
-        # Remover exibição de bomba_prefix nos cards
-        r"{item\.bomba_prefix\s*&&\s*\([\s\S]*?</span>[\s\S]*?\)\s*}",
-        r"{item\.bomba_prefix\s*&&[\s\S]*?<span>.*?</span>[\s\S]*?}",
-    ]
+    # Remover card de próxima bomba (elemento inteiro) e a seção marcada
+    # pelo comentário "Próxima Bomba"
+    content = jsxscan.remove_jsx_elements(content, "NextBombaCard")
+    content = jsxscan.remove_labeled_blocks(content, r"{/\*\s*Próxima Bomba[^}]*\*/}")
     
-    for pattern in patterns:
-        content = re.sub(pattern, "", content, flags=re.MULTILINE)
+    # Remover exibição de bomba_prefix nos cards
+    content = jsxscan.remove_expressions(content, r"{\s*item\.bomba_prefix\s*&&")
     
     return content
 
@@ -96,75 +96,107 @@ def remove_bomba_from_api_calls(content):
     
     return content
 
-def clean_file(filepath):
-    """Limpa um arquivo de todas as referências a bombas"""
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        original = content
+def replace_simple_terms(content):
+    """Substituições simples de texto"""
+    content = re.sub(r"bombas programadas", "serviços programados", content, flags=re.IGNORECASE)
+    content = re.sub(r"bomba de concreto", "equipamento", content, flags=re.IGNORECASE)
+    return content
+
+# Grupos de limpeza, na ordem de aplicação, com os termos que precisam
+# aparecer no arquivo (sem diferenciar maiúsculas) para que os padrões do
+# grupo tenham chance de casar. Todo padrão do grupo contém um dos termos.
+CLEANERS = [
+    (remove_bomba_fields_from_typescript, ("bomba", "pump", "is_terceira")),
+    (remove_company_enum_values, ("felixmix",)),
+    (remove_bomba_jsx_elements, ("bomba",)),
+    (remove_bomba_from_api_calls, ("bomba", "pump")),
+    (replace_simple_terms, ("bomba",)),
+]
+
+ALL_TRIGGERS = tuple(sorted({token for _, tokens in CLEANERS for token in tokens}))
+
+# Relatório do transform quando o arquivo nem passou pelos padrões
+PREFILTERED = "prefiltered"
+
+def clean_content(content):
+    """
+    Limpa o conteúdo de todas as referências a bombas.
+
+    O relatório é PREFILTERED quando o arquivo não contém nenhum termo dos
+    grupos e por isso nem passou pelos padrões.
+    """
+    if not contains_any(content, ALL_TRIGGERS):
+        return content, PREFILTERED
+    
+    # Aplicar as limpezas cujos termos ainda aparecem no conteúdo
+    for cleaner, tokens in CLEANERS:
+        if contains_any(content, tokens):
+            content = apply_step(cleaner.__name__, cleaner, content)
+            check_budget()
+    return content, None
+
+def scan_and_clean(directory, jobs=1, manifest=None, budget=DEFAULT_BUDGET, dry_run=False,
+                   batch=None, profile=None):
+    """
+    Escaneia e limpa todos os arquivos, produzindo ``(arquivo, resultado)``
+    na ordem dos arquivos.
+    """
+    paths = iter_source_files(directory, ('.ts', '.tsx', '.js', '.jsx'))
+    worker = partial(
+        process_file, clean_content, dry_run=dry_run, budget=budget, profile=profile is not None
+    )
+    return iter_files(worker, paths, jobs, manifest, batch, profile)
+
+def delete_bomba_card(batch, diffs, dry_run):
+    """Deleta NextBombaCard se ainda existir (em dry-run, só mostra o diff)"""
+    bomba_card = SRC_DIR / "components/cards/NextBombaCard.tsx"
+    if not bomba_card.exists():
+        return
+    if dry_run:
+        diffs.write(deletion_diff(bomba_card))
+        diffs.flush()
+    else:
+        batch.delete(bomba_card)
+    print(f"🗑️  Deletado: NextBombaCard.tsx")
+
+def main():
+    args = argument_parser("Remove referências a bombas, WorldRental e FelixMix").parse_args()
+
+    with status_output(args.dry_run) as diffs, WriteBatch() as batch:
+        print("🧹 Limpeza completa de bombas, WorldRental e FelixMix\n")
         
-        # Aplicar todas as limpezas
-        content = remove_bomba_fields_from_typescript(content)
-        content = remove_company_enum_values(content)
-        content = remove_bomba_jsx_elements(content)
-        content = remove_bomba_from_api_calls(content)
+        delete_bomba_card(batch, diffs, args.dry_run)
         
-        # Substituições simples
-        content = re.sub(r"bombas programadas", "serviços programados", content, flags=re.IGNORECASE)
-        content = re.sub(r"bomba de concreto", "equipamento", content, flags=re.IGNORECASE)
+        # Limpar arquivos
+        print("\n🔍 Limpando referências...")
+        # As regras são o próprio código do script
+        manifest = open_manifest(args, __file__, fingerprint_files(__file__, jsxscan.__file__))
+        profile = open_profile(args)
+        cleaned = []
+        prefiltered = 0
+        for filepath, result in scan_and_clean(
+            SRC_DIR, jobs=args.jobs, manifest=manifest, budget=args.budget,
+            dry_run=args.dry_run, batch=batch, profile=profile,
+        ):
+            if result:
+                cleaned.append(filepath.relative_to(PROJECT_ROOT))
+                emit_diff(diffs, result)
+            elif isinstance(result, Result) and result.report == PREFILTERED:
+                prefiltered += 1
+        report_skipped(manifest)
         
-        if content != original:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
-            return True
-        return False
+        print(f"\n✅ Concluído!")
+        print(f"   📝 {len(cleaned)} arquivo(s) limpo(s)")
+        print(f"   ⚡ {prefiltered} arquivo(s) ignorado(s) pelo pré-filtro (sem termos de bomba)")
         
-    except Exception as e:
-        print(f"❌ Erro: {filepath}: {e}")
-        return False
-
-def scan_and_clean(directory):
-    """Escaneia e limpa todos os arquivos"""
-    cleaned = []
-    
-    for root, dirs, files in os.walk(directory):
-        dirs[:] = [d for d in dirs if d not in ['node_modules', '.git', 'dist', 'build']]
+        if cleaned:
+            print("\n📝 Arquivos modificados:")
+            for file in cleaned[:30]:
+                print(f"   - {file}")
+            if len(cleaned) > 30:
+                print(f"   ... e mais {len(cleaned) - 30}")
         
-        for file in files:
-            if file.endswith(('.ts', '.tsx', '.js', '.jsx')):
-                filepath = Path(root) / file
-                if clean_file(filepath):
-                    cleaned.append(filepath.relative_to(PROJECT_ROOT))
-    
-    return cleaned
-
-def main():
-    print("🧹 Limpeza completa de bombas, WorldRental e FelixMix\n")
-    
-    # Deletar NextBombaCard se ainda existir
-    bomba_card = SRC_DIR / "components/cards/NextBombaCard.tsx"
-    if bomba_card.exists():
-        os.remove(bomba_card)
-        print(f"🗑️  Deletado: NextBombaCard.tsx")
-    
-    # Limpar arquivos
-    print("\n🔍 Limpando referências...")
-    cleaned = scan_and_clean(SRC_DIR)
-    
-    print(f"\n✅ Concluído!")
-    print(f"   📝 {len(cleaned)} arquivo(s) limpo(s)")
-    
-    if cleaned:
-        print("\n📝 Arquivos modificados:")
-        for file in cleaned[:30]:
-            print(f"   - {file}")
-        if len(cleaned) > 30:
-            print(f"   ... e mais {len(cleaned) - 30}")
+        report_profile(profile, args)
 
 if __name__ == "__main__":
     main()
-
-
-
-
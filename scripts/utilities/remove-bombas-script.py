@@ -4,11 +4,17 @@ Script para remover todas as referências a bombas de concreto, WorldRental e Fe
 do projeto WorldPav
 """
 
-import os
 import re
-from pathlib import Path
+import time
+from functools import partial
+
+import jsxscan
+from codemod import (
+    DEFAULT_BUDGET, PROJECT_ROOT, WriteBatch, apply_step, argument_parser, check_budget,
+    deletion_diff, emit_diff, fingerprint_files, iter_files, iter_source_files, open_manifest,
+    open_profile, process_file, record_rule, report_profile, report_skipped, status_output,
+)
 
-PROJECT_ROOT = Path(__file__).parent
 SRC_DIR = PROJECT_ROOT / "src"
 
 # Arquivos para deletar completamente
@@ -16,18 +22,22 @@ FILES_TO_DELETE = [
     "src/components/cards/NextBombaCard.tsx",
 ]
 
-# Padrões para substituir em arquivos
+FLAGS = re.IGNORECASE | re.MULTILINE
+
+# Padrões para substituir em arquivos. Funções são remoções estruturais
+# (jsxscan), que percorrem o trecho uma única vez em vez de usar
+# [\s\S]*? e voltar atrás pelo arquivo inteiro.
 REPLACEMENTS = [
     # Remover imports do NextBombaCard
     (r"import\s*{\s*NextBombaCard\s*}\s*from\s*['\"].*NextBombaCard['\"];?\s*\n", ""),
     
-    # Remover uso do NextBombaCard no JSX
-    (r"<NextBombaCard[\s\S]*?/>", ""),
-    (r"{/\*\s*Próxima Bomba.*?\*/}[\s\S]*?</div>", ""),
+    # Remover uso do NextBombaCard no JSX (com ou sem filhos)
+    partial(jsxscan.remove_jsx_elements, tag="NextBombaCard", flags=FLAGS),
+    # Remover o comentário "Próxima Bomba" junto com o bloco que ele marca
+    partial(jsxscan.remove_labeled_blocks, label=r"{/\*\s*Próxima Bomba.*?\*/}", flags=FLAGS),
     
-    # Remover referências a bomba_prefix
-    (r"item\.bomba_prefix\s*&&[\s\S]*?</span>[\s\S]*?}", ""),
-    (r"{item\.bomba_prefix\s*&&[\s\S]*?}", ""),
+    # Remover expressões {item.bomba_prefix && ...} inteiras
+    partial(jsxscan.remove_expressions, head=r"{\s*item\.bomba_prefix\s*&&", flags=FLAGS),
     
     # Substituir "bombas programadas" por "serviços programados"  
     (r"bombas programadas", "serviços programados"),
@@ -49,83 +59,91 @@ REPLACEMENTS = [
     (r"/\*.*bomba.*\*/", ""),
 ]
 
-def delete_files():
-    """Deleta arquivos que devem ser removidos completamente"""
+def delete_files(batch, diffs, dry_run=False):
+    """
+    Deleta arquivos que devem ser removidos completamente, junto com as
+    demais alterações do ``batch``. Em dry-run os arquivos ficam no lugar e
+    a remoção só aparece como diff.
+    """
     deleted = []
     for file_path in FILES_TO_DELETE:
         full_path = PROJECT_ROOT / file_path
         if full_path.exists():
-            os.remove(full_path)
+            if dry_run:
+                diffs.write(deletion_diff(full_path))
+                diffs.flush()
+            else:
+                batch.delete(full_path)
             deleted.append(str(full_path.relative_to(PROJECT_ROOT)))
             print(f"🗑️  Deletado: {file_path}")
     return deleted
 
+def _step_name(entry):
+    """Nome de uma remoção estrutural no perfil, ex.: remove_jsx_elements(NextBombaCard)"""
+    argument = next(iter(entry.keywords.values()), "")
+    return f"{entry.func.__name__}({argument})"
+
 def clean_file_content(content):
     """Aplica todas as substituições no conteúdo do arquivo"""
-    original = content
-    for pattern, replacement in REPLACEMENTS:
-        content = re.sub(pattern, replacement, content, flags=re.IGNORECASE | re.MULTILINE)
-    return content, content != original
+    for entry in REPLACEMENTS:
+        if callable(entry):
+            content = apply_step(_step_name(entry), entry, content)
+        else:
+            pattern, replacement = entry
+            started = time.perf_counter()
+            content, count = re.subn(pattern, replacement, content, flags=FLAGS)
+            record_rule(pattern, count, time.perf_counter() - started)
+        check_budget()
+    return content, None
+
+def scan_and_clean(directory, extensions=['.ts', '.tsx', '.js', '.jsx'], jobs=1, manifest=None,
+                   budget=DEFAULT_BUDGET, dry_run=False, batch=None, profile=None):
+    """Escaneia e limpa todos os arquivos relevantes, produzindo (arquivo, resultado)"""
+    paths = iter_source_files(directory, extensions)
+    worker = partial(
+        process_file, clean_file_content, dry_run=dry_run, budget=budget,
+        profile=profile is not None,
+    )
+    return iter_files(worker, paths, jobs, manifest, batch, profile)
+
+def main():
+    args = argument_parser("Remove referências a bombas, WorldRental e FelixMix").parse_args()
 
-def process_file(filepath):
-    """Processa um arquivo aplicando as limpezas"""
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
+    with status_output(args.dry_run) as diffs, WriteBatch() as batch:
+        print("🧹 Iniciando limpeza de referências a bombas, WorldRental e FelixMix...\n")
         
-        cleaned_content, changed = clean_file_content(content)
+        # Deletar arquivos
+        print("📁 Deletando arquivos...")
+        deleted = delete_files(batch, diffs, args.dry_run)
         
-        if changed:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(cleaned_content)
-            return True
-        return False
-    except Exception as e:
-        print(f"❌ Erro ao processar {filepath}: {e}")
-        return False
-
-def scan_and_clean(directory, extensions=['.ts', '.tsx', '.js', '.jsx']):
-    """Escaneia e limpa todos os arquivos relevantes"""
-    cleaned_files = []
-    
-    for root, dirs, files in os.walk(directory):
-        # Ignorar node_modules e outros diretórios
-        dirs[:] = [d for d in dirs if d not in ['node_modules', '.git', 'dist', 'build']]
+        # Limpar referências nos arquivos restantes
+        print("\n🔍 Limpando referências em arquivos...")
+        # As regras são o próprio código do script
+        manifest = open_manifest(args, __file__, fingerprint_files(__file__, jsxscan.__file__))
+        profile = open_profile(args)
+        cleaned = []
+        for filepath, result in scan_and_clean(
+            SRC_DIR, jobs=args.jobs, manifest=manifest, budget=args.budget,
+            dry_run=args.dry_run, batch=batch, profile=profile,
+        ):
+            if result:
+                cleaned.append(filepath.relative_to(PROJECT_ROOT))
+                emit_diff(diffs, result)
+        report_skipped(manifest)
         
-        for file in files:
-            if any(file.endswith(ext) for ext in extensions):
-                filepath = Path(root) / file
-                if process_file(filepath):
-                    cleaned_files.append(filepath.relative_to(PROJECT_ROOT))
-    
-    return cleaned_files
-
-def main():
-    print("🧹 Iniciando limpeza de referências a bombas, WorldRental e FelixMix...\n")
-    
-    # Deletar arquivos
-    print("📁 Deletando arquivos...")
-    deleted = delete_files()
-    
-    # Limpar referências nos arquivos restantes
-    print("\n🔍 Limpando referências em arquivos...")
-    cleaned = scan_and_clean(SRC_DIR)
-    
-    # Relatório final
-    print(f"\n✅ Limpeza concluída!")
-    print(f"   📁 {len(deleted)} arquivo(s) deletado(s)")
-    print(f"   📝 {len(cleaned)} arquivo(s) limpo(s)")
-    
-    if cleaned:
-        print("\n📝 Arquivos modificados:")
-        for file in cleaned[:20]:  # Mostrar no máximo 20
-            print(f"   - {file}")
-        if len(cleaned) > 20:
-            print(f"   ... e mais {len(cleaned) - 20} arquivos")
+        # Relatório final
+        print(f"\n✅ Limpeza concluída!")
+        print(f"   📁 {len(deleted)} arquivo(s) deletado(s)")
+        print(f"   📝 {len(cleaned)} arquivo(s) limpo(s)")
+        
+        if cleaned:
+            print("\n📝 Arquivos modificados:")
+            for file in cleaned[:20]:  # Mostrar no máximo 20
+                print(f"   - {file}")
+            if len(cleaned) > 20:
+                print(f"   ... e mais {len(cleaned) - 20} arquivos")
+        
+        report_profile(profile, args)
 
 if __name__ == "__main__":
     main()
-
-
-
-
@@ -53,6 +53,32 @@ export interface DashboardStats {
   }>
 }
 
+// Datas (yyyy-MM-dd) usadas pelos contadores do dashboard
+interface DashboardPeriodo {
+  hoje: string
+  semanaInicio: string
+  semanaFim: string
+  mesInicio: string
+  mesFim: string
+}
+
+// Contadores e totais calculados pela RPC dashboard_kpis (ou pelo fallback)
+interface DashboardContadores {
+  volume_previsto_dia: number
+  volume_bombeado_semana: number
+  faturamento_dia: number
+  faturamento_mes: number
+  colaboradores: number
+  clientes: number
+  relatorios_dia: number
+  relatorios_mes: number
+  notas: DashboardStats['notas']
+  relatorios_por_status: DashboardStats['relatorios_por_status']
+}
+
+// Se a RPC de KPIs (db/migrations/22_dashboard_kpis_rpc.sql) existe no banco
+let rpcKpisDisponivel = true
+
 export class DashboardApi {
   /**
    * Buscar todas as estatísticas do dashboard
@@ -72,18 +98,9 @@ export class DashboardApi {
       const [
         programacaoHojeResult,
         programacaoAmanhaResult,
-        volumePrevistoResult,
-        volumeBombeadoSemanaResult,
-        faturamentoDiaResult,
-        faturamentoMesResult,
-        colaboradoresResult,
+        contadores,
         colaboradoresCostsResult,
-        clientesResult,
-        relatoriosDiaResult,
-        relatoriosMesResult,
-        notasResult,
-        financialStatsResult,
-        relatoriosPorStatusResult
+        financialStatsResult
       ] = await Promise.all([
         // Programação de hoje
         this.getProgramacaoDia(today),
@@ -91,45 +108,23 @@ export class DashboardApi {
         // Programação de amanhã
         this.getProgramacaoDia(tomorrow),
         
-        
-        // Volume previsto do dia
-        this.getVolumePrevistoDia(today),
-        
-        // Volume bombeado da semana
-        this.getVolumeBombeadoSemana(startOfCurrentWeek, endOfCurrentWeek),
-        
-        // Faturamento do dia
-        this.getFaturamentoDia(today),
-        
-        // Faturamento do mês
-        this.getFaturamentoMes(startOfCurrentMonth, endOfCurrentMonth),
-        
-        // Colaboradores ativos
-        this.getColaboradoresAtivos(),
+        // Volumes, faturamento, contagens, notas e relatórios por status (uma RPC)
+        this.getContadores({
+          hoje: today,
+          semanaInicio: startOfCurrentWeek,
+          semanaFim: endOfCurrentWeek,
+          mesInicio: startOfCurrentMonth,
+          mesFim: endOfCurrentMonth
+        }),
         
         // Custos de colaboradores
         getColaboradoresCosts(),
         
-        // Clientes ativos
-        this.getClientesAtivos(),
-        
-        // Relatórios do dia
-        this.getRelatoriosDia(today),
-        
-        // Relatórios do mês
-        this.getRelatoriosMes(startOfCurrentMonth, endOfCurrentMonth),
-        
-        // Notas fiscais
-        this.getNotasFiscais(startOfCurrentMonth, endOfCurrentMonth),
-        
         // Estatísticas financeiras do mês atual
         getFinancialStats({
           data_inicio: startOfCurrentMonth,
           data_fim: endOfCurrentMonth
-        }),
-        
-        // Relatórios por status
-        this.getRelatoriosPorStatus()
+        })
       ])
       
       console.log('📊 [DashboardAPI] Resultados:', {
@@ -140,19 +135,19 @@ export class DashboardApi {
       return {
         programacao_hoje: programacaoHojeResult,
         programacao_amanha: programacaoAmanhaResult,
-        volume_previsto_dia: volumePrevistoResult,
-        volume_bombeado_semana: volumeBombeadoSemanaResult,
-        faturamento_dia: faturamentoDiaResult,
-        faturamento_mes: faturamentoMesResult,
-        colaboradores: colaboradoresResult,
-        clientes: clientesResult,
+        volume_previsto_dia: contadores.volume_previsto_dia,
+        volume_bombeado_semana: contadores.volume_bombeado_semana,
+        faturamento_dia: contadores.faturamento_dia,
+        faturamento_mes: contadores.faturamento_mes,
+        colaboradores: contadores.colaboradores,
+        clientes: contadores.clientes,
         relatorios: {
-          dia: relatoriosDiaResult,
-          mes: relatoriosMesResult
+          dia: contadores.relatorios_dia,
+          mes: contadores.relatorios_mes
         },
-        notas: notasResult,
+        notas: contadores.notas,
         financeiro: {
-          entradas: faturamentoMesResult, // Usar faturamento como entradas
+          entradas: contadores.faturamento_mes, // Usar faturamento como entradas
           saidas: financialStatsResult.total_despesas,
           total_despesas_mes: financialStatsResult.total_despesas,
           despesas_por_categoria: financialStatsResult.total_por_categoria,
@@ -163,7 +158,7 @@ export class DashboardApi {
           },
           proximas_despesas: await this.getProximasDespesas()
         },
-        relatorios_por_status: relatoriosPorStatusResult
+        relatorios_por_status: contadores.relatorios_por_status
       }
     } catch (error) {
       console.error('Erro ao buscar estatísticas do dashboard:', error)
@@ -171,6 +166,92 @@ export class DashboardApi {
     }
   }
 
+  /**
+   * Contadores e totais do dashboard agregados no servidor (RPC dashboard_kpis)
+   * Se a função não estiver instalada no banco, calcula no cliente
+   */
+  private static async getContadores(periodo: DashboardPeriodo): Promise<DashboardContadores> {
+    if (!rpcKpisDisponivel) return this.getContadoresFallback(periodo)
+
+    try {
+      const { data, error } = await supabase.rpc('dashboard_kpis', {
+        p_hoje: periodo.hoje,
+        p_semana_inicio: periodo.semanaInicio,
+        p_semana_fim: periodo.semanaFim,
+        p_mes_inicio: periodo.mesInicio,
+        p_mes_fim: periodo.mesFim
+      })
+
+      if (error) {
+        // Função ainda não criada (migração 22) ou incompatível com o schema
+        // (tabela/coluna ausente): não tentar de novo nesta sessão
+        if (['PGRST202', '42P01', '42703'].includes(error.code)) rpcKpisDisponivel = false
+        throw error
+      }
+
+      return {
+        volume_previsto_dia: Number(data?.volume_previsto_dia) || 0,
+        volume_bombeado_semana: Number(data?.volume_bombeado_semana) || 0,
+        faturamento_dia: Number(data?.faturamento_dia) || 0,
+        faturamento_mes: Number(data?.faturamento_mes) || 0,
+        colaboradores: Number(data?.colaboradores) || 0,
+        clientes: Number(data?.clientes) || 0,
+        relatorios_dia: Number(data?.relatorios_dia) || 0,
+        relatorios_mes: Number(data?.relatorios_mes) || 0,
+        notas: {
+          quantidade: Number(data?.notas?.quantidade) || 0,
+          valor_total: Number(data?.notas?.valor_total) || 0
+        },
+        relatorios_por_status: this.montarRelatoriosPorStatus(data?.relatorios_por_status || [])
+      }
+    } catch (error) {
+      console.warn('⚠️ [DashboardAPI] KPIs do servidor indisponíveis, calculando no cliente:', error)
+      return this.getContadoresFallback(periodo)
+    }
+  }
+
+  /**
+   * Método fallback para os contadores: uma consulta por indicador
+   */
+  private static async getContadoresFallback(periodo: DashboardPeriodo): Promise<DashboardContadores> {
+    const [
+      volumePrevistoResult,
+      volumeBombeadoSemanaResult,
+      faturamentoDiaResult,
+      faturamentoMesResult,
+      colaboradoresResult,
+      clientesResult,
+      relatoriosDiaResult,
+      relatoriosMesResult,
+      notasResult,
+      relatoriosPorStatusResult
+    ] = await Promise.all([
+      this.getVolumePrevistoDia(periodo.hoje),
+      this.getVolumeBombeadoSemana(periodo.semanaInicio, periodo.semanaFim),
+      this.getFaturamentoDia(periodo.hoje),
+      this.getFaturamentoMes(periodo.mesInicio, periodo.mesFim),
+      this.getColaboradoresAtivos(),
+      this.getClientesAtivos(),
+      this.getRelatoriosDia(periodo.hoje),
+      this.getRelatoriosMes(periodo.mesInicio, periodo.mesFim),
+      this.getNotasFiscais(periodo.mesInicio, periodo.mesFim),
+      this.getRelatoriosPorStatus()
+    ])
+
+    return {
+      volume_previsto_dia: volumePrevistoResult,
+      volume_bombeado_semana: volumeBombeadoSemanaResult,
+      faturamento_dia: faturamentoDiaResult,
+      faturamento_mes: faturamentoMesResult,
+      colaboradores: colaboradoresResult,
+      clientes: clientesResult,
+      relatorios_dia: relatoriosDiaResult,
+      relatorios_mes: relatoriosMesResult,
+      notas: notasResult,
+      relatorios_por_status: relatoriosPorStatusResult
+    }
+  }
+
   /**
    * Buscar programação de um dia específico
    */
@@ -480,60 +561,74 @@ export class DashboardApi {
       if (error) throw error
 
       // Agrupar por status
-      const statusMap = new Map<string, { quantidade: number; valor_total: number }>()
-      
-      // Inicializar todos os status possíveis
-      const allStatuses = [
-        'ENVIADO_FINANCEIRO',
-        'RECEBIDO_FINANCEIRO', 
-        'AGUARDANDO_APROVACAO',
-        'NOTA_EMITIDA',
-        'AGUARDANDO_PAGAMENTO',
-        'PAGO'
-      ]
-
-      allStatuses.forEach(status => {
-        statusMap.set(status, { quantidade: 0, valor_total: 0 })
-      })
-
-      // Processar dados
+      const porStatus = new Map<string, { status: string; quantidade: number; valor_total: number }>()
       data?.forEach(report => {
-        const status = report.status
-        const valor = Number(report.total_value) || 0
-        
-        if (statusMap.has(status)) {
-          const current = statusMap.get(status)!
-          statusMap.set(status, {
-            quantidade: current.quantidade + 1,
-            valor_total: current.valor_total + valor
-          })
-        }
+        const current = porStatus.get(report.status) || { status: report.status, quantidade: 0, valor_total: 0 }
+        current.quantidade += 1
+        current.valor_total += Number(report.total_value) || 0
+        porStatus.set(report.status, current)
       })
 
-      // Converter para array e adicionar "Todos"
-      const result = Array.from(statusMap.entries()).map(([status, data]) => ({
-        status,
-        quantidade: data.quantidade,
-        valor_total: data.valor_total
-      }))
-
-      // Adicionar card "Todos"
-      const totalQuantidade = result.reduce((sum, item) => sum + item.quantidade, 0)
-      const totalValor = result.reduce((sum, item) => sum + item.valor_total, 0)
-      
-      result.unshift({
-        status: 'TODOS',
-        quantidade: totalQuantidade,
-        valor_total: totalValor
-      })
-
-      return result
+      return this.montarRelatoriosPorStatus(Array.from(porStatus.values()))
     } catch (error) {
       console.error('Erro ao buscar relatórios por status:', error)
       return []
     }
   }
 
+  /**
+   * Cards de relatórios por status a partir dos totais agrupados
+   * (todos os status conhecidos, mesmo zerados, mais o card "Todos")
+   */
+  private static montarRelatoriosPorStatus(
+    grupos: Array<{ status: string; quantidade: number; valor_total: number }>
+  ): DashboardStats['relatorios_por_status'] {
+    const statusMap = new Map<string, { quantidade: number; valor_total: number }>()
+    
+    // Inicializar todos os status possíveis
+    const allStatuses = [
+      'ENVIADO_FINANCEIRO',
+      'RECEBIDO_FINANCEIRO', 
+      'AGUARDANDO_APROVACAO',
+      'NOTA_EMITIDA',
+      'AGUARDANDO_PAGAMENTO',
+      'PAGO'
+    ]
+
+    allStatuses.forEach(status => {
+      statusMap.set(status, { quantidade: 0, valor_total: 0 })
+    })
+
+    // Processar grupos
+    grupos.forEach(grupo => {
+      if (statusMap.has(grupo.status)) {
+        statusMap.set(grupo.status, {
+          quantidade: Number(grupo.quantidade) || 0,
+          valor_total: Number(grupo.valor_total) || 0
+        })
+      }
+    })
+
+    // Converter para array e adicionar "Todos"
+    const result = Array.from(statusMap.entries()).map(([status, data]) => ({
+      status,
+      quantidade: data.quantidade,
+      valor_total: data.valor_total
+    }))
+
+    // Adicionar card "Todos"
+    const totalQuantidade = result.reduce((sum, item) => sum + item.quantidade, 0)
+    const totalValor = result.reduce((sum, item) => sum + item.valor_total, 0)
+    
+    result.unshift({
+      status: 'TODOS',
+      quantidade: totalQuantidade,
+      valor_total: totalValor
+    })
+
+    return result
+  }
+
   /**
    * Buscar próximas despesas (próximos 7 dias)
    */
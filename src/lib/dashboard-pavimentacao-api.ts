@@ -1,4 +1,5 @@
 import { supabase } from './supabase'
+import { RelationLoader } from './relation-loader'
 import { format, addDays, startOfMonth, endOfMonth } from 'date-fns'
 import type { 
   DashboardKPIs, 
@@ -18,6 +19,9 @@ const USE_MOCK = false
 // Timezone do projeto
 const TIMEZONE = 'America/Sao_Paulo'
 
+// Se a RPC de KPIs (db/migrations/22_dashboard_kpis_rpc.sql) existe no banco
+let rpcKpisDisponivel = true
+
 /**
  * Converte uma data UTC para o timezone de São Paulo
  * São Paulo = UTC-3 (ou UTC-2 no horário de verão, mas usando UTC-3 fixo)
@@ -46,6 +50,25 @@ function fromSaoPauloTime(dateStr: string, timeStr: string): Date {
   return localDate
 }
 
+/**
+ * Carregadores em lote das tabelas relacionadas às programações
+ * Um conjunto por requisição: as linhas de obras, clientes e ruas ficam
+ * em cache só durante ela
+ */
+export interface ProgramacaoLoaders {
+  obras: RelationLoader<{ id: string; name: string; client_id: string | null }>
+  clients: RelationLoader<{ id: string; name: string }>
+  ruas: RelationLoader<{ id: string; name: string }>
+}
+
+export function createProgramacaoLoaders(): ProgramacaoLoaders {
+  return {
+    obras: new RelationLoader('obras', 'name, client_id'),
+    clients: new RelationLoader('clients', 'name'),
+    ruas: new RelationLoader('obras_ruas', 'name', { excludeDeleted: true })
+  }
+}
+
 /**
  * API para Dashboard de Pavimentação
  * Foco exclusivo em pavimentação asfáltica (não bombas de concreto)
@@ -65,26 +88,27 @@ export class DashboardPavimentacaoApi {
       const mesInicio = format(startOfMonth(new Date()), 'yyyy-MM-dd')
       const mesFim = format(endOfMonth(new Date()), 'yyyy-MM-dd')
 
+      // Obras, clientes e ruas das três listas de programação saem das mesmas consultas
+      const loaders = createProgramacaoLoaders()
+
       const [
-        kpis, 
+        [kpis, alertas],
         proximaProgramacao, 
         programacoesHoje, 
         programacoesAmanha,
         maiorRuaDia,
         ultimasDiarias,
         topRuasFaturamento,
-        maquinariosMaisUsados,
-        alertas
+        maquinariosMaisUsados
       ] = await Promise.all([
-        this.getKPIs(),
-        this.getProximaProgramacao(),
-        this.getProgramacaoHoje(),
-        this.getProgramacaoAmanha(),
+        this.getKPIsEAlertas(),
+        this.getProximaProgramacao(loaders),
+        this.getProgramacaoHoje(loaders),
+        this.getProgramacaoAmanha(loaders),
         this.getMaiorRuaDia(hoje),
         this.getUltimasDiarias(5),
         this.getTopRuasFaturamento(mesInicio, mesFim, 5),
-        this.getMaquinariosMaisUsados(mesInicio, mesFim, 5),
-        this.getAlertas()
+        this.getMaquinariosMaisUsados(mesInicio, mesFim, 5)
       ])
 
       return {
@@ -306,10 +330,69 @@ export class DashboardPavimentacaoApi {
     }
   }
 
+  /**
+   * KPIs e alertas agregados no servidor (RPC dashboard_pavimentacao_kpis)
+   * Retorna null se a função não estiver instalada no banco
+   */
+  private static async getResumoServidor(): Promise<{ kpis: DashboardKPIs; alertas: Alerta[] } | null> {
+    if (!rpcKpisDisponivel) return null
+
+    const agora = new Date()
+
+    try {
+      const { data, error } = await supabase.rpc('dashboard_pavimentacao_kpis', {
+        p_hoje: format(agora, 'yyyy-MM-dd'),
+        p_mes_inicio: format(startOfMonth(agora), 'yyyy-MM-dd'),
+        p_mes_fim: format(endOfMonth(agora), 'yyyy-MM-dd')
+      })
+
+      if (error) {
+        // Função ainda não criada (migração 22) ou incompatível com o schema
+        // (tabela/coluna ausente): não tentar de novo nesta sessão
+        if (['PGRST202', '42P01', '42703'].includes(error.code)) rpcKpisDisponivel = false
+        throw error
+      }
+
+      const kpis = data?.kpis || {}
+      return {
+        kpis: {
+          programacao_hoje: Number(kpis.programacao_hoje) || 0,
+          programacao_amanha: Number(kpis.programacao_amanha) || 0,
+          faturamento_mes: Number(kpis.faturamento_mes) || 0,
+          despesas_mes: Number(kpis.despesas_mes) || 0,
+          metragem_mes: Number(kpis.metragem_mes) || 0,
+          toneladas_mes: Number(kpis.toneladas_mes) || 0
+        },
+        alertas: data?.alertas || []
+      }
+    } catch (error) {
+      console.warn('KPIs do servidor indisponíveis, calculando no cliente:', error)
+      return null
+    }
+  }
+
+  /**
+   * KPIs e alertas com uma única chamada RPC (ou o cálculo no cliente, se ela falhar)
+   */
+  private static async getKPIsEAlertas(): Promise<[DashboardKPIs, Alerta[]]> {
+    const resumo = await this.getResumoServidor()
+    if (resumo) return [resumo.kpis, resumo.alertas]
+
+    return Promise.all([this.getKPIsFallback(), this.getAlertasFallback()])
+  }
+
   /**
    * Buscar todos os KPIs do dashboard
    */
   static async getKPIs(): Promise<DashboardKPIs> {
+    const resumo = await this.getResumoServidor()
+    return resumo ? resumo.kpis : this.getKPIsFallback()
+  }
+
+  /**
+   * Método fallback para os KPIs: soma as linhas no cliente
+   */
+  private static async getKPIsFallback(): Promise<DashboardKPIs> {
     // Usar horário local (já está em São Paulo no browser)
     const agora = new Date()
     
@@ -371,23 +454,30 @@ export class DashboardPavimentacaoApi {
   /**
    * Buscar programações de hoje
    */
-  static async getProgramacaoHoje(): Promise<ProgramacaoItem[]> {
+  static async getProgramacaoHoje(
+    loaders: ProgramacaoLoaders = createProgramacaoLoaders()
+  ): Promise<ProgramacaoItem[]> {
     const today = format(new Date(), 'yyyy-MM-dd')
-    return this.getProgramacoesDia(today)
+    return this.getProgramacoesDia(today, loaders)
   }
 
   /**
    * Buscar programações de amanhã
    */
-  static async getProgramacaoAmanha(): Promise<ProgramacaoItem[]> {
+  static async getProgramacaoAmanha(
+    loaders: ProgramacaoLoaders = createProgramacaoLoaders()
+  ): Promise<ProgramacaoItem[]> {
     const tomorrow = format(addDays(new Date(), 1), 'yyyy-MM-dd')
-    return this.getProgramacoesDia(tomorrow)
+    return this.getProgramacoesDia(tomorrow, loaders)
   }
 
   /**
    * Buscar programações de um dia específico
    */
-  private static async getProgramacoesDia(data: string): Promise<ProgramacaoItem[]> {
+  private static async getProgramacoesDia(
+    data: string,
+    loaders: ProgramacaoLoaders = createProgramacaoLoaders()
+  ): Promise<ProgramacaoItem[]> {
     try {
       const { data: programacoes, error } = await supabase
         .from('programacao_pavimentacao')
@@ -407,48 +497,13 @@ export class DashboardPavimentacaoApi {
 
       if (error) throw error
 
-      // Buscar nomes de clientes e obras
+      // Buscar nomes de clientes, obras e ruas (em lote: uma consulta por tabela)
       const programacoesComDetalhes = await Promise.all(
         (programacoes || []).map(async (prog) => {
-          let cliente_nome = 'Cliente não informado'
-          let obra_nome = 'Obra não informada'
-
-          // Buscar obra e cliente
-          if (prog.obra_id) {
-            const { data: obra } = await supabase
-              .from('obras')
-              .select('name, client_id')
-              .eq('id', prog.obra_id)
-              .single()
-            
-            if (obra) {
-              obra_nome = obra.name
-              
-              // Buscar cliente
-              if (obra.client_id) {
-                const { data: cliente } = await supabase
-                  .from('clients')
-                  .select('name')
-                  .eq('id', obra.client_id)
-                  .single()
-                
-                if (cliente) cliente_nome = cliente.name
-              }
-            }
-          }
-
-          // Buscar rua
-          let rua_nome = 'Rua não informada'
-          if (prog.rua_id) {
-            const { data: rua } = await supabase
-              .from('obras_ruas')
-              .select('name')
-              .eq('id', prog.rua_id)
-              .is('deleted_at', null)
-              .single()
-            
-            if (rua) rua_nome = rua.name
-          }
+          const nomes = await this.getNomesProgramacao(prog, loaders)
+          const cliente_nome = nomes.cliente || 'Cliente não informado'
+          const obra_nome = nomes.obra || 'Obra não informada'
+          const rua_nome = nomes.rua || 'Rua não informada'
 
           return {
             id: prog.id,
@@ -473,10 +528,28 @@ export class DashboardPavimentacaoApi {
     }
   }
 
+  /**
+   * Nomes da obra, do cliente e da rua de uma programação, pelos carregadores em lote
+   */
+  private static async getNomesProgramacao(
+    prog: { obra_id?: string | null; rua_id?: string | null },
+    loaders: ProgramacaoLoaders
+  ): Promise<{ obra?: string; cliente?: string; rua?: string }> {
+    const [obra, rua] = await Promise.all([
+      loaders.obras.load(prog.obra_id),
+      loaders.ruas.load(prog.rua_id)
+    ])
+    const cliente = await loaders.clients.load(obra?.client_id)
+
+    return { obra: obra?.name, cliente: cliente?.name, rua: rua?.name }
+  }
+
   /**
    * Buscar próxima programação com contagem regressiva
    */
-  static async getProximaProgramacao(): Promise<ProximaProgramacao | null> {
+  static async getProximaProgramacao(
+    loaders: ProgramacaoLoaders = createProgramacaoLoaders()
+  ): Promise<ProximaProgramacao | null> {
     try {
       // Usar horário local do browser (São Paulo)
       const agora = new Date()
@@ -554,45 +627,11 @@ export class DashboardPavimentacaoApi {
         tempoRestante = dias === 1 ? '1 dia' : `${dias} dias`
       }
 
-      // Buscar detalhes do cliente e obra
-      let cliente_nome = 'Cliente não especificado'
-      let obra_nome = 'Obra não especificada'
-      let rua_nome = 'Rua não especificada'
-
-      if (proximaProg.obra_id) {
-        const { data: obra } = await supabase
-          .from('obras')
-          .select('name, client_id')
-          .eq('id', proximaProg.obra_id)
-          .single()
-        
-        if (obra) {
-          obra_nome = obra.name
-          
-          // Buscar cliente
-          if (obra.client_id) {
-            const { data: cliente } = await supabase
-              .from('clients')
-              .select('name')
-              .eq('id', obra.client_id)
-              .single()
-            
-            if (cliente) cliente_nome = cliente.name
-          }
-        }
-      }
-
-      // Buscar rua
-      if (proximaProg.rua_id) {
-        const { data: rua } = await supabase
-          .from('obras_ruas')
-          .select('name')
-          .eq('id', proximaProg.rua_id)
-          .is('deleted_at', null)
-          .single()
-        
-        if (rua) rua_nome = rua.name
-      }
+      // Buscar detalhes do cliente, obra e rua
+      const nomes = await this.getNomesProgramacao(proximaProg, loaders)
+      const cliente_nome = nomes.cliente || 'Cliente não especificado'
+      const obra_nome = nomes.obra || 'Obra não especificada'
+      const rua_nome = nomes.rua || 'Rua não especificada'
 
       const endereco_completo = rua_nome
 
@@ -876,6 +915,14 @@ export class DashboardPavimentacaoApi {
    * 🚨 Buscar alertas e pendências
    */
   static async getAlertas(): Promise<Alerta[]> {
+    const resumo = await this.getResumoServidor()
+    return resumo ? resumo.alertas : this.getAlertasFallback()
+  }
+
+  /**
+   * Método fallback para os alertas: uma consulta por tipo de alerta
+   */
+  private static async getAlertasFallback(): Promise<Alerta[]> {
     try {
       const hoje = format(new Date(), 'yyyy-MM-dd')
       const proximos30Dias = format(addDays(new Date(), 30), 'yyyy-MM-dd')
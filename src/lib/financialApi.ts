@@ -6,7 +6,9 @@ import type {
   UpdateExpenseData, 
   ExpenseFilters, 
   FinancialStats, 
-  PaginatedExpenses,
+  ExpenseView,
+  ExpenseCursor,
+  ExpensePage,
   InvoiceIntegration
 } from '../types/financial';
 
@@ -271,31 +273,47 @@ export async function getVolumeMensalComBombas(filters?: any) {
 // FUNÇÕES DE DESPESAS
 // ============================================================================
 
+// Colunas buscadas por visão: a listagem não precisa de observações, combustível etc.
+const EXPENSE_COLUMNS: Record<ExpenseView, string> = {
+  list: `
+    id,
+    descricao,
+    categoria,
+    valor,
+    tipo_custo,
+    tipo_transacao,
+    data_despesa,
+    status,
+    pump_id,
+    company_id,
+    relatorio_id,
+    pumps: pump_id (
+      prefix
+    ),
+    companies: company_id (
+      name
+    )
+  `,
+  detail: `
+    *,
+    pumps: pump_id (
+      prefix,
+      model,
+      brand
+    ),
+    companies: company_id (
+      name
+    ),
+    notas_fiscais: nota_fiscal_id (
+      numero_nota
+    )
+  `
+};
+
 /**
- * Busca todas as despesas com filtros opcionais
+ * Aplica os filtros de despesas a uma consulta de expenses
  */
-export async function getExpenses(filters?: ExpenseFilters): Promise<ExpenseWithRelations[]> {
-  console.log('🔍 [getExpenses] Aplicando filtros:', filters);
-  
-  let query = supabase
-    .from('expenses')
-    .select(`
-      *,
-      pumps: pump_id (
-        prefix,
-        model,
-        brand
-      ),
-      companies: company_id (
-        name
-      ),
-      notas_fiscais: nota_fiscal_id (
-        numero_nota
-      )
-    `)
-    .order('data_despesa', { ascending: false });
-
-  // Aplicar filtros
+function applyExpenseFilters(query: any, filters?: ExpenseFilters) {
   if (filters?.company_id) {
     console.log('🏢 [getExpenses] Filtrando por empresa:', filters.company_id);
     query = query.eq('company_id', filters.company_id);
@@ -341,92 +359,99 @@ export async function getExpenses(filters?: ExpenseFilters): Promise<ExpenseWith
     query = query.ilike('descricao', `%${filters.search}%`);
   }
 
-  const { data, error } = await query;
-
-  if (error) {
-    console.error('❌ [getExpenses] Erro ao buscar despesas:', error);
-    throw new Error('Erro ao buscar despesas');
-  }
-
-  console.log('✅ [getExpenses] Despesas encontradas:', data?.length || 0, 'itens');
+  return query;
+}
 
-  // Transformar dados para incluir relações
-  return (data || []).map(expense => ({
+/**
+ * Achata as relações da despesa nos campos calculados
+ */
+function withExpenseRelations(expense: any): ExpenseWithRelations {
+  return {
     ...expense,
     bomba_model: expense.pumps?.model,
     bomba_brand: expense.pumps?.brand,
     company_name: expense.companies?.name,
     nota_fiscal_numero: expense.notas_fiscais?.numero_nota
-  }));
+  };
 }
 
 /**
- * Busca despesas com paginação
+ * Busca todas as despesas com filtros opcionais
  */
-export async function getExpensesPaginated(
-  page: number = 1,
-  limit: number = 10,
-  filters?: ExpenseFilters
-): Promise<PaginatedExpenses> {
-  const offset = (page - 1) * limit;
-
-  // Primeiro, contar o total
-  let countQuery = supabase
-    .from('expenses')
-    .select('*', { count: 'exact', head: true });
-
-  // Aplicar mesmos filtros para contagem
-  if (filters?.company_id) {
-    countQuery = countQuery.eq('company_id', filters.company_id);
-  }
-
-  if (filters?.pump_id) {
-    countQuery = countQuery.eq('pump_id', filters.pump_id);
-  }
-
-  if (filters?.categoria && filters.categoria.length > 0) {
-    countQuery = countQuery.in('categoria', filters.categoria);
-  }
+export async function getExpenses(
+  filters?: ExpenseFilters,
+  view: ExpenseView = 'detail'
+): Promise<ExpenseWithRelations[]> {
+  console.log('🔍 [getExpenses] Aplicando filtros:', filters);
+  
+  const query = applyExpenseFilters(
+    supabase
+      .from('expenses')
+      .select(EXPENSE_COLUMNS[view])
+      .order('data_despesa', { ascending: false })
+      .order('id', { ascending: false }),
+    filters
+  );
 
-  if (filters?.tipo_custo && filters.tipo_custo.length > 0) {
-    countQuery = countQuery.in('tipo_custo', filters.tipo_custo);
-  }
+  const { data, error } = await query;
 
-  if (filters?.status && filters.status.length > 0) {
-    countQuery = countQuery.in('status', filters.status);
+  if (error) {
+    console.error('❌ [getExpenses] Erro ao buscar despesas:', error);
+    throw new Error('Erro ao buscar despesas');
   }
 
-  if (filters?.data_inicio) {
-    countQuery = countQuery.gte('data_despesa', filters.data_inicio);
-  }
+  console.log('✅ [getExpenses] Despesas encontradas:', data?.length || 0, 'itens');
 
-  if (filters?.data_fim) {
-    countQuery = countQuery.lte('data_despesa', filters.data_fim);
-  }
+  // Transformar dados para incluir relações
+  return (data || []).map(withExpenseRelations);
+}
 
-  if (filters?.search) {
-    countQuery = countQuery.ilike('descricao', `%${filters.search}%`);
+/**
+ * Busca uma página de despesas por cursor (keyset)
+ *
+ * A listagem é ordenada por (data_despesa, id) decrescentes e cada página
+ * começa depois do último item da anterior (`nextCursor`), em vez de pular
+ * linhas com offset: com os índices de 25_expenses_keyset_indexes.sql,
+ * a página N custa o mesmo que a primeira.
+ */
+export async function getExpensesPaginated(
+  limit: number = 10,
+  cursor: ExpenseCursor | null = null,
+  filters?: ExpenseFilters,
+  view: ExpenseView = 'list'
+): Promise<ExpensePage> {
+  let query = applyExpenseFilters(
+    supabase
+      .from('expenses')
+      .select(EXPENSE_COLUMNS[view])
+      .order('data_despesa', { ascending: false })
+      .order('id', { ascending: false }),
+    filters
+  );
+
+  if (cursor) {
+    query = query.or(
+      `data_despesa.lt.${cursor.data_despesa},and(data_despesa.eq.${cursor.data_despesa},id.lt.${cursor.id})`
+    );
   }
 
-  const { count, error: countError } = await countQuery;
+  // Um item a mais só para saber se existe próxima página
+  const { data, error } = await query.limit(limit + 1);
 
-  if (countError) {
-    console.error('Erro ao contar despesas:', countError);
-    throw new Error('Erro ao contar despesas');
+  if (error) {
+    console.error('❌ [getExpensesPaginated] Erro ao buscar despesas:', error);
+    throw new Error('Erro ao buscar despesas');
   }
 
-  // Buscar dados paginados
-  const data = await getExpenses(filters);
-  const paginatedData = data.slice(offset, offset + limit);
+  const rows = data || [];
+  const expenses = rows.slice(0, limit).map(withExpenseRelations);
+  const last = expenses[expenses.length - 1];
 
   return {
-    data: paginatedData,
-    pagination: {
-      page,
-      limit,
-      total: count || 0,
-      totalPages: Math.ceil((count || 0) / limit)
-    }
+    expenses,
+    nextCursor: rows.length > limit && last
+      ? { data_despesa: last.data_despesa, id: last.id }
+      : null
   };
 }
 
@@ -436,20 +461,7 @@ export async function getExpensesPaginated(
 export async function getExpenseById(id: string): Promise<ExpenseWithRelations | null> {
   const { data, error } = await supabase
     .from('expenses')
-    .select(`
-      *,
-      pumps: pump_id (
-        prefix,
-        model,
-        brand
-      ),
-      companies: company_id (
-        name
-      ),
-      notas_fiscais: nota_fiscal_id (
-        numero_nota
-      )
-    `)
+    .select(EXPENSE_COLUMNS.detail)
     .eq('id', id)
     .single();
 
@@ -461,13 +473,7 @@ export async function getExpenseById(id: string): Promise<ExpenseWithRelations |
     throw new Error('Erro ao buscar despesa');
   }
 
-  return {
-    ...data,
-    bomba_model: data.pumps?.model,
-    bomba_brand: data.pumps?.brand,
-    company_name: data.companies?.name,
-    nota_fiscal_numero: data.notas_fiscais?.numero_nota
-  };
+  return withExpenseRelations(data);
 }
 
 /**
@@ -763,24 +769,61 @@ export async function createFaturamentoFromReport(
   return createExpense(faturamentoData);
 }
 
+// Entradas gravadas por chamada na sincronização em lote
+const SYNC_BATCH_SIZE = 500;
+
+// Código do Postgres quando não há constraint única para o ON CONFLICT do upsert
+const NO_UNIQUE_CONSTRAINT = '42P10';
+
 /**
- * Sincroniza todos os relatórios pagos como entradas de faturamento
+ * Relatório pago ainda sem entrada de faturamento
+ * (linha da view reports_pagos_sem_faturamento)
  */
-export async function syncFaturamentoFromReports(): Promise<{ created: number; errors: string[] }> {
-  try {
-    console.log('🔄 [syncFaturamentoFromReports] Iniciando sincronização de faturamento...');
-    
-    // Buscar todos os relatórios pagos que ainda não têm entrada de faturamento
-    const { data: reports, error } = await supabase
+interface RelatorioPagoSemFaturamento {
+  id: string;
+  report_number: string | null;
+  total_value: number | null;
+  date: string;
+  pump_id: string | null;
+  client_id: string | null;
+  pump_company_id: string | null;
+  client_company_name: string | null;
+}
+
+/**
+ * Busca os relatórios pagos que ainda não têm entrada de faturamento
+ * Usa a view de anti-join (db/migrations/24_faturamento_sync_bulk.sql).
+ * viaView indica se a migração 24 está aplicada: a view e a constraint
+ * única usada pelo upsert são criadas juntas.
+ */
+async function getRelatoriosPagosSemFaturamento(): Promise<{ reports: RelatorioPagoSemFaturamento[]; viaView: boolean }> {
+  const { data, error } = await supabase
+    .from('reports_pagos_sem_faturamento')
+    .select('id, report_number, total_value, date, pump_id, client_id, pump_company_id, client_company_name');
+
+  if (!error) {
+    return { reports: data || [], viaView: true };
+  }
+
+  console.warn('⚠️ [syncFaturamentoFromReports] View de anti-join indisponível, usando método fallback:', error);
+  return { reports: await getRelatoriosPagosSemFaturamentoFallback(), viaView: false };
+}
+
+/**
+ * Método fallback: relatórios pagos menos os que já têm entrada, comparados no cliente
+ */
+async function getRelatoriosPagosSemFaturamentoFallback(): Promise<RelatorioPagoSemFaturamento[]> {
+  const [reportsResult, entriesResult] = await Promise.all([
+    supabase
       .from('reports')
       .select(`
         id,
         report_number,
         total_value,
         date,
+        pump_id,
         client_id,
         pumps: pump_id (
-          prefix,
           company_id
         ),
         clients: client_id (
@@ -790,46 +833,120 @@ export async function syncFaturamentoFromReports(): Promise<{ created: number; e
         )
       `)
       .eq('status', 'PAGO')
-      .not('total_value', 'is', null);
+      .not('total_value', 'is', null),
+    supabase
+      .from('expenses')
+      .select('relatorio_id')
+      .eq('tipo_transacao', 'Entrada')
+      .not('relatorio_id', 'is', null)
+  ]);
 
-    if (error) {
-      throw new Error('Erro ao buscar relatórios pagos');
-    }
+  if (reportsResult.error) {
+    throw new Error('Erro ao buscar relatórios pagos');
+  }
 
-    if (!reports || reports.length === 0) {
-      console.log('⚠️ [syncFaturamentoFromReports] Nenhum relatório pago encontrado');
+  // Sem a lista de entradas existentes, todo relatório pareceria sem faturamento
+  if (entriesResult.error) {
+    throw new Error('Erro ao buscar entradas de faturamento existentes');
+  }
+
+  const existingReportIds = new Set(entriesResult.data?.map(e => e.relatorio_id) || []);
+
+  return (reportsResult.data || [])
+    .filter((report: any) => !existingReportIds.has(report.id))
+    .map((report: any) => ({
+      id: report.id,
+      report_number: report.report_number,
+      total_value: report.total_value,
+      date: report.date,
+      pump_id: report.pump_id,
+      client_id: report.client_id,
+      pump_company_id: report.pumps?.company_id || null,
+      client_company_name: report.clients?.companies?.name || null
+    }));
+}
+
+/**
+ * Monta a linha de expenses da entrada de faturamento de um relatório
+ * Mesmos campos de createFaturamentoFromReport + createExpense; tipo_transacao
+ * é preenchido pelo banco a partir do sinal do valor
+ */
+function buildFaturamentoRow(report: RelatorioPagoSemFaturamento, now: string) {
+  const numero = report.report_number || report.id;
+  return {
+    descricao: `Faturamento - Relatório ${numero}`,
+    categoria: 'Outros',
+    valor: Math.abs(report.total_value || 0),
+    tipo_custo: 'variável',
+    data_despesa: report.date,
+    pump_id: report.pump_id,
+    company_id: report.pump_company_id || report.client_id,
+    status: 'pago',
+    relatorio_id: report.id,
+    observacoes: `Faturamento automático do relatório ${numero} - Cliente: ${report.client_company_name || 'N/A'}`,
+    created_at: now,
+    updated_at: now
+  };
+}
+
+/**
+ * Sincroniza todos os relatórios pagos como entradas de faturamento
+ *
+ * Busca só os relatórios que faltam, monta todas as entradas em memória e
+ * grava em lotes de SYNC_BATCH_SIZE. O upsert ignora relatórios que já têm
+ * entrada (constraint única em relatorio_id + tipo_transacao), então pode
+ * rodar de novo, ou em paralelo, sem duplicar faturamento.
+ *
+ * Método fallback: sem a migração 24 (view ou constraint indisponível) os
+ * lotes são gravados com insert simples do resultado do anti-join feito no
+ * cliente; aí duas sincronizações simultâneas podem duplicar entradas.
+ */
+export async function syncFaturamentoFromReports(): Promise<{ created: number; errors: string[] }> {
+  try {
+    console.log('🔄 [syncFaturamentoFromReports] Iniciando sincronização de faturamento...');
+
+    const { reports, viaView } = await getRelatoriosPagosSemFaturamento();
+
+    if (reports.length === 0) {
+      console.log('⚠️ [syncFaturamentoFromReports] Nenhum relatório pago sem faturamento encontrado');
       return { created: 0, errors: [] };
     }
 
-    console.log(`📊 [syncFaturamentoFromReports] Encontrados ${reports.length} relatórios pagos`);
+    console.log(`📊 [syncFaturamentoFromReports] ${reports.length} relatórios pagos sem faturamento`);
+
+    const now = new Date().toISOString();
+    const rows = reports.map(report => buildFaturamentoRow(report, now));
 
     let created = 0;
     const errors: string[] = [];
-
-    // Verificar quais relatórios já têm entrada de faturamento
-    const { data: existingEntries } = await supabase
-      .from('expenses')
-      .select('relatorio_id')
-      .eq('tipo_transacao', 'Entrada')
-      .not('relatorio_id', 'is', null);
-
-    const existingReportIds = new Set(existingEntries?.map(e => e.relatorio_id) || []);
-
-    // Criar entradas para relatórios que ainda não têm
-    for (const report of reports) {
-      if (existingReportIds.has(report.id)) {
-        continue; // Já existe entrada para este relatório
+    let useUpsert = viaView;
+
+    for (let i = 0; i < rows.length; i += SYNC_BATCH_SIZE) {
+      const batch = rows.slice(i, i + SYNC_BATCH_SIZE);
+
+      let { data, error } = useUpsert
+        ? await supabase
+            .from('expenses')
+            .upsert(batch, { onConflict: 'relatorio_id,tipo_transacao', ignoreDuplicates: true })
+            .select('id')
+        : await supabase.from('expenses').insert(batch).select('id');
+
+      if (error?.code === NO_UNIQUE_CONSTRAINT) {
+        console.warn('⚠️ [syncFaturamentoFromReports] Constraint única indisponível, usando método fallback (insert simples)');
+        useUpsert = false;
+        ({ data, error } = await supabase.from('expenses').insert(batch).select('id'));
       }
 
-      try {
-        await createFaturamentoFromReport(report.id, {});
-        created++;
-        console.log(`✅ [syncFaturamentoFromReports] Criada entrada para relatório ${report.id}`);
-      } catch (error) {
-        const errorMsg = `Erro ao criar entrada para relatório ${report.id}: ${error}`;
+      if (error) {
+        const errorMsg = `Erro ao criar entradas dos relatórios ${i + 1}-${i + batch.length}: ${error.message}`;
         errors.push(errorMsg);
         console.error(`❌ [syncFaturamentoFromReports] ${errorMsg}`);
+        continue;
       }
+
+      // Só as linhas inseridas voltam: as ignoradas já existiam
+      created += data?.length || 0;
+      console.log(`✅ [syncFaturamentoFromReports] Lote ${i / SYNC_BATCH_SIZE + 1}: ${data?.length || 0} entradas criadas`);
     }
 
     console.log(`🎉 [syncFaturamentoFromReports] Sincronização concluída: ${created} entradas criadas, ${errors.length} erros`);
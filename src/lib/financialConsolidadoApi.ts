@@ -43,6 +43,79 @@ export interface DespesaCategoriaValor {
   valor: number
 }
 
+export interface ResumoFinanceiroConsolidado {
+  totalReceitas: number
+  totalDespesas: number
+  lucroLiquido: number
+  saldoAtual: number
+}
+
+// Linha de financeiro_rollup_diario: totais de um dia × obra × categoria
+interface RollupDiario {
+  dia: string
+  obra_id: string | null
+  tipo: 'receita_rua' | 'receita_faturamento' | 'despesa'
+  categoria: string
+  valor: number
+  quantidade: number
+}
+
+// Se a tabela de rollups (db/migrations/23_financeiro_rollups.sql) existe no banco
+let rollupsDisponiveis = true
+
+/**
+ * Busca os totais diários já agrupados (mantidos por triggers no banco)
+ * O RLS da tabela só devolve as linhas da empresa do usuário
+ * Retorna null se a tabela não existir ou a consulta falhar, para usar o cálculo no cliente
+ */
+async function getRollupsDiarios(dataInicio: string, dataFim: string): Promise<RollupDiario[] | null> {
+  if (!rollupsDisponiveis) return null
+
+  const { data, error } = await supabase
+    .from('financeiro_rollup_diario')
+    .select('dia, obra_id, tipo, categoria, valor, quantidade')
+    .gte('dia', dataInicio)
+    .lte('dia', dataFim)
+
+  if (error) {
+    // Tabela ainda não criada (migração 23): não tentar de novo nesta sessão
+    if (error.code === '42P01' || error.code === 'PGRST205') rollupsDisponiveis = false
+    console.warn('⚠️ Rollups financeiros indisponíveis, calculando no cliente:', error)
+    return null
+  }
+
+  return (data || []).map((r: any) => ({ ...r, valor: Number(r.valor) || 0 }))
+}
+
+/**
+ * Soma os rollups de um tipo por dia, em ordem de data
+ */
+function somarRollupsPorDia(rollups: RollupDiario[], tipo: RollupDiario['tipo']): Array<{ data: string; valor: number }> {
+  const mapa = new Map<string, number>()
+  rollups
+    .filter(r => r.tipo === tipo)
+    .forEach(r => mapa.set(r.dia, (mapa.get(r.dia) || 0) + r.valor))
+
+  return Array.from(mapa.entries())
+    .map(([data, valor]) => ({ data, valor }))
+    .sort((a, b) => a.data.localeCompare(b.data))
+}
+
+/**
+ * Despesas por dia e por categoria a partir dos rollups
+ */
+function despesasDosRollups(rollups: RollupDiario[]): { porDia: Array<{ data: string; valor: number }>; porCategoria: DespesaCategoriaValor[] } {
+  const porCategoriaMap = new Map<string, number>()
+  rollups
+    .filter(r => r.tipo === 'despesa')
+    .forEach(r => porCategoriaMap.set(r.categoria, (porCategoriaMap.get(r.categoria) || 0) + r.valor))
+
+  return {
+    porDia: somarRollupsPorDia(rollups, 'despesa'),
+    porCategoria: Array.from(porCategoriaMap.entries()).map(([categoria, valor]) => ({ categoria, valor }))
+  }
+}
+
 /**
  * Busca dados financeiros consolidados da WorldPav para um determinado mês
  * @param mesAno Mês e ano para buscar dados (formato: { mes: 1-12, ano: YYYY })
@@ -198,6 +271,38 @@ export async function getFinancialConsolidado(mesAno: { mes: number; ano: number
   }
 }
 
+/**
+ * Busca só os totais consolidados do mês (receitas, despesas e lucro)
+ * Lê os rollups diários; sem eles, usa getFinancialConsolidado
+ * Receitas: ruas executadas; se não houver, faturamentos formais (mesma regra do consolidado)
+ */
+export async function getResumoFinanceiroConsolidado(mesAno: { mes: number; ano: number }): Promise<ResumoFinanceiroConsolidado> {
+  const dataInicio = `${mesAno.ano}-${String(mesAno.mes).padStart(2, '0')}-01`
+  const ultimoDia = new Date(mesAno.ano, mesAno.mes, 0).getDate()
+  const dataFim = `${mesAno.ano}-${String(mesAno.mes).padStart(2, '0')}-${ultimoDia}`
+
+  const rollups = await getRollupsDiarios(dataInicio, dataFim)
+  if (!rollups) {
+    const { totalReceitas, totalDespesas, lucroLiquido, saldoAtual } = await getFinancialConsolidado(mesAno)
+    return { totalReceitas, totalDespesas, lucroLiquido, saldoAtual }
+  }
+
+  const somar = (tipo: RollupDiario['tipo']) =>
+    rollups.filter(r => r.tipo === tipo).reduce((sum, r) => sum + r.valor, 0)
+  const temRuas = rollups.some(r => r.tipo === 'receita_rua' && r.quantidade > 0)
+
+  const totalReceitas = temRuas ? somar('receita_rua') : somar('receita_faturamento')
+  const totalDespesas = somar('despesa')
+  const lucroLiquido = totalReceitas - totalDespesas
+
+  return {
+    totalReceitas,
+    totalDespesas,
+    lucroLiquido,
+    saldoAtual: lucroLiquido // Por enquanto, saldo = lucro do mês
+  }
+}
+
 export interface ObraDetalhesFinanceiros {
   id: string
   nome: string
@@ -618,6 +723,10 @@ export async function getReceitasPorDia(
   const ultimoDia = new Date(mesAno.ano, mesAno.mes, 0).getDate()
   const dataFim = `${mesAno.ano}-${String(mesAno.mes).padStart(2, '0')}-${ultimoDia}`
 
+  // Rollups diários: uma linha por dia/obra em vez de uma por rua
+  const rollups = await getRollupsDiarios(dataInicio, dataFim)
+  if (rollups) return somarRollupsPorDia(rollups, 'receita_rua')
+
   try {
     // Buscar ruas executadas com obra para pegar preco_por_m2
     const { data: ruas, error } = await supabase
@@ -668,6 +777,10 @@ export async function getDespesasPorDiaECategoria(
   const ultimoDia = new Date(mesAno.ano, mesAno.mes, 0).getDate()
   const dataFim = `${mesAno.ano}-${String(mesAno.mes).padStart(2, '0')}-${ultimoDia}`
 
+  // Rollups diários: uma linha por dia/obra/categoria em vez de uma por despesa
+  const rollups = await getRollupsDiarios(dataInicio, dataFim)
+  if (rollups) return despesasDosRollups(rollups)
+
   try {
     // Buscar APENAS de obras_financeiro_despesas para evitar duplicação
     const { data: despesasObra, error } = await supabase
@@ -720,10 +833,18 @@ export async function getDespesasPorDiaECategoria(
 export async function getSerieReceitasDespesas(
   mesAno: { mes: number; ano: number }
 ): Promise<SerieDiaValor[]> {
-  const [receitas, despesas] = await Promise.all([
-    getReceitasPorDia(mesAno),
-    getDespesasPorDiaECategoria(mesAno)
-  ])
+  const dataInicio = `${mesAno.ano}-${String(mesAno.mes).padStart(2, '0')}-01`
+  const ultimoDia = new Date(mesAno.ano, mesAno.mes, 0).getDate()
+  const dataFim = `${mesAno.ano}-${String(mesAno.mes).padStart(2, '0')}-${ultimoDia}`
+
+  // Uma leitura dos rollups serve receitas e despesas
+  const rollups = await getRollupsDiarios(dataInicio, dataFim)
+  const [receitas, despesas] = rollups
+    ? [somarRollupsPorDia(rollups, 'receita_rua'), despesasDosRollups(rollups)]
+    : await Promise.all([
+      getReceitasPorDia(mesAno),
+      getDespesasPorDiaECategoria(mesAno)
+    ])
 
   const dias = new Set<string>([
     ...receitas.map(r => r.data),
@@ -0,0 +1,107 @@
+import { supabase } from './supabase'
+
+type Row = Record<string, any>
+
+interface Pending<T> {
+  resolve: (row: T | null) => void
+}
+
+interface RelationLoaderOptions {
+  /** Coluna usada na busca (padrão: id) */
+  key?: string
+  /** Ignorar linhas com soft delete (deleted_at preenchido) */
+  excludeDeleted?: boolean
+}
+
+// Máximo de ids por consulta (a lista vai na URL do PostgREST)
+const MAX_IDS_PER_QUERY = 100
+
+/**
+ * Carregador em lote de linhas relacionadas (no estilo DataLoader)
+ *
+ * Em vez de um `.eq('id', x).single()` por linha, as chaves pedidas com
+ * `load()` no mesmo tick são juntadas e buscadas com um único
+ * `.in('id', [...])`. Cada chave é buscada uma vez só por instância: crie
+ * um carregador por requisição (tela/render) para não servir dados velhos.
+ *
+ * Erros de consulta não propagam: a linha volta como `null`, como acontecia
+ * com o `.single()` sem tratamento de erro.
+ */
+export class RelationLoader<T extends Row = Row> {
+  private cache = new Map<string, Promise<T | null>>()
+  private queue = new Map<string, Pending<T>>()
+  private scheduled = false
+  private key: string
+
+  constructor(
+    private table: string,
+    private columns: string,
+    private options: RelationLoaderOptions = {}
+  ) {
+    this.key = options.key || 'id'
+  }
+
+  /**
+   * Linha com a chave informada (ou null se não existir)
+   */
+  load(id: string | null | undefined): Promise<T | null> {
+    if (!id) return Promise.resolve(null)
+
+    const cached = this.cache.get(id)
+    if (cached) return cached
+
+    const promise = new Promise<T | null>((resolve) => {
+      this.queue.set(id, { resolve })
+    })
+    this.cache.set(id, promise)
+
+    if (!this.scheduled) {
+      this.scheduled = true
+      // setTimeout (e não microtask): espera as continuações de await do tick
+      // atual pedirem suas chaves antes de disparar a consulta
+      setTimeout(() => this.dispatch(), 0)
+    }
+    return promise
+  }
+
+  /**
+   * Várias linhas de uma vez, na ordem das chaves
+   */
+  loadMany(ids: Array<string | null | undefined>): Promise<Array<T | null>> {
+    return Promise.all(ids.map((id) => this.load(id)))
+  }
+
+  private async dispatch() {
+    const batch = this.queue
+    this.queue = new Map()
+    this.scheduled = false
+
+    const ids = [...batch.keys()]
+    const rows = new Map<string, T>()
+
+    for (let i = 0; i < ids.length; i += MAX_IDS_PER_QUERY) {
+      const chunk = ids.slice(i, i + MAX_IDS_PER_QUERY)
+      try {
+        let query = supabase
+          .from(this.table)
+          .select(`${this.key}, ${this.columns}`)
+          .in(this.key, chunk)
+
+        if (this.options.excludeDeleted) {
+          query = query.is('deleted_at', null)
+        }
+
+        const { data, error } = await query
+        if (error) throw error
+
+        for (const row of (data || []) as T[]) {
+          rows.set(String(row[this.key]), row)
+        }
+      } catch (error) {
+        console.error(`Erro ao carregar ${this.table} em lote:`, error)
+      }
+    }
+
+    batch.forEach((pending, id) => pending.resolve(rows.get(id) ?? null))
+  }
+}
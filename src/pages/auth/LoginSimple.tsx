@@ -63,6 +63,7 @@ export function Login() {
               <input
                 id="email"
                 name="email"
+                data-testid="login-email"
                 type="email"
                 autoComplete="email"
                 required
@@ -80,6 +81,7 @@ export function Login() {
               <input
                 id="password"
                 name="password"
+                data-testid="login-password"
                 type="password"
                 autoComplete="current-password"
                 required
@@ -94,6 +96,7 @@ export function Login() {
           <div>
             <Button
               type="submit"
+              data-testid="login-submit"
               className="w-full"
               loading={isSubmitting || loading}
               disabled={isSubmitting || loading}
@@ -41,7 +41,7 @@ export function GenericError({
         </p>
         
         {showRetry && onRetry && (
-          <Button onClick={onRetry}>
+          <Button onClick={onRetry} data-testid="error-retry">
             Tentar Novamente
           </Button>
         )}
@@ -49,6 +49,7 @@ export function GenericError({
         <div className="mt-4">
           <Button 
             variant="outline" 
+            data-testid="error-home"
             onClick={() => window.location.href = '/'}
           >
             Voltar ao Início
@@ -77,9 +77,9 @@ export function FinancialDashboard() {
           saldoAtual: 50800.00
         })
       } else {
-        const { getFinancialConsolidado, getRecebimentosKPIs } = await import('../../lib/financialConsolidadoApi')
+        const { getResumoFinanceiroConsolidado, getRecebimentosKPIs } = await import('../../lib/financialConsolidadoApi')
         const [data, recebimentosKPIs] = await Promise.all([
-          getFinancialConsolidado(mesAno),
+          getResumoFinanceiroConsolidado(mesAno),
           getRecebimentosKPIs(mesAno)
         ])
         
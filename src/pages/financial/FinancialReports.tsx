@@ -69,7 +69,7 @@ export function FinancialReports() {
   const loadReportData = async () => {
     try {
       const [expensesData, statsData] = await Promise.all([
-        getExpenses(filters),
+        getExpenses(filters, 'list'),
         getFinancialStats(filters)
       ]);
       
@@ -109,12 +109,18 @@ export interface FinancialStats {
   despesas_por_tipo_transacao?: Record<TransactionType, number>
 }
 
-export interface PaginatedExpenses {
+// Projeção de colunas: listagem (colunas da tabela de despesas) ou detalhe (tudo)
+export type ExpenseView = 'list' | 'detail'
+
+// Posição na listagem ordenada por (data_despesa, id), ambos decrescentes
+export interface ExpenseCursor {
+  data_despesa: string
+  id: string
+}
+
+export interface ExpensePage {
   expenses: ExpenseWithRelations[]
-  total: number
-  page: number
-  limit: number
-  totalPages: number
+  nextCursor: ExpenseCursor | null
 }
 
 export interface InvoiceIntegration {
@@ -1,85 +1,39 @@
-import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
+from browser_pool import open_app, run_standalone
+from locators import locate
+from waits import fill, settle, submit_login
+
+async def run_test(context):
+    page = await open_app(context)
     
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # -> Input valid username/email and password.
-        frame = context.pages[-1]
-        # Input valid email into the email field
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('validuser@example.com')
-        
+    # Interact with the page elements to simulate user flow
+    # -> Input valid username/email and password.
+    frame = context.pages[-1]
+    # Input valid email into the email field
+    elem = locate(frame, "login.email")
+    await fill(elem, 'validuser@example.com')
 
-        frame = context.pages[-1]
-        # Input valid password into the password field
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('validpassword123')
-        
 
-        frame = context.pages[-1]
-        # Click the login button to submit the form
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+    frame = context.pages[-1]
+    # Input valid password into the password field
+    elem = locate(frame, "login.password")
+    await fill(elem, 'validpassword123')
 
-        # --> Assertions to verify final state
-        frame = context.pages[-1]
-        try:
-            await expect(frame.locator('text=Login Successful! JWT Token Received')).to_be_visible(timeout=1000)
-        except AssertionError:
-            raise AssertionError('Test case failed: User login was not successful and JWT token was not received as expected.')
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+    frame = context.pages[-1]
+    # Click the login button to submit the form
+    elem = locate(frame, "login.submit")
+    await submit_login(elem)
+
+
+    # --> Assertions to verify final state
+    frame = context.pages[-1]
+    try:
+        await expect(frame.locator('text=Login Successful! JWT Token Received')).to_be_visible(timeout=1000)
+    except AssertionError:
+        raise AssertionError('Test case failed: User login was not successful and JWT token was not received as expected.')
+    await settle(page)
+
+if __name__ == "__main__":
+    run_standalone(run_test)
@@ -1,126 +1,32 @@
-import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # -> Input email and password, then click the login button to log in.
-        frame = context.pages[-1]
-        # Input email for login
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
-        
-
-        frame = context.pages[-1]
-        # Input password for login
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestPassword123')
-        
-
-        frame = context.pages[-1]
-        # Click the login button to submit credentials
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Check for any available options to recover password or try different credentials, or explore if guest access or other navigation options exist.
-        frame = context.pages[-1]
-        # Click on the page title or header to see if it navigates to a home or dashboard page with projects
-        elem = frame.locator('xpath=html/body/div').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+from browser_pool import open_app, run_standalone
+from locators import locate
+from waits import click, settle
 
-        await page.mouse.wheel(0, 300)
-        
+# Papel cuja sessão salva abre o teste (auth_state.py)
+ROLE = "user"
 
-        # -> Try to clear the email and password fields and re-enter credentials to ensure no input errors, then attempt login again.
-        frame = context.pages[-1]
-        # Clear email input field
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('')
-        
-
-        frame = context.pages[-1]
-        # Clear password input field
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('')
-        
+async def run_test(context):
+    page = await open_app(context)
+    
+    # Interact with the page elements to simulate user flow
+    # -> Check for any available options to recover password or try different credentials, or explore if guest access or other navigation options exist.
+    frame = context.pages[-1]
+    # Click on the page title or header to see if it navigates to a home or dashboard page with projects
+    elem = locate(frame, "app.root")
+    await click(elem)
 
-        frame = context.pages[-1]
-        # Re-enter email for login
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
-        
 
-        frame = context.pages[-1]
-        # Re-enter password for login
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestPassword123')
-        
+    await page.mouse.wheel(0, 300)
 
-        frame = context.pages[-1]
-        # Click the login button to submit credentials again
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+    # --> Assertions to verify final state
+    frame = context.pages[-1]
+    try:
+        await expect(frame.locator('text=Project Update Successful').first).to_be_visible(timeout=1000)
+    except AssertionError:
+        raise AssertionError('Test case failed: The test plan execution failed to verify that updates to the project details including schedule, segments, and financial info are persisted and reflected correctly in the project summary.')
+    await settle(page)
 
-        # --> Assertions to verify final state
-        frame = context.pages[-1]
-        try:
-            await expect(frame.locator('text=Project Update Successful').first).to_be_visible(timeout=1000)
-        except AssertionError:
-            raise AssertionError('Test case failed: The test plan execution failed to verify that updates to the project details including schedule, segments, and financial info are persisted and reflected correctly in the project summary.')
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+if __name__ == "__main__":
+    run_standalone(run_test, role=ROLE)
@@ -1,123 +1,30 @@
-import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # -> Log in as project manager and attempt to perform coordinator-only operations.
-        frame = context.pages[-1]
-        # Input project manager email
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('projectmanager@example.com')
-        
-
-        frame = context.pages[-1]
-        # Input project manager password
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('projectmanagerpassword')
-        
-
-        frame = context.pages[-1]
-        # Click login button to submit project manager credentials
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+from auth_state import use_role
+from browser_pool import open_app, run_standalone
+from waits import settle
 
-        # -> Try to log in as coordinator or finance personnel or verify correct credentials for project manager.
-        frame = context.pages[-1]
-        # Input coordinator email
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('coordinator@example.com')
-        
+# Papel cuja sessão salva abre o teste (auth_state.py)
+ROLE = "project_manager"
 
-        frame = context.pages[-1]
-        # Input coordinator password
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('coordinatorpassword')
-        
-
-        frame = context.pages[-1]
-        # Click login button to submit coordinator credentials
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+async def run_test(context):
+    page = await open_app(context)
+    
+    # Interact with the page elements to simulate user flow
+    # -> Switch to the coordinator session and check that project manager actions are not shared with it.
+    await use_role(page, "coordinator")
 
-        # -> Try to log in as finance personnel or verify correct credentials for roles.
-        frame = context.pages[-1]
-        # Input finance personnel email
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('financepersonnel@example.com')
-        
 
-        frame = context.pages[-1]
-        # Input finance personnel password
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('financepassword')
-        
+    # -> Switch to the finance personnel session and check access to project management pages.
+    await use_role(page, "finance")
 
-        frame = context.pages[-1]
-        # Click login button to submit finance personnel credentials
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+    # --> Assertions to verify final state
+    frame = context.pages[-1]
+    try:
+        await expect(frame.locator('text=Unauthorized Access to Coordinator Actions').first).to_be_visible(timeout=1000)
+    except AssertionError:
+        raise AssertionError('Test failed: System roles access control verification failed. Project manager was able to access coordinator-only actions or finance personnel accessed project management pages, violating RLS and authorization rules.')
+    await settle(page)
 
-        # --> Assertions to verify final state
-        frame = context.pages[-1]
-        try:
-            await expect(frame.locator('text=Unauthorized Access to Coordinator Actions').first).to_be_visible(timeout=1000)
-        except AssertionError:
-            raise AssertionError('Test failed: System roles access control verification failed. Project manager was able to access coordinator-only actions or finance personnel accessed project management pages, violating RLS and authorization rules.')
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+if __name__ == "__main__":
+    run_standalone(run_test, role=ROLE)
@@ -1,145 +1,95 @@
-import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
+from browser_pool import open_app, run_standalone
+from locators import locate
+from waits import click, fill, goto, settle, submit_login
+
+async def run_test(context):
+    page = await open_app(context)
     
+    # Interact with the page elements to simulate user flow
+    # -> Submit the login form with empty required fields to check validation error messages.
+    frame = context.pages[-1]
+    # Click the Entrar button to submit the login form with empty fields to trigger validation errors.
+    elem = locate(frame, "login.submit")
+    await submit_login(elem)
+
+
+    # -> Open another form in the system to test validation errors on empty or invalid inputs.
+    await goto(page, 'http://localhost:5173/projects/new')
+
+
+    # -> Click 'Voltar ao Início' button to return to the home page and try opening a different form for validation testing.
+    frame = context.pages[-1]
+    # Click 'Voltar ao Início' button to return to home page after error on new project form.
+    elem = locate(frame, "error.home")
+    await click(elem)
+
+
+    # -> Submit the login form with empty required fields to verify validation error messages and submission blocking.
+    frame = context.pages[-1]
+    # Click the 'Entrar' button to submit the login form with empty fields to trigger validation errors.
+    elem = locate(frame, "login.submit")
+    await submit_login(elem)
+
+
+    # -> Navigate to a different form such as 'new client' or 'new report' to test validation errors on empty or invalid inputs.
+    await goto(page, 'http://localhost:5173/clients/new')
+
+
+    # -> Navigate to the new client form to test validation errors on empty or invalid inputs.
+    await goto(page, 'http://localhost:5173/clients/new')
+
+
+    # -> Navigate to the new client form to test validation errors on empty or invalid inputs.
+    await goto(page, 'http://localhost:5173/clients/new')
+
+
+    # -> Input invalid email format and valid password, then submit the login form to verify validation error for invalid email format.
+    frame = context.pages[-1]
+    # Input invalid email format in the email field
+    elem = locate(frame, "login.email")
+    await fill(elem, 'invalid-email-format')
+
+
+    frame = context.pages[-1]
+    # Input valid password in the password field
+    elem = locate(frame, "login.password")
+    await fill(elem, 'ValidPassword123')
+
+
+    frame = context.pages[-1]
+    # Click the 'Entrar' button to submit the login form with invalid email format to trigger validation errors
+    elem = locate(frame, "login.submit")
+    await submit_login(elem)
+
+
+    # -> Input valid email and password, then submit the login form to proceed and access other forms for further validation testing.
+    frame = context.pages[-1]
+    # Input valid email format in the email field
+    elem = locate(frame, "login.email")
+    await fill(elem, 'valid.email@example.com')
+
+
+    frame = context.pages[-1]
+    # Input valid password in the password field
+    elem = locate(frame, "login.password")
+    await fill(elem, 'ValidPassword123')
+
+
+    frame = context.pages[-1]
+    # Click the 'Entrar' button to submit the login form with valid credentials to login and access other forms
+    elem = locate(frame, "login.submit")
+    await submit_login(elem)
+
+
+    # --> Assertions to verify final state
+    frame = context.pages[-1]
     try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5173", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # -> Submit the login form with empty required fields to check validation error messages.
-        frame = context.pages[-1]
-        # Click the Entrar button to submit the login form with empty fields to trigger validation errors.
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Open another form in the system to test validation errors on empty or invalid inputs.
-        await page.goto('http://localhost:5173/projects/new', timeout=10000)
-        await asyncio.sleep(3)
-        
-
-        # -> Click 'Voltar ao Início' button to return to the home page and try opening a different form for validation testing.
-        frame = context.pages[-1]
-        # Click 'Voltar ao Início' button to return to home page after error on new project form.
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Submit the login form with empty required fields to verify validation error messages and submission blocking.
-        frame = context.pages[-1]
-        # Click the 'Entrar' button to submit the login form with empty fields to trigger validation errors.
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Navigate to a different form such as 'new client' or 'new report' to test validation errors on empty or invalid inputs.
-        await page.goto('http://localhost:5173/clients/new', timeout=10000)
-        await asyncio.sleep(3)
-        
-
-        # -> Navigate to the new client form to test validation errors on empty or invalid inputs.
-        await page.goto('http://localhost:5173/clients/new', timeout=10000)
-        await asyncio.sleep(3)
-        
-
-        # -> Navigate to the new client form to test validation errors on empty or invalid inputs.
-        await page.goto('http://localhost:5173/clients/new', timeout=10000)
-        await asyncio.sleep(3)
-        
-
-        # -> Input invalid email format and valid password, then submit the login form to verify validation error for invalid email format.
-        frame = context.pages[-1]
-        # Input invalid email format in the email field
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('invalid-email-format')
-        
-
-        frame = context.pages[-1]
-        # Input valid password in the password field
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('ValidPassword123')
-        
-
-        frame = context.pages[-1]
-        # Click the 'Entrar' button to submit the login form with invalid email format to trigger validation errors
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Input valid email and password, then submit the login form to proceed and access other forms for further validation testing.
-        frame = context.pages[-1]
-        # Input valid email format in the email field
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('valid.email@example.com')
-        
-
-        frame = context.pages[-1]
-        # Input valid password in the password field
-        elem = frame.locator('xpath=html/body/div/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('ValidPassword123')
-        
-
-        frame = context.pages[-1]
-        # Click the 'Entrar' button to submit the login form with valid credentials to login and access other forms
-        elem = frame.locator('xpath=html/body/div/div/div/form/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # --> Assertions to verify final state
-        frame = context.pages[-1]
-        try:
-            await expect(frame.locator('text=Validation Successful').first).to_be_visible(timeout=1000)
-        except AssertionError:
-            raise AssertionError("Test case failed: Validation error messages were not displayed as expected when submitting invalid or incomplete data in forms, causing the test plan execution to fail.")
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+        await expect(frame.locator('text=Validation Successful').first).to_be_visible(timeout=1000)
+    except AssertionError:
+        raise AssertionError("Test case failed: Validation error messages were not displayed as expected when submitting invalid or incomplete data in forms, causing the test plan execution to fail.")
+    await settle(page)
+
+if __name__ == "__main__":
+    run_standalone(run_test)
@@ -0,0 +1,193 @@
+"""
+Sessões autenticadas em cache para os testes TC0xx
+
+Quase todo teste digitava e-mail e senha no formulário de login antes de
+chegar ao que de fato testa. Aqui o login de cada papel (usuário comum,
+admin, coordenador...) acontece uma vez só: o ``storage_state`` do
+Playwright, com a sessão do Supabase (JWT no localStorage), fica salvo em
+``.auth/<papel>.json`` e os contextos dos testes já nascem autenticados.
+
+A sessão salva é reaproveitada entre execuções até o JWT chegar perto de
+expirar; só então o login é refeito. Testes em paralelo que pedem o mesmo
+papel esperam um único login.
+
+Os testes declaram o papel com uma constante no módulo::
+
+    ROLE = "user"
+
+As credenciais podem ser trocadas por variáveis de ambiente, por exemplo
+``TESTSPRITE_ADMIN_EMAIL`` e ``TESTSPRITE_ADMIN_PASSWORD``. No modo
+offline (``fake_supabase.py``) as sessões ficam em ``.auth/fake-<papel>.json``,
+separadas das do Supabase real.
+"""
+
+import asyncio
+import base64
+import json
+import os
+import time
+from pathlib import Path
+
+import fake_supabase
+from browser_pool import BASE_URL, new_context, open_app
+from locators import LoginForm
+from waits import settle
+
+STATE_DIR = Path(__file__).resolve().parent / ".auth"
+
+# Credenciais padrão de cada papel (as mesmas que os testes usavam)
+ROLES = {
+    "user": ("testuser@example.com", "TestPassword123"),
+    "admin": ("admin@example.com", "AdminPass123"),
+    "coordinator": ("coordinator@example.com", "coordinatorpassword"),
+    "project_manager": ("projectmanager@example.com", "securepassword123"),
+    "finance": ("financepersonnel@example.com", "financepassword"),
+}
+
+# Margem (s) antes do vencimento do JWT em que a sessão já é renovada
+EXPIRY_MARGIN = 120
+
+_sessions = {}
+_failures = {}
+_locks = {}
+
+
+def credentials(role):
+    if role not in ROLES:
+        raise ValueError(f"papel desconhecido {role!r} (use {', '.join(ROLES)})")
+    email, password = ROLES[role]
+    prefix = f"TESTSPRITE_{role.upper()}"
+    return os.environ.get(f"{prefix}_EMAIL", email), os.environ.get(f"{prefix}_PASSWORD", password)
+
+
+def _local_storage(state, origin=BASE_URL):
+    for entry in state.get("origins", []):
+        if entry["origin"] == origin.rstrip("/"):
+            return entry["localStorage"]
+    return []
+
+
+def _supabase_session(state):
+    """Sessão gravada pelo supabase-js (chave ``sb-<projeto>-auth-token``)"""
+    for item in _local_storage(state):
+        if item["name"].startswith("sb-") and item["name"].endswith("-auth-token"):
+            try:
+                return json.loads(item["value"])
+            except ValueError:
+                return None
+    return None
+
+
+def _jwt_expiry(token):
+    payload = token.split(".")[1]
+    payload += "=" * (-len(payload) % 4)
+    return json.loads(base64.urlsafe_b64decode(payload))["exp"]
+
+
+def token_expiry(state):
+    """Vencimento (epoch, em segundos) do JWT salvo no estado, ou None"""
+    session = _supabase_session(state)
+    if not session:
+        return None
+    try:
+        return _jwt_expiry(session["access_token"])
+    except (KeyError, IndexError, ValueError):
+        return session.get("expires_at")
+
+
+def is_fresh(state, margin=EXPIRY_MARGIN):
+    expiry = token_expiry(state)
+    return expiry is not None and expiry - margin > time.time()
+
+
+def _state_path(role):
+    prefix = "fake-" if fake_supabase.enabled() else ""
+    return STATE_DIR / f"{prefix}{role}.json"
+
+
+def _read_state(role):
+    try:
+        with open(_state_path(role), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_state(role, state):
+    """Grava o estado só para o dono do arquivo: ele contém tokens de acesso"""
+    STATE_DIR.mkdir(exist_ok=True)
+    path = _state_path(role)
+    # Um nome por processo: com run_suite.py -p, vários processos podem gravar o mesmo papel
+    temp = path.with_suffix(f".{os.getpid()}.tmp")
+    fd = os.open(temp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with open(fd, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(temp, path)
+
+
+async def login(browser, role):
+    """Faz login pelo formulário em um contexto descartável e retorna o storage_state"""
+    email, password = credentials(role)
+    context = await new_context(browser)
+    try:
+        page = await open_app(context)
+        await LoginForm(page).login(email, password)
+        state = await context.storage_state()
+    finally:
+        await context.close()
+    if token_expiry(state) is None:
+        raise AssertionError(
+            f"Login como {role!r} ({email}) falhou: nenhuma sessão do Supabase foi criada"
+        )
+    return state
+
+
+async def storage_state(browser, role):
+    """
+    ``storage_state`` autenticado do papel: o da memória ou do disco se o
+    JWT ainda vale, senão um login novo. Um login que falhou não é
+    repetido pelos testes seguintes da mesma execução.
+    """
+    lock = _locks.setdefault(role, asyncio.Lock())
+    async with lock:
+        if role in _failures:
+            raise _failures[role]
+        state = _sessions.get(role) or _read_state(role)
+        if state is None or not is_fresh(state):
+            try:
+                state = await login(browser, role)
+            except AssertionError as e:
+                _failures[role] = e
+                raise
+            _write_state(role, state)
+        _sessions[role] = state
+        return state
+
+
+async def session_options(pool, role):
+    """Opções de ``BrowserPool.context`` para começar autenticado como ``role``"""
+    if role is None:
+        return {}
+    browser = await pool.ensure_browser()
+    return {"storage_state": await storage_state(browser, role)}
+
+
+async def use_role(page, role):
+    """
+    Troca a sessão do contexto da página pela de outro papel, sem passar
+    pelo formulário de login, e recarrega a página.
+    """
+    context = page.context
+    state = await storage_state(context.browser, role)
+    await context.clear_cookies()
+    if state.get("cookies"):
+        await context.add_cookies(state["cookies"])
+    await page.evaluate(
+        """items => {
+            localStorage.clear();
+            for (const { name, value } of items) localStorage.setItem(name, value);
+        }""",
+        _local_storage(state),
+    )
+    await page.reload(wait_until="domcontentloaded")
+    await settle(page, after_action=True)
@@ -0,0 +1,164 @@
+"""
+Navegador compartilhado pelos testes TC0xx do testsprite_tests
+
+Antes cada teste abria o Playwright, lançava seu próprio Chromium, rodava
+um fluxo e desligava tudo: 23 testes, 23 partidas a frio do navegador.
+Aqui um único Chromium fica aberto e cada teste recebe um
+``BrowserContext`` novo (cookies, storage e cache isolados, como uma
+janela anônima). ``BrowserPool`` limita quantos contextos ficam abertos ao
+mesmo tempo; todos rodam no mesmo event loop do asyncio.
+
+Cada teste expõe ``async def run_test(context)`` e continua executável
+sozinho::
+
+    python testsprite_tests/TC001_User_Login_with_Valid_Credentials.py
+
+Para a suíte completa, veja ``run_suite.py``.
+"""
+
+import asyncio
+import contextlib
+import os
+
+from playwright import async_api
+
+import fake_supabase
+from waits import track_network
+
+# Endereço do app em teste (o servidor de desenvolvimento do Vite)
+BASE_URL = os.environ.get("TESTSPRITE_BASE_URL", "http://localhost:5173")
+
+# Sem --single-process: com vários contextos no mesmo navegador, o modo de
+# processo único do Chromium derruba todos os testes quando uma aba trava
+LAUNCH_ARGS = [
+    "--window-size=1280,720",         # Tamanho da janela do navegador
+    "--disable-dev-shm-usage",        # Evita o /dev/shm, pequeno em containers
+    "--ipc=host",                     # IPC do host, mais estável em containers
+]
+
+# Timeout padrão (ms) das ações de cada contexto
+DEFAULT_TIMEOUT = 5000
+
+
+async def new_context(browser, **options):
+    """
+    Contexto novo com o timeout padrão; no modo offline
+    (``TESTSPRITE_FAKE_BACKEND=1``) ele já nasce ligado ao Supabase falso.
+    """
+    context = await browser.new_context(**options)
+    context.set_default_timeout(DEFAULT_TIMEOUT)
+    if fake_supabase.enabled():
+        await fake_supabase.install(context, BASE_URL)
+    return context
+
+
+class BrowserPool:
+    """
+    Um Chromium aquecido e até ``size`` contextos isolados em uso ao mesmo
+    tempo::
+
+        async with BrowserPool(size=4) as pool:
+            async with pool.context() as context:
+                await run_test(context)
+
+    Se o navegador cair no meio da suíte, ele é lançado de novo no próximo
+    pedido de contexto, sem derrubar os testes seguintes.
+    """
+
+    def __init__(self, size=4, headless=True):
+        self.size = size
+        self.headless = headless
+        self.browser = None
+        self._playwright = None
+        self._slots = asyncio.Semaphore(size)
+        self._launching = asyncio.Lock()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def start(self):
+        if self._playwright is None:
+            self._playwright = await async_api.async_playwright().start()
+        await self.ensure_browser()
+
+    async def stop(self):
+        if self.browser is not None:
+            with contextlib.suppress(async_api.Error):
+                await self.browser.close()
+            self.browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def ensure_browser(self):
+        """O navegador do pool, lançado de novo se tiver caído"""
+        async with self._launching:
+            if self.browser is None or not self.browser.is_connected():
+                self.browser = await self._playwright.chromium.launch(
+                    headless=self.headless, args=LAUNCH_ARGS,
+                )
+            return self.browser
+
+    @contextlib.asynccontextmanager
+    async def context(self, **options):
+        """
+        Contexto novo e isolado, fechado na saída. ``options`` vão direto
+        para ``Browser.new_context`` (viewport, storage_state, etc.).
+        """
+        async with self._slots:
+            browser = await self.ensure_browser()
+            context = await new_context(browser, **options)
+            try:
+                yield context
+            finally:
+                with contextlib.suppress(async_api.Error):
+                    await context.close()
+
+
+async def open_app(context, path="/"):
+    """
+    Abre uma página do app no contexto e espera o DOM dela (e dos iframes)
+    ficar pronto. Retorna a página.
+    """
+    # Acompanha a rede desde a primeira requisição, para as esperas de waits.py
+    track_network(context)
+    page = await context.new_page()
+
+    # Navega até o app e espera a requisição ser confirmada
+    await page.goto(BASE_URL + path, wait_until="commit", timeout=10000)
+
+    # Espera o DOMContentLoaded da página (opcional, para estabilidade)
+    try:
+        await page.wait_for_load_state("domcontentloaded", timeout=3000)
+    except async_api.Error:
+        pass
+
+    # Espera também todos os iframes carregarem
+    for frame in page.frames:
+        try:
+            await frame.wait_for_load_state("domcontentloaded", timeout=3000)
+        except async_api.Error:
+            pass
+
+    return page
+
+
+def run_standalone(test, role=None):
+    """
+    Executa um único teste com um navegador próprio (``python TC0xx_*.py``),
+    já autenticado como ``role`` quando o teste declara um papel.
+    """
+    # Import tardio: auth_state usa open_app deste módulo
+    from auth_state import session_options
+
+    async def main():
+        async with BrowserPool(size=1) as pool:
+            options = await session_options(pool, role)
+            async with pool.context(**options) as context:
+                await test(context)
+
+    asyncio.run(main())
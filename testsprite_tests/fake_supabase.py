@@ -0,0 +1,1067 @@
+"""
+Supabase falso, em processo, para rodar os testes TC0xx sem rede
+
+O relatório do TestSprite mostra 22 dos 23 testes parados no
+``/auth/v1/token`` do projeto real. Com ``TESTSPRITE_FAKE_BACKEND=1`` (ou
+``run_suite.py --fake-backend``) cada contexto do navegador passa a falar
+com um Supabase falso, interceptado com ``page.route``:
+
+- REST (PostgREST): select com colunas e relações embutidas, filtros
+  (``eq``, ``in``, ``ilike``, ``or=(...)``...), ordem, paginação,
+  ``count``, ``.single()``, insert/upsert, update e delete;
+- Auth (GoTrue): login por senha, refresh, cadastro, ``/user`` e logout,
+  com JWTs assinados localmente;
+- Storage: upload, download, listagem, remoção e URLs assinadas;
+- Realtime: ``phx_join`` respondido e ``postgres_changes`` enviados a
+  cada escrita (com Playwright >= 1.48, que intercepta WebSockets).
+
+As tabelas (colunas, defaults e chaves estrangeiras) saem dos
+``CREATE TABLE``/``ADD COLUMN`` de ``db/migrations``; os dados iniciais,
+de ``fixtures/supabase_seed.json``. Cada contexto recebe uma cópia
+própria dos dados, então um teste não enxerga o que outro gravou.
+Requisições para fora do app e do Supabase são abortadas: nada sai para a
+rede.
+
+O falso é tolerante onde o PostgREST seria estrito: colunas e tabelas
+que não aparecem nas migrações valem como vazias, em vez de erro.
+
+A latência do backend pode ser injetada de propósito, para ver como a
+interface se comporta com respostas lentas::
+
+    TESTSPRITE_FAKE_LATENCY=800 python testsprite_tests/run_suite.py --fake-backend
+
+    backend = fake_supabase.backend_for(context)
+    backend.slow("/rest/v1/obras", 3000)    # só as obras demoram 3 s
+"""
+
+import asyncio
+import base64
+import copy
+import datetime
+import hashlib
+import hmac
+import json
+import os
+import re
+import time
+import uuid
+import weakref
+from collections import namedtuple
+from pathlib import Path
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+TESTS_DIR = Path(__file__).resolve().parent
+MIGRATIONS_DIR = TESTS_DIR.parent / "db" / "migrations"
+SEED_FILE = TESTS_DIR / "fixtures" / "supabase_seed.json"
+
+# Projetos hospedados (*.supabase.co) e, opcionalmente, um Supabase local
+SUPABASE_URL = re.compile(r"^(https?|wss?)://[^/]+\.supabase\.(co|in)(:\d+)?/")
+
+# Segredo dos JWTs emitidos pelo falso (nunca aceito pelo Supabase real)
+JWT_SECRET = b"testsprite-fake-supabase"
+
+# Validade (s) das sessões emitidas
+SESSION_TTL = 3600
+
+CORS_HEADERS = {
+    "access-control-allow-origin": "*",
+    "access-control-allow-headers": "*",
+    "access-control-allow-methods": "GET, POST, PUT, PATCH, DELETE, OPTIONS, HEAD",
+    "access-control-expose-headers": "content-range, content-profile",
+}
+
+# Parâmetros de consulta do PostgREST que não são filtros
+_RESERVED = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+Reply = namedtuple("Reply", ["status", "body", "headers"])
+
+_backends = weakref.WeakKeyDictionary()
+_schema = None
+
+
+class FakeError(Exception):
+    """Erro devolvido ao app como resposta HTTP, no formato do serviço imitado"""
+
+    def __init__(self, status, body):
+        super().__init__(body)
+        self.status = status
+        self.body = body
+
+
+def _postgrest_error(status, code, message, details=None):
+    return FakeError(status, {"code": code, "message": message, "details": details, "hint": None})
+
+
+def enabled():
+    return os.environ.get("TESTSPRITE_FAKE_BACKEND", "") not in ("", "0")
+
+
+def is_supabase_url(url):
+    local = os.environ.get("TESTSPRITE_SUPABASE_URL")
+    return bool(SUPABASE_URL.match(url)) or bool(local and url.startswith(local.rstrip("/") + "/"))
+
+
+def _now():
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+def _today():
+    return datetime.date.today().isoformat()
+
+
+# =====================================================
+# Esquema a partir de db/migrations
+# =====================================================
+
+class Table:
+    """Colunas (com a fábrica do default) e chaves estrangeiras de uma tabela"""
+
+    def __init__(self, name):
+        self.name = name
+        self.columns = {}
+        self.references = {}
+
+    def defaults(self):
+        return {column: factory() if factory else None for column, factory in self.columns.items()}
+
+
+_CREATE_TABLE = re.compile(
+    r'CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(?:public\.)?"?(\w+)"?\s*\(', re.I
+)
+_ALTER_TABLE = re.compile(
+    r'ALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?(?:public\.)?"?(\w+)"?\s+(ADD\s+COLUMN[^;]*);', re.I
+)
+_ADD_COLUMN = re.compile(r'^ADD\s+COLUMN\s+(?:IF\s+NOT\s+EXISTS\s+)?(.*)$', re.I | re.S)
+_REFERENCES = re.compile(r'REFERENCES\s+(?:public\.)?"?(\w+)"?\s*(?:\(\s*"?(\w+)"?\s*\))?', re.I)
+_FOREIGN_KEY = re.compile(r'FOREIGN\s+KEY\s*\(\s*"?(\w+)"?\s*\)', re.I)
+_DEFAULT = re.compile(
+    r'\bDEFAULT\s+(.+?)(?=\s+(?:NOT\s+NULL|NULL|REFERENCES|CHECK|UNIQUE|PRIMARY|CONSTRAINT|GENERATED)\b|$)',
+    re.I | re.S,
+)
+_LITERAL = re.compile(r"^'((?:[^']|'')*)'(?:::([\w\[\] ]+))?$", re.S)
+_NUMBER = re.compile(r"^-?\d+(\.\d+)?$")
+_CONSTRAINTS = ("CONSTRAINT", "PRIMARY", "UNIQUE", "CHECK", "FOREIGN", "EXCLUDE", "LIKE")
+
+
+def _strip_comments(sql):
+    sql = re.sub(r"/\*.*?\*/", "", sql, flags=re.S)
+    return re.sub(r"--[^\n]*", "", sql)
+
+
+def _closing(text, start, quotes="'"):
+    """Índice do parêntese que fecha o aberto em ``start - 1``"""
+    depth, quote = 1, None
+    for index in range(start, len(text)):
+        char = text[index]
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in quotes:
+            quote = char
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return index
+    return len(text)
+
+
+def _split_top(text, quotes="'"):
+    """Separa por vírgulas fora de parênteses e de aspas"""
+    parts, depth, quote, current = [], 0, None, []
+    for char in text:
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in quotes:
+            quote = char
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    parts.append("".join(current).strip())
+    return [part for part in parts if part]
+
+
+def _constant(value):
+    return lambda: copy.deepcopy(value)
+
+
+def _default_factory(expression, column_type):
+    """Fábrica do valor default de uma coluna, ou None se ele não importa aqui"""
+    expression = expression.strip()
+    lowered = expression.lower()
+    if "uuid" in lowered and "(" in lowered:
+        return lambda: str(uuid.uuid4())
+    if lowered.startswith(("now(", "current_timestamp", "timezone(", "localtimestamp")):
+        return _now
+    if lowered.startswith("current_date"):
+        return _today
+    literal = _LITERAL.match(expression)
+    if literal:
+        text = literal.group(1).replace("''", "'")
+        cast = (literal.group(2) or column_type).lower()
+        if "json" in cast:
+            try:
+                return _constant(json.loads(text))
+            except ValueError:
+                return None
+        if "[]" in cast and text == "{}":
+            return _constant([])
+        return _constant(text)
+    if lowered in ("true", "false"):
+        return _constant(lowered == "true")
+    if _NUMBER.match(expression):
+        return _constant(float(expression) if "." in expression else int(expression))
+    if lowered.startswith("array[]"):
+        return _constant([])
+    return None
+
+
+def _parse_column(table, definition):
+    words = definition.split(None, 1)
+    if not words:
+        return
+    if words[0].upper() in _CONSTRAINTS:
+        foreign = _FOREIGN_KEY.search(definition)
+        target = _REFERENCES.search(definition)
+        if foreign and target:
+            table.references[foreign.group(1)] = target.group(1)
+        return
+    name = words[0].strip('"')
+    rest = words[1] if len(words) > 1 else ""
+    column_type = rest.split(None, 1)[0] if rest else ""
+    default = _DEFAULT.search(rest)
+    if default:
+        table.columns[name] = _default_factory(default.group(1), column_type)
+    elif column_type.lower() in ("serial", "bigserial") or "identity" in rest.lower():
+        counter = iter(range(1, 1 << 62))
+        table.columns[name] = lambda: next(counter)
+    else:
+        table.columns.setdefault(name, None)
+    target = _REFERENCES.search(rest)
+    if target:
+        table.references[name] = target.group(1)
+
+
+def parse_migrations(directory=MIGRATIONS_DIR):
+    """Tabelas de todas as migrações, na ordem dos arquivos; colunas repetidas se somam"""
+    tables = {}
+    for path in sorted(Path(directory).glob("*.sql")):
+        sql = _strip_comments(path.read_text(encoding="utf-8", errors="replace"))
+        for match in _CREATE_TABLE.finditer(sql):
+            table = tables.setdefault(match.group(1), Table(match.group(1)))
+            body = sql[match.end():_closing(sql, match.end())]
+            for definition in _split_top(body):
+                _parse_column(table, definition)
+        for match in _ALTER_TABLE.finditer(sql):
+            table = tables.setdefault(match.group(1), Table(match.group(1)))
+            for clause in _split_top(match.group(2)):
+                added = _ADD_COLUMN.match(clause)
+                if added:
+                    _parse_column(table, added.group(1))
+    return tables
+
+
+def schema():
+    """Esquema das migrações, lido uma vez por processo"""
+    global _schema
+    if _schema is None:
+        _schema = parse_migrations()
+    return _schema
+
+
+def _expand(value):
+    """Datas relativas no seed: "{today}", "{today+3}", "{today-7}" """
+    if isinstance(value, str):
+        match = re.fullmatch(r"\{today([+-]\d+)?\}", value)
+        if match:
+            days = int(match.group(1) or 0)
+            return (datetime.date.today() + datetime.timedelta(days=days)).isoformat()
+    return value
+
+
+def load_seed(path=SEED_FILE):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+# =====================================================
+# Filtros, ordem e select do PostgREST
+# =====================================================
+
+def _cell(row, key):
+    """Valor da coluna, seguindo caminhos JSON (``dados->>campo``)"""
+    parts = re.split(r"->>?", key)
+    value = row.get(parts[0].strip())
+    for part in parts[1:]:
+        part = part.strip().strip("'")
+        if isinstance(value, dict):
+            value = value.get(part)
+        elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        else:
+            return None
+    if "->>" in key and value is not None and not isinstance(value, str):
+        value = json.dumps(value) if isinstance(value, (dict, list)) else str(value)
+    return value
+
+
+def _same(cell, text):
+    if cell is None:
+        return False
+    if isinstance(cell, bool):
+        return text.lower() == str(cell).lower()
+    if isinstance(cell, (int, float)):
+        try:
+            return float(text) == float(cell)
+        except ValueError:
+            return False
+    if isinstance(cell, (dict, list)):
+        try:
+            return json.loads(text) == cell
+        except ValueError:
+            return False
+    return str(cell) == text
+
+
+def _compare(cell, text):
+    """-1, 0 ou 1 comparando a célula com o valor do filtro"""
+    if isinstance(cell, (int, float)) and not isinstance(cell, bool):
+        try:
+            other = float(text)
+        except ValueError:
+            other = None
+        if other is not None:
+            return (cell > other) - (cell < other)
+    cell = str(cell)
+    return (cell > text) - (cell < text)
+
+
+def _like(pattern, flags=0):
+    regex = "".join(
+        ".*" if char in "*%" else "." if char == "_" else re.escape(char) for char in pattern
+    )
+    return re.compile(regex, flags | re.S)
+
+
+def _list_values(text):
+    """``(a,b,"c,d")`` -> ["a", "b", "c,d"]"""
+    text = text.strip()
+    if text[:1] in "({" and text[-1:] in ")}":
+        text = text[1:-1]
+    return [item.strip('"') for item in _split_top(text, quotes='"')]
+
+
+def _array_test(text, check):
+    def test(cell):
+        if isinstance(cell, dict):
+            try:
+                wanted = json.loads(text)
+            except ValueError:
+                return False
+            return isinstance(wanted, dict) and check(set(json.dumps(item) for item in wanted.items()),
+                                                      set(json.dumps(item) for item in cell.items()))
+        if not isinstance(cell, list):
+            return False
+        return check(set(_list_values(text)), set(str(item) for item in cell))
+    return test
+
+
+def _operator(op, text):
+    """Predicado sobre a célula para ``op.valor``"""
+    if op == "eq":
+        return lambda cell: _same(cell, text)
+    if op == "neq":
+        return lambda cell: cell is not None and not _same(cell, text)
+    if op in ("gt", "gte", "lt", "lte"):
+        accept = {"gt": (1,), "gte": (0, 1), "lt": (-1,), "lte": (-1, 0)}[op]
+        return lambda cell: cell is not None and _compare(cell, text) in accept
+    if op in ("like", "ilike"):
+        regex = _like(text, re.I if op == "ilike" else 0)
+        return lambda cell: cell is not None and regex.fullmatch(str(cell)) is not None
+    if op == "is":
+        wanted = {"null": None, "true": True, "false": False}.get(text.lower(), "unknown")
+        return lambda cell: cell is wanted if wanted is None else cell == wanted
+    if op == "in":
+        values = _list_values(text)
+        return lambda cell: any(_same(cell, value) for value in values)
+    if op == "cs":
+        return _array_test(text, lambda wanted, cell: wanted <= cell)
+    if op == "cd":
+        return _array_test(text, lambda wanted, cell: cell <= wanted)
+    if op == "ov":
+        return _array_test(text, lambda wanted, cell: bool(wanted & cell))
+    if op in ("fts", "plfts", "phfts", "wfts"):
+        words = re.findall(r"\w+", text.split(")", 1)[-1].lower())
+        return lambda cell: cell is not None and all(word in str(cell).lower() for word in words)
+    raise _postgrest_error(400, "PGRST100", f'"failed to parse filter ({op}.{text})"')
+
+
+def _condition(key, expression):
+    """Predicado sobre a linha para ``coluna=op.valor`` (com ``not.`` opcional)"""
+    negate = expression.startswith("not.")
+    if negate:
+        expression = expression[4:]
+    op, _, text = expression.partition(".")
+    # Modificadores any/all: eq(any).{a,b}
+    quantifier = re.fullmatch(r"(\w+)\((any|all)\)", op)
+    if quantifier:
+        tests = [_operator(quantifier.group(1), value) for value in _list_values(text)]
+        combine = any if quantifier.group(2) == "any" else all
+        test = lambda cell: combine(check(cell) for check in tests)
+    else:
+        test = _operator(op, unquote(text))
+    if negate:
+        return lambda row: not test(_cell(row, key))
+    return lambda row: test(_cell(row, key))
+
+
+def _logic(kind, text, negate=False):
+    """Predicado para ``or=(...)``/``and=(...)``, com grupos aninhados"""
+    predicates = []
+    for item in _split_top(text.strip()[1:-1], quotes='"'):
+        nested = re.match(r"^(not\.)?(or|and)(\(.*\))$", item, re.S)
+        if nested:
+            predicates.append(_logic(nested.group(2), nested.group(3), bool(nested.group(1))))
+        else:
+            column, _, expression = item.partition(".")
+            predicates.append(_condition(column, expression))
+    combine = any if kind == "or" else all
+    if negate:
+        return lambda row: not combine(predicate(row) for predicate in predicates)
+    return lambda row: combine(predicate(row) for predicate in predicates)
+
+
+def _filter(key, value):
+    logic = re.fullmatch(r"(not\.)?(or|and)", key)
+    if logic:
+        return _logic(logic.group(2), value, bool(logic.group(1)))
+    return _condition(key, value)
+
+
+def _parse_order(text):
+    """``data.desc.nullslast,id`` -> [(coluna, desc, nulls_last)]"""
+    terms = []
+    for term in _split_top(text):
+        if "(" in term:
+            continue  # ordem por coluna de relação embutida: ignorada
+        parts = term.split(".")
+        desc = "desc" in parts[1:]
+        nulls_last = "nullslast" in parts[1:] or ("nullsfirst" not in parts[1:] and not desc)
+        terms.append((parts[0], desc, nulls_last))
+    return terms
+
+
+def _sort(items, order, key=lambda item: item):
+    """Ordena como o Postgres, inclusive a posição dos nulos"""
+    for column, desc, nulls_last in reversed(order):
+        null_rank = 1 if nulls_last != desc else 0
+
+        def sort_key(item, column=column, null_rank=null_rank):
+            value = _cell(key(item), column)
+            if value is None:
+                return (null_rank, 0, "")
+            if isinstance(value, (int, float)):
+                return (1 - null_rank, 0, value)
+            return (1 - null_rank, 1, str(value))
+
+        items.sort(key=sort_key, reverse=desc)
+    return items
+
+
+Field = namedtuple("Field", ["alias", "name"])
+Embed = namedtuple("Embed", ["alias", "table", "hint", "inner", "spread", "select"])
+
+_EMBED = re.compile(r"^(?:(\w+):)?(\.\.\.)?(\w+)((?:!\w+)*)\((.*)\)$", re.S)
+
+
+def parse_select(text):
+    """Campos e relações embutidas de ``select=``"""
+    text = re.sub(r'\s+(?=(?:[^"]*"[^"]*")*[^"]*$)', "", text or "*")
+    items = []
+    for item in _split_top(text, quotes='"'):
+        embed = _EMBED.match(item)
+        if embed:
+            alias, spread, table, hints, inner = embed.groups()
+            hints = [hint for hint in hints.split("!") if hint]
+            items.append(Embed(
+                alias or table, table,
+                next((hint for hint in hints if hint not in ("inner", "left")), None),
+                "inner" in hints, bool(spread), parse_select(inner),
+            ))
+            continue
+        alias, _, name = item.rpartition(":") if re.match(r"^\w+:[^:]", item) else ("", "", item)
+        name = name.split("::", 1)[0]
+        if "->" in name:
+            alias = alias or re.split(r"->>?", name)[-1].strip("'")
+        items.append(Field(alias or name, name))
+    return items
+
+
+# =====================================================
+# Backend
+# =====================================================
+
+Channel = namedtuple("Channel", ["socket", "topic", "join_ref", "bindings", "array"])
+
+
+class FakeSupabase:
+    """Um projeto Supabase em memória, com os dados do seed"""
+
+    def __init__(self, seed=None, latency=None):
+        self.schema = schema()
+        self.tables = {name: [] for name in self.schema}
+        self.users = []
+        self.objects = {}
+        self.buckets = set()
+        self.functions = {}
+        self.latency = float(os.environ.get("TESTSPRITE_FAKE_LATENCY", 0) or 0) if latency is None else latency
+        self.slow_routes = []
+        self.session_ttl = SESSION_TTL
+        self._channels = []
+        self._warned = set()
+        self.load(load_seed() if seed is None else seed)
+
+    # ---------- dados ----------
+
+    def load(self, seed):
+        for user in seed.get("users", []):
+            self.users.append(dict(user))
+        for name, rows in seed.get("tables", {}).items():
+            for row in rows:
+                self.tables.setdefault(name, []).append(
+                    self._new_row(name, {column: _expand(value) for column, value in row.items()})
+                )
+        self.buckets.update(seed.get("buckets", []))
+
+    def table(self, name):
+        """Linhas da tabela; tabelas fora das migrações nascem vazias (com aviso)"""
+        if name not in self.tables:
+            if name not in self._warned:
+                self._warned.add(name)
+                print(f"⚠️  fake_supabase: tabela {name!r} não está em db/migrations; usando uma vazia")
+            self.tables[name] = []
+        return self.tables[name]
+
+    def _new_row(self, name, values):
+        table = self.schema.get(name)
+        row = table.defaults() if table else {}
+        if "id" not in row and "id" not in values:
+            row["id"] = str(uuid.uuid4())
+        row.update(values)
+        return row
+
+    def rpc(self, name):
+        """Registra uma função chamada por ``supabase.rpc(name, args)``::
+
+            @backend.rpc("get_volume_stats")
+            def volume(backend, args):
+                return {...}
+        """
+        def register(function):
+            self.functions[name] = function
+            return function
+        return register
+
+    def slow(self, fragment, milliseconds):
+        """Atrasa as respostas cujo caminho contém ``fragment``"""
+        self.slow_routes.append((fragment, milliseconds))
+
+    def delay_for(self, path):
+        for fragment, milliseconds in reversed(self.slow_routes):
+            if fragment in path:
+                return milliseconds
+        return self.latency
+
+    # ---------- HTTP ----------
+
+    async def handle(self, route):
+        request = route.request
+        if request.method == "OPTIONS":
+            await route.fulfill(status=204, headers=CORS_HEADERS)
+            return
+        url = urlsplit(request.url)
+        delay = self.delay_for(url.path)
+        if delay:
+            await asyncio.sleep(delay / 1000)
+        try:
+            reply = self.dispatch(request.method, url.path, url.query, request.headers, request.post_data_buffer)
+        except FakeError as e:
+            reply = Reply(e.status, e.body, {})
+        body, content_type = reply.body, "application/json"
+        if isinstance(body, tuple):
+            body, content_type = body
+        elif body is not None:
+            body = json.dumps(body, default=str)
+        headers = {**CORS_HEADERS, "content-type": content_type, **reply.headers}
+        await route.fulfill(status=reply.status, headers=headers, body=body if body is not None else "")
+
+    def dispatch(self, method, path, query, headers, body):
+        for prefix, handler in (
+            ("/rest/v1/rpc/", self._rpc),
+            ("/rest/v1/", self._rest),
+            ("/auth/v1/", self._auth),
+            ("/storage/v1/", self._storage),
+        ):
+            if path.startswith(prefix):
+                return handler(method, unquote(path[len(prefix):]), query, headers, body)
+        raise FakeError(404, {"message": f"rota não simulada: {path}"})
+
+    # ---------- REST ----------
+
+    def _rest(self, method, name, query, headers, body):
+        params = parse_qsl(query, keep_blank_values=True)
+        options = {key: value for key, value in params if key in _RESERVED}
+        filters = [(key, value) for key, value in params if key not in _RESERVED]
+        select = parse_select(options.get("select", "*"))
+        prefer = headers.get("prefer", "")
+        single = "vnd.pgrst.object" in headers.get("accept", "")
+        rows = self.table(name)
+
+        if method in ("GET", "HEAD"):
+            matched = self._match(rows, filters)
+            pairs = [(row, self._project(name, row, select, filters)) for row in matched]
+            pairs = [pair for pair in pairs if pair[1] is not None]
+            _sort(pairs, _parse_order(options.get("order", "")), key=lambda pair: pair[0])
+            total = len(pairs)
+            offset = int(options.get("offset", 0))
+            limit = options.get("limit")
+            pairs = pairs[offset:offset + int(limit)] if limit is not None else pairs[offset:]
+            result = [projected for _, projected in pairs]
+            return self._rows_reply(result, single, prefer, total, offset, 200, method == "HEAD")
+
+        if method == "POST":
+            payload = json.loads(body or b"[]")
+            payload = payload if isinstance(payload, list) else [payload]
+            changed = self._insert(name, payload, prefer, options.get("on_conflict"))
+        elif method == "PATCH":
+            values = json.loads(body or b"{}")
+            changed = []
+            for row in self._match(rows, filters):
+                old = dict(row)
+                row.update(values)
+                if "updated_at" in row and "updated_at" not in values:
+                    row["updated_at"] = _now()
+                self._notify(name, "UPDATE", row, old)
+                changed.append(row)
+        elif method == "DELETE":
+            changed = self._match(rows, filters)
+            for row in changed:
+                rows.remove(row)
+                self._notify(name, "DELETE", {}, row)
+        else:
+            raise _postgrest_error(405, "PGRST117", f"Unsupported HTTP method: {method}")
+
+        status = 201 if method == "POST" else 200
+        if "return=representation" not in prefer:
+            count = {"content-range": f"*/{len(changed)}"} if "count=" in prefer else {}
+            return Reply(status if method == "POST" else 204, None, count)
+        result = [self._project(name, row, select, []) for row in changed]
+        return self._rows_reply(result, single, prefer, len(result), 0, status, False)
+
+    def _match(self, rows, filters):
+        predicates = [_filter(key, value) for key, value in filters if "." not in key or key.startswith("not.")]
+        return [row for row in rows if all(predicate(row) for predicate in predicates)]
+
+    def _insert(self, name, payload, prefer, on_conflict):
+        rows = self.table(name)
+        keys = (on_conflict or "id").split(",")
+        merge = "resolution=merge-duplicates" in prefer
+        ignore = "resolution=ignore-duplicates" in prefer
+        changed = []
+        for values in payload:
+            existing = None
+            if all(values.get(key) is not None for key in keys):
+                existing = next(
+                    (row for row in rows if all(row.get(key) == values[key] for key in keys)), None
+                )
+            if existing is not None:
+                if ignore:
+                    continue
+                if not merge:
+                    raise _postgrest_error(
+                        409, "23505", "duplicate key value violates unique constraint",
+                        f"Key ({', '.join(keys)}) already exists.",
+                    )
+                old = dict(existing)
+                existing.update(values)
+                self._notify(name, "UPDATE", existing, old)
+                changed.append(existing)
+                continue
+            row = self._new_row(name, values)
+            rows.append(row)
+            self._notify(name, "INSERT", row, None)
+            changed.append(row)
+        return changed
+
+    def _rows_reply(self, rows, single, prefer, total, offset, status, head):
+        headers = {}
+        end = offset + len(rows) - 1
+        span = f"{offset}-{end}" if rows else "*"
+        headers["content-range"] = f"{span}/{total}" if "count=" in prefer else f"{span}/*"
+        if single:
+            if len(rows) != 1:
+                raise _postgrest_error(
+                    406, "PGRST116", "JSON object requested, multiple (or no) rows returned",
+                    f"The result contains {len(rows)} rows",
+                )
+            return Reply(status, None if head else rows[0], headers)
+        return Reply(status, None if head else rows, headers)
+
+    def _relation(self, name, row, embed):
+        """
+        Como ligar ``name`` à tabela embutida: (coluna local, coluna remota,
+        é lista). Sem chave estrangeira nas migrações, tenta ``<singular>_id``.
+        """
+        source = self.schema.get(name) or Table(name)
+        target = self.schema.get(embed.table) or Table(embed.table)
+        hint = embed.hint or ""
+        for column, referenced in source.references.items():
+            if referenced == embed.table and (not hint or hint == column or column in hint):
+                return column, "id", False
+        for column, referenced in target.references.items():
+            if referenced == name and (not hint or hint == column or column in hint):
+                return "id", column, True
+        if hint in source.columns:
+            return hint, "id", False
+        for singular in (embed.table[:-1], embed.table[:-2], embed.table):
+            if f"{singular}_id" in source.columns or f"{singular}_id" in row:
+                return f"{singular}_id", "id", False
+        for singular in (name[:-1], name[:-2], name):
+            if f"{singular}_id" in target.columns:
+                return "id", f"{singular}_id", True
+        return None
+
+    def _project(self, name, row, select, filters):
+        """Linha com as colunas pedidas e as relações embutidas; None se um !inner não casou"""
+        result = {}
+        for item in select:
+            if isinstance(item, Field):
+                if item.name == "*":
+                    result.update(row)
+                else:
+                    result[item.alias] = _cell(row, item.name)
+                continue
+            value = self._embed(name, row, item, filters)
+            if item.inner and not value:
+                return None
+            if item.spread and isinstance(value, dict):
+                result.update(value)
+            else:
+                result[item.alias] = value
+        return result
+
+    def _embed(self, name, row, embed, filters):
+        relation = self._relation(name, row, embed)
+        if relation is None:
+            return None
+        local, remote, many = relation
+        prefix = f"{embed.alias}."
+        nested = [(key[len(prefix):], value) for key, value in filters if key.startswith(prefix)]
+        own = [(key, value) for key, value in nested if "." not in key]
+        candidates = [
+            candidate for candidate in self._match(self.table(embed.table), own)
+            if row.get(local) is not None and candidate.get(remote) == row.get(local)
+        ]
+        if embed.select == [Field("count", "count")]:
+            return [{"count": len(candidates)}]
+        projected = [self._project(embed.table, candidate, embed.select, nested) for candidate in candidates]
+        projected = [item for item in projected if item is not None]
+        if many:
+            return projected
+        return projected[0] if projected else None
+
+    def _rpc(self, method, name, query, headers, body):
+        function = self.functions.get(name)
+        if function is None:
+            raise _postgrest_error(
+                404, "PGRST202", f"Could not find the function public.{name} in the schema cache",
+            )
+        args = json.loads(body or b"{}") if method == "POST" else dict(parse_qsl(query))
+        return Reply(200, function(self, args), {})
+
+    # ---------- Auth ----------
+
+    def _sign(self, payload):
+        def encode(data):
+            raw = json.dumps(data, separators=(",", ":")).encode()
+            return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+        head = encode({"alg": "HS256", "typ": "JWT"}) + "." + encode(payload)
+        signature = hmac.new(JWT_SECRET, head.encode(), hashlib.sha256).digest()
+        return head + "." + base64.urlsafe_b64encode(signature).rstrip(b"=").decode()
+
+    def _verify(self, token, kind="access"):
+        try:
+            head, payload, signature = token.split(".")
+            expected = hmac.new(JWT_SECRET, f"{head}.{payload}".encode(), hashlib.sha256).digest()
+            if not hmac.compare_digest(base64.urlsafe_b64encode(expected).rstrip(b"=").decode(), signature):
+                return None
+            claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        except (ValueError, AttributeError):
+            return None
+        if claims.get("typ", "access") != kind or claims.get("exp", 0) < time.time():
+            return None
+        return claims
+
+    def _user_json(self, user):
+        return {
+            "id": user["id"],
+            "aud": "authenticated",
+            "role": "authenticated",
+            "email": user["email"],
+            "email_confirmed_at": user.get("created_at", _now()),
+            "phone": "",
+            "app_metadata": {"provider": "email", "providers": ["email"]},
+            "user_metadata": user.get("user_metadata", {"full_name": user.get("full_name")}),
+            "identities": [],
+            "created_at": user.get("created_at", _now()),
+            "updated_at": _now(),
+        }
+
+    def _session(self, user):
+        issued = int(time.time())
+        expires = issued + int(self.session_ttl)
+        session_id = str(uuid.uuid4())
+        claims = {"sub": user["id"], "email": user["email"], "session_id": session_id, "iat": issued}
+        return {
+            "access_token": self._sign(dict(claims, aud="authenticated", role="authenticated", exp=expires)),
+            "token_type": "bearer",
+            "expires_in": int(self.session_ttl),
+            "expires_at": expires,
+            "refresh_token": self._sign(dict(claims, typ="refresh", exp=issued + 30 * 86400)),
+            "user": self._user_json(user),
+        }
+
+    def _user_by(self, key, value):
+        return next((user for user in self.users if user.get(key) == value), None)
+
+    def _current_user(self, headers):
+        token = headers.get("authorization", "").removeprefix("Bearer ").strip()
+        claims = self._verify(token)
+        user = claims and self._user_by("id", claims["sub"])
+        if not user:
+            raise FakeError(403, {
+                "code": 403, "error_code": "bad_jwt", "msg": "invalid JWT: unable to parse or verify signature",
+            })
+        return user
+
+    def _auth(self, method, path, query, headers, body):
+        params = dict(parse_qsl(query))
+        data = json.loads(body or b"{}") if body else {}
+        if path == "token" and method == "POST":
+            grant = params.get("grant_type")
+            if grant == "password":
+                user = self._user_by("email", (data.get("email") or "").lower())
+                if not user or user.get("password") != data.get("password"):
+                    raise FakeError(400, {
+                        "code": 400, "error_code": "invalid_credentials", "msg": "Invalid login credentials",
+                        "error": "invalid_grant", "error_description": "Invalid login credentials",
+                    })
+                return Reply(200, self._session(user), {})
+            if grant == "refresh_token":
+                claims = self._verify(data.get("refresh_token", ""), kind="refresh")
+                user = claims and self._user_by("id", claims["sub"])
+                if not user:
+                    raise FakeError(400, {
+                        "code": 400, "error_code": "refresh_token_not_found", "msg": "Invalid Refresh Token",
+                    })
+                return Reply(200, self._session(user), {})
+            raise FakeError(400, {"code": 400, "error_code": "validation_failed", "msg": "unsupported grant_type"})
+        if path == "signup" and method == "POST":
+            email = (data.get("email") or "").lower()
+            if self._user_by("email", email):
+                raise FakeError(422, {"code": 422, "error_code": "user_already_exists", "msg": "User already registered"})
+            user = {
+                "id": str(uuid.uuid4()), "email": email, "password": data.get("password"),
+                "user_metadata": data.get("data") or {}, "created_at": _now(),
+            }
+            self.users.append(user)
+            return Reply(200, self._session(user), {})
+        if path == "user":
+            user = self._current_user(headers)
+            if method == "PUT":
+                user.setdefault("user_metadata", {}).update(data.get("data") or {})
+                if data.get("password"):
+                    user["password"] = data["password"]
+            return Reply(200, self._user_json(user), {})
+        if path == "logout":
+            return Reply(204, None, {})
+        if path in ("recover", "otp", "resend"):
+            return Reply(200, {}, {})
+        if path == "settings":
+            return Reply(200, {"external": {"email": True}, "disable_signup": False, "autoconfirm": True}, {})
+        raise FakeError(404, {"code": 404, "msg": f"rota de auth não simulada: {path}"})
+
+    # ---------- Storage ----------
+
+    def _object_reply(self, bucket, name):
+        stored = self.objects.get((bucket, name))
+        if stored is None:
+            raise FakeError(400, {"statusCode": "404", "error": "not_found", "message": "Object not found"})
+        return Reply(200, (stored["data"], stored["content_type"]), {})
+
+    def _storage(self, method, path, query, headers, body):
+        parts = path.split("/")
+        if parts[0] == "bucket":
+            if method == "GET":
+                return Reply(200, [{"id": name, "name": name, "public": True} for name in sorted(self.buckets)], {})
+            if method == "POST":
+                name = json.loads(body or b"{}").get("name") or json.loads(body or b"{}").get("id")
+                self.buckets.add(name)
+                return Reply(200, {"name": name}, {})
+            return Reply(200, {"message": "ok"}, {})
+        if parts[0] != "object" or len(parts) < 2:
+            raise FakeError(404, {"statusCode": "404", "error": "not_found", "message": f"rota não simulada: {path}"})
+
+        action = parts[1]
+        if action in ("public", "authenticated") and len(parts) > 3:
+            return self._object_reply(parts[2], "/".join(parts[3:]))
+        if action == "sign" and len(parts) > 3:
+            bucket, name = parts[2], "/".join(parts[3:])
+            if method == "GET":
+                return self._object_reply(bucket, name)
+            return Reply(200, {"signedURL": f"/object/sign/{bucket}/{name}?token=fake"}, {})
+        if action == "list" and len(parts) > 2:
+            options = json.loads(body or b"{}")
+            prefix = (options.get("prefix") or "").strip("/")
+            entries = []
+            for (bucket, name), stored in sorted(self.objects.items()):
+                if bucket != parts[2] or (prefix and not name.startswith(prefix + "/")):
+                    continue
+                relative = name[len(prefix) + 1:] if prefix else name
+                if "/" in relative:
+                    continue
+                entries.append({
+                    "name": relative, "id": stored["id"], "created_at": stored["created_at"],
+                    "updated_at": stored["created_at"],
+                    "metadata": {"size": len(stored["data"]), "mimetype": stored["content_type"]},
+                })
+            offset = options.get("offset", 0)
+            return Reply(200, entries[offset:offset + options.get("limit", 100)], {})
+
+        bucket, name = action, "/".join(parts[2:])
+        if method in ("POST", "PUT") and name:
+            if method == "POST" and (bucket, name) in self.objects and headers.get("x-upsert") != "true":
+                raise FakeError(400, {"statusCode": "409", "error": "Duplicate", "message": "The resource already exists"})
+            self.buckets.add(bucket)
+            stored = {
+                "id": str(uuid.uuid4()), "data": body or b"", "created_at": _now(),
+                "content_type": headers.get("content-type", "application/octet-stream"),
+            }
+            self.objects[(bucket, name)] = stored
+            return Reply(200, {"Key": f"{bucket}/{name}", "Id": stored["id"]}, {})
+        if method == "DELETE":
+            prefixes = json.loads(body or b"{}").get("prefixes") or ([name] if name else [])
+            removed = []
+            for prefix in prefixes:
+                stored = self.objects.pop((bucket, prefix), None)
+                if stored:
+                    removed.append({"name": prefix, "bucket_id": bucket, "id": stored["id"]})
+            return Reply(200, removed, {})
+        if method == "GET" and name:
+            return self._object_reply(bucket, name)
+        raise FakeError(404, {"statusCode": "404", "error": "not_found", "message": f"rota não simulada: {path}"})
+
+    # ---------- Realtime ----------
+
+    def realtime(self, socket):
+        """Atende o WebSocket do Realtime sem servidor: joins, heartbeats e eventos das escritas"""
+        socket.on_message(lambda message: self._realtime_message(socket, message))
+        socket.on_close(lambda *args: self._drop(socket))
+
+    def _drop(self, socket, topic=None):
+        self._channels = [
+            channel for channel in self._channels
+            if not (channel.socket is socket and topic in (None, channel.topic))
+        ]
+
+    def live_channels(self):
+        """Tópicos dos canais do Realtime inscritos agora (um por ``supabase.channel()`` vivo)"""
+        return [channel.topic for channel in self._channels]
+
+    def _send(self, socket, array, join_ref, ref, topic, event, payload):
+        if array:
+            socket.send(json.dumps([join_ref, ref, topic, event, payload]))
+        else:
+            socket.send(json.dumps({"join_ref": join_ref, "ref": ref, "topic": topic, "event": event, "payload": payload}))
+
+    def _realtime_message(self, socket, message):
+        try:
+            data = json.loads(message)
+        except (TypeError, ValueError):
+            return
+        array = isinstance(data, list)
+        if array:
+            join_ref, ref, topic, event, payload = data
+        else:
+            join_ref, ref = data.get("join_ref"), data.get("ref")
+            topic, event, payload = data.get("topic"), data.get("event"), data.get("payload") or {}
+        response = {}
+        if event == "phx_join":
+            changes = (payload.get("config") or {}).get("postgres_changes") or []
+            bindings = [dict(change, id=index + 1) for index, change in enumerate(changes)]
+            response = {"postgres_changes": bindings}
+            self._channels.append(Channel(socket, topic, join_ref or ref, bindings, array))
+        elif event == "phx_leave":
+            self._drop(socket, topic)
+        self._send(socket, array, join_ref, ref, topic, "phx_reply", {"status": "ok", "response": response})
+
+    def _notify(self, table, kind, record, old):
+        for channel in list(self._channels):
+            ids = []
+            for binding in channel.bindings:
+                if binding.get("schema", "public") not in ("public", "*"):
+                    continue
+                if binding.get("table", "*") not in (table, "*") or binding.get("event", "*") not in (kind, "*"):
+                    continue
+                row_filter = binding.get("filter")
+                if row_filter:
+                    column, _, expression = row_filter.partition("=")
+                    if not _condition(column, expression)(record or old or {}):
+                        continue
+                ids.append(binding["id"])
+            if not ids:
+                continue
+            payload = {"ids": ids, "data": {
+                "schema": "public", "table": table, "commit_timestamp": _now(), "type": kind,
+                "record": record or {}, "old_record": old or {}, "columns": [], "errors": None,
+            }}
+            try:
+                self._send(channel.socket, channel.array, channel.join_ref, None, channel.topic,
+                           "postgres_changes", payload)
+            except Exception:
+                self._channels.remove(channel)
+
+
+async def install(context, app_url, backend=None):
+    """
+    Liga o Supabase falso ao contexto e bloqueia as demais saídas para a
+    rede (tudo que não é o app em ``app_url``). Retorna o backend.
+    """
+    backend = backend or FakeSupabase()
+    app_origin = "{0.scheme}://{0.netloc}".format(urlsplit(app_url))
+
+    def is_external(url):
+        if not url.startswith(("http://", "https://")) or url.startswith(app_origin):
+            return False
+        return not is_supabase_url(url)
+
+    # A rota registrada por último tem prioridade: o bloqueio vem primeiro
+    await context.route(is_external, lambda route: route.abort("internetdisconnected"))
+    await context.route(is_supabase_url, backend.handle)
+    if hasattr(context, "route_web_socket"):
+        await context.route_web_socket(is_supabase_url, backend.realtime)
+    _backends[context] = backend
+    return backend
+
+
+def backend_for(context):
+    """O Supabase falso ligado ao contexto, ou None fora do modo offline"""
+    return _backends.get(context)
@@ -0,0 +1,256 @@
+"""
+Trace e HAR por teste, com um resumo dos pontos quentes
+
+Quando um teste demora ou falha, a única saída era o ``AssertionError``.
+Com ``run_suite.py --trace slow`` cada teste roda gravando:
+
+- o trace do Playwright (``trace.zip``, abre com ``playwright show-trace``);
+- o HAR da rede (``network.har``, sem os corpos);
+- long tasks e layout shifts da página (``PerformanceObserver``) e os
+  contadores de layout/recalc de estilo do Chromium (CDP ``Performance``).
+
+Testes que passaram rápido têm os arquivos descartados; os que falharam ou
+passaram de ``--slow`` segundos ficam em ``artifacts/<teste>/``, com um
+``hotspots.json``: requisições mais lentas, maiores respostas (os
+``select('*')`` do financeiro aparecem aqui), long tasks e sinais de
+layout thrash. ``testsprite-hotspots.md``, ao lado do relatório, junta
+todos os testes guardados. ``--trace all`` guarda tudo.
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import shutil
+from collections import namedtuple
+from pathlib import Path
+
+from fake_supabase import is_supabase_url
+from netlog import describe
+
+TESTS_DIR = Path(__file__).resolve().parent
+ARTIFACTS_DIR = TESTS_DIR / "artifacts"
+
+# Duração (s) a partir da qual um teste conta como lento
+SLOW_TEST = 30.0
+
+# Quantos itens cada lista do resumo mostra
+TOP = 5
+
+# Layouts por segundo de teste acima dos quais o resumo acusa layout thrash
+THRASH_LAYOUTS_PER_SECOND = 50
+
+Tracing = namedtuple("Tracing", ["mode", "slow"])
+
+NO_TRACING = Tracing("off", SLOW_TEST)
+
+_OBSERVERS = """
+(() => {
+    const hotspots = window.__hotspots = { longTasks: [], layoutShift: 0, shifts: 0 };
+    try {
+        new PerformanceObserver(list => {
+            for (const entry of list.getEntries()) {
+                hotspots.longTasks.push({ start: entry.startTime, duration: entry.duration, url: location.pathname });
+            }
+        }).observe({ type: 'longtask', buffered: true });
+        new PerformanceObserver(list => {
+            for (const entry of list.getEntries()) {
+                if (!entry.hadRecentInput) {
+                    hotspots.layoutShift += entry.value;
+                    hotspots.shifts += 1;
+                }
+            }
+        }).observe({ type: 'layout-shift', buffered: true });
+    } catch (error) {
+        // Navegador sem suporte: as listas ficam vazias
+    }
+})();
+"""
+
+# Contadores do CDP Performance.getMetrics guardados no resumo
+_METRICS = (
+    "LayoutCount", "LayoutDuration", "RecalcStyleCount", "RecalcStyleDuration", "TaskDuration", "ScriptDuration",
+)
+
+
+class Capture:
+    """Trace, HAR e métricas de página de um teste"""
+
+    def __init__(self, name, tracing, directory=ARTIFACTS_DIR):
+        self.name = name
+        self.tracing = tracing
+        self.directory = Path(directory) / name
+        self.har = self.directory / "network.har"
+        self.trace = self.directory / "trace.zip"
+        self.pages = []
+        self._sessions = {}
+
+    def context_options(self):
+        """Opções de ``new_context`` para gravar o HAR (gravado ao fechar o contexto)"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return {"record_har_path": str(self.har), "record_har_content": "omit"}
+
+    async def start(self, context):
+        await context.add_init_script(_OBSERVERS)
+        await context.tracing.start(screenshots=True, snapshots=True, sources=False)
+        context.on("page", lambda page: asyncio.ensure_future(self._watch(page)))
+        for page in context.pages:
+            await self._watch(page)
+
+    async def _watch(self, page):
+        with contextlib.suppress(Exception):
+            session = await page.context.new_cdp_session(page)
+            await session.send("Performance.enable")
+            self._sessions[page] = session
+
+    async def stop(self, context):
+        """Coleta as métricas das páginas abertas e salva o trace; nunca falha o teste"""
+        for page in context.pages:
+            entry = {"url": page.url, "longTasks": [], "layoutShift": 0, "shifts": 0, "metrics": {}}
+            with contextlib.suppress(Exception):
+                entry.update(await page.evaluate("() => window.__hotspots || {}"))
+            session = self._sessions.get(page)
+            if session is not None:
+                with contextlib.suppress(Exception):
+                    metrics = (await session.send("Performance.getMetrics"))["metrics"]
+                    entry["metrics"] = {item["name"]: item["value"] for item in metrics if item["name"] in _METRICS}
+            entry["url"] = page.url
+            self.pages.append(entry)
+        with contextlib.suppress(Exception):
+            await context.tracing.stop(path=str(self.trace))
+
+    def keep(self, status, duration):
+        return self.tracing.mode == "all" or status != "passed" or duration >= self.tracing.slow
+
+    def finish(self, status, duration, error=None):
+        """
+        Depois de o contexto fechar (o HAR só existe então): grava o
+        ``hotspots.json`` se o teste merece ser guardado, senão apaga tudo.
+        """
+        if not self.keep(status, duration):
+            shutil.rmtree(self.directory, ignore_errors=True)
+            return None
+        summary = summarize(self.har, self.pages)
+        summary.update({"test": self.name, "status": status, "duration": round(duration, 2), "error": error})
+        with open(self.directory / "hotspots.json", 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        return summary
+
+
+def _label(method, url):
+    if is_supabase_url(url):
+        return describe(method, url).shape
+    return f"{method} {url.split('?', 1)[0]}"
+
+
+def _har_entries(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)["log"]["entries"]
+    except (OSError, ValueError, KeyError):
+        return []
+
+
+def summarize(har_path, pages, top=TOP):
+    """Pontos quentes a partir do HAR e das métricas coletadas nas páginas"""
+    requests = []
+    for entry in _har_entries(har_path):
+        response = entry.get("response", {})
+        size = max(
+            response.get("bodySize", -1), response.get("content", {}).get("size", -1),
+            response.get("_transferSize", -1), 0,
+        )
+        requests.append({
+            "request": _label(entry["request"]["method"], entry["request"]["url"]),
+            "status": response.get("status"),
+            "time_ms": round(entry.get("time", 0), 1),
+            "size_kb": round(size / 1024, 1),
+        })
+
+    long_tasks = [task for page in pages for task in page.get("longTasks", [])]
+    totals = {name: sum(page["metrics"].get(name, 0) for page in pages) for name in _METRICS}
+    return {
+        "requests": len(requests),
+        "transfer_kb": round(sum(item["size_kb"] for item in requests), 1),
+        "slowest_requests": sorted(requests, key=lambda item: item["time_ms"], reverse=True)[:top],
+        "largest_payloads": sorted(requests, key=lambda item: item["size_kb"], reverse=True)[:top],
+        "long_tasks": {
+            "count": len(long_tasks),
+            "total_ms": round(sum(task["duration"] for task in long_tasks), 1),
+            "longest": sorted(long_tasks, key=lambda task: task["duration"], reverse=True)[:top],
+        },
+        "layout": {
+            "layouts": int(totals["LayoutCount"]),
+            "layout_ms": round(totals["LayoutDuration"] * 1000, 1),
+            "style_recalcs": int(totals["RecalcStyleCount"]),
+            "style_recalc_ms": round(totals["RecalcStyleDuration"] * 1000, 1),
+            "script_ms": round(totals["ScriptDuration"] * 1000, 1),
+            "layout_shift": round(sum(page.get("layoutShift", 0) for page in pages), 3),
+        },
+    }
+
+
+def _thrash(summary):
+    duration = max(summary["duration"], 1)
+    return summary["layout"]["layouts"] / duration >= THRASH_LAYOUTS_PER_SECOND
+
+
+def render_markdown(summaries, artifacts="artifacts"):
+    """Markdown dos resumos; ``artifacts`` é o caminho dos artefatos visto do arquivo gerado"""
+    lines = ["# 🔥 Hot spots dos testes", ""]
+    if not summaries:
+        lines.append("Nenhum teste lento ou com falha nesta execução.")
+    for summary in summaries:
+        layout, tasks = summary["layout"], summary["long_tasks"]
+        lines += [
+            f"## {summary['test']} — {summary['status']} em {summary['duration']:.1f}s",
+            "",
+            f"- **Rede:** {summary['requests']} requisições, {summary['transfer_kb']:.1f} KB",
+            f"- **Long tasks:** {tasks['count']} ({tasks['total_ms']:.0f} ms no total)",
+            f"- **Layout:** {layout['layouts']} layouts ({layout['layout_ms']:.0f} ms), "
+            f"{layout['style_recalcs']} recálculos de estilo ({layout['style_recalc_ms']:.0f} ms), "
+            f"CLS {layout['layout_shift']:.3f}" + (" — ⚠️ possível layout thrash" if _thrash(summary) else ""),
+            f"- **Artefatos:** [trace.zip]({artifacts}/{summary['test']}/trace.zip), "
+            f"[network.har]({artifacts}/{summary['test']}/network.har)",
+            "",
+            "| Mais lentas | ms | | Maiores | KB |",
+            "|-------------|----|-|---------|----|",
+        ]
+        slowest, largest = summary["slowest_requests"], summary["largest_payloads"]
+        for index in range(max(len(slowest), len(largest))):
+            slow = slowest[index] if index < len(slowest) else None
+            large = largest[index] if index < len(largest) else None
+            lines.append(
+                f"| {'`' + slow['request'] + '`' if slow else ''} | {slow['time_ms'] if slow else ''} | "
+                f"| {'`' + large['request'] + '`' if large else ''} | {large['size_kb'] if large else ''} |"
+            )
+        if summary.get("error"):
+            lines += ["", "```", summary["error"].strip(), "```"]
+        lines += ["", "---", ""]
+    return "\n".join(lines)
+
+
+def clear(names, directory=ARTIFACTS_DIR):
+    """Apaga os artefatos de execuções anteriores dos testes que vão rodar"""
+    for name in names:
+        shutil.rmtree(Path(directory) / name, ignore_errors=True)
+
+
+def collect(names, directory=ARTIFACTS_DIR):
+    """Resumos gravados nesta execução (por qualquer processo), na ordem de ``names``"""
+    summaries = []
+    for name in names:
+        path = Path(directory) / name / "hotspots.json"
+        if path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                summaries.append(json.load(f))
+    return summaries
+
+
+def write_report(names, path, directory=ARTIFACTS_DIR):
+    """Markdown com os pontos quentes de todos os testes guardados; retorna quantos"""
+    summaries = collect(names, directory)
+    artifacts = Path(os.path.relpath(directory, Path(path).resolve().parent)).as_posix()
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(render_markdown(summaries, artifacts))
+    return len(summaries)
@@ -0,0 +1,79 @@
+"""
+Registro de seletores estáveis para os testes TC0xx
+
+Os testes gerados pelo TestSprite localizavam tudo por XPath absoluto
+(``xpath=html/body/div/div/div/form/div[2]/button``), copiado em cada
+arquivo: lento de avaliar e quebrado a cada mudança de layout, o que
+virava retentativas e timeouts. Aqui cada elemento tem um nome e um
+seletor por ``data-testid``, com um atributo estável (``id``, ``type``,
+texto do botão) como reserva para builds sem o ``data-testid``::
+
+    from locators import LoginForm, locate
+
+    await click(locate(page, "error.home"))
+    await LoginForm(page).login(email, password)
+
+Mudou o layout? Só ``SELECTORS`` muda. Os ``Locator`` ficam em cache por
+página, então repetir o mesmo nome não monta o seletor de novo. (O
+módulo não se chama ``selectors`` para não esconder o da biblioteca
+padrão, que o asyncio importa.)
+"""
+
+import weakref
+
+from waits import fill, submit_login
+
+# Nome -> seletor do Playwright (data-testid primeiro; a lista CSS devolve o mesmo elemento uma vez)
+SELECTORS = {
+    "app.root": "#root",
+    "login.email": '[data-testid="login-email"], #email',
+    "login.password": '[data-testid="login-password"], #password',
+    "login.submit": '[data-testid="login-submit"], form button[type="submit"]',
+    "error.retry": '[data-testid="error-retry"], button:has-text("Tentar Novamente")',
+    "error.home": '[data-testid="error-home"], button:has-text("Voltar ao Início")',
+}
+
+_locators = weakref.WeakKeyDictionary()
+
+
+def selector(name):
+    if name not in SELECTORS:
+        raise ValueError(f"seletor desconhecido {name!r} (use {', '.join(SELECTORS)})")
+    return SELECTORS[name]
+
+
+def locate(page, name):
+    """``Locator`` do elemento ``name`` em ``page`` (página ou frame), criado uma vez por página"""
+    cache = _locators.setdefault(page, {})
+    locator = cache.get(name)
+    if locator is None:
+        locator = cache[name] = page.locator(selector(name)).first
+    return locator
+
+
+class LoginForm:
+    """Formulário de login (pages/auth/LoginSimple.tsx)"""
+
+    def __init__(self, page):
+        self.page = page
+
+    @property
+    def email(self):
+        return locate(self.page, "login.email")
+
+    @property
+    def password(self):
+        return locate(self.page, "login.password")
+
+    @property
+    def submit_button(self):
+        return locate(self.page, "login.submit")
+
+    async def submit(self):
+        await submit_login(self.submit_button)
+
+    async def login(self, email, password):
+        """Preenche e envia o formulário, esperando a resposta do Supabase Auth"""
+        await fill(self.email, email)
+        await fill(self.password, password)
+        await self.submit()
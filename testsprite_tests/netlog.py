@@ -0,0 +1,152 @@
+"""
+Registro das chamadas ao Supabase por página e detector de N+1
+
+Telas como o dashboard de pavimentação disparam uma cascata de consultas
+por linha: para cada programação, ``obras``, depois ``clients``, depois
+``obras_ruas``, cada uma com ``.eq('id', ...)``. ``NetworkRecorder`` anota
+toda requisição ao Supabase de um contexto, separada por visita de página
+(cada rota da SPA conta como uma visita), e agrupa as chamadas por tabela e
+formato do filtro, com os valores trocados por ``?``::
+
+    GET obras ?id=eq.?&select=name,client_id
+
+Um mesmo formato repetido com valores diferentes em uma coluna filtrada
+por ``eq`` é um N+1: dá para buscar tudo de uma vez com ``.in(coluna, [...])``.
+Também há um limite de requisições por visita.
+
+``run_suite.py --network warn`` só avisa; ``--network fail`` reprova o
+teste que passou dos limites.
+"""
+
+import re
+from collections import namedtuple
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from fake_supabase import is_supabase_url
+
+# Requisições ao Supabase aceitas em uma visita de página
+MAX_REQUESTS = 40
+
+# Consultas com o mesmo formato (e valores diferentes) a partir das quais é N+1
+N_PLUS_ONE = 3
+
+# Parâmetros que fazem parte do formato com o valor (não são filtros)
+_SHAPE_PARAMS = ("select", "order", "limit", "offset", "on_conflict", "columns")
+
+Call = namedtuple("Call", ["method", "table", "shape", "lookups", "url"])
+Visit = namedtuple("Visit", ["path", "calls"])
+Policy = namedtuple("Policy", ["mode", "max_requests", "n_plus_one"])
+
+DEFAULT_POLICY = Policy("off", MAX_REQUESTS, N_PLUS_ONE)
+
+
+def describe(method, url):
+    """
+    ``Call`` de uma requisição ao Supabase. ``lookups`` traz, para cada
+    coluna filtrada com ``eq``, o valor usado; é o que varia em um N+1.
+    """
+    parts = urlsplit(url)
+    path = unquote(parts.path)
+    for prefix, kind in (("/rest/v1/rpc/", "rpc:"), ("/rest/v1/", ""), ("/storage/v1/object/", "storage:"),
+                         ("/auth/v1/", "auth:")):
+        if path.startswith(prefix):
+            name = path[len(prefix):]
+            break
+    else:
+        return Call(method, path, f"{method} {path}", {}, url)
+    if kind == "storage:":
+        name = name.split("/")[0]
+    table = kind + name
+
+    shape, lookups = [], {}
+    for key, value in parse_qsl(parts.query, keep_blank_values=True):
+        if key in _SHAPE_PARAMS:
+            shape.append(f"{key}={value}")
+        elif key in ("or", "and", "not.or", "not.and"):
+            shape.append(f"{key}=(…)")
+        else:
+            op = re.match(r"^((?:not\.)?\w+(?:\((?:any|all)\))?)\.", value)
+            op = op.group(1) if op else value
+            shape.append(f"{key}={op}.?")
+            if op == "eq":
+                lookups[key] = value[3:]
+    query = "&".join(sorted(shape))
+    return Call(method, table, f"{method} {table}" + (f" ?{query}" if query else ""), lookups, url)
+
+
+class NetworkRecorder:
+    """Chamadas ao Supabase de um ``BrowserContext``, por visita de página"""
+
+    def __init__(self, context):
+        self.visits = [Visit("(antes da primeira navegação)", [])]
+        context.on("page", self._watch)
+        for page in context.pages:
+            self._watch(page)
+        context.on("request", self._request)
+
+    def _watch(self, page):
+        def navigated(frame):
+            if frame is page.main_frame:
+                self._visit(urlsplit(frame.url).path or "/")
+        page.on("framenavigated", navigated)
+
+    def _visit(self, path):
+        # Recarregar ou mudar só a query string não abre uma visita nova
+        if self.visits[-1].path != path:
+            self.visits.append(Visit(path, []))
+
+    def _request(self, request):
+        if request.method == "OPTIONS" or request.resource_type == "websocket":
+            return
+        if is_supabase_url(request.url):
+            self.visits[-1].calls.append(describe(request.method, request.url))
+
+    def problems(self, max_requests=MAX_REQUESTS, n_plus_one=N_PLUS_ONE):
+        """Mensagens legíveis: visitas acima do limite e padrões N+1"""
+        found = []
+        for visit in self.visits:
+            if len(visit.calls) > max_requests:
+                found.append(
+                    f"{visit.path}: {len(visit.calls)} requisições ao Supabase (limite {max_requests})"
+                )
+            for shape, column, values in n_plus_one_patterns(visit.calls, n_plus_one):
+                table = shape.split(" ")[1]
+                repeated = len(values) - len(set(values))
+                extra = f", {repeated} repetida(s)" if repeated else ""
+                found.append(
+                    f"{visit.path}: N+1 em {table} — {len(values)} consultas por {column}=eq{extra}; "
+                    f"use .in('{column}', [...]) ({shape})"
+                )
+        return found
+
+    def summary(self, top=3):
+        """Linhas para o terminal: requisições por visita e os formatos mais repetidos"""
+        lines = []
+        for visit in self.visits:
+            if not visit.calls:
+                continue
+            counts = {}
+            for call in visit.calls:
+                counts[call.shape] = counts.get(call.shape, 0) + 1
+            lines.append(f"   {visit.path}: {len(visit.calls)} requisição(ões)")
+            for shape, count in sorted(counts.items(), key=lambda item: item[1], reverse=True)[:top]:
+                lines.append(f"      {count:>4}× {shape}")
+        return lines
+
+
+def n_plus_one_patterns(calls, threshold=N_PLUS_ONE):
+    """[(formato, coluna, valores)] dos formatos repetidos com valores diferentes em um ``eq``"""
+    by_shape = {}
+    for call in calls:
+        if call.lookups and not call.table.startswith(("auth:", "storage:")):
+            by_shape.setdefault(call.shape, []).append(call)
+    patterns = []
+    for shape, group in by_shape.items():
+        if len(group) < threshold:
+            continue
+        for column in group[0].lookups:
+            values = [call.lookups.get(column) for call in group]
+            if len(set(values)) > 1:
+                patterns.append((shape, column, values))
+                break
+    return patterns
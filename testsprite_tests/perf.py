@@ -0,0 +1,282 @@
+"""
+Orçamentos de desempenho de carregamento das páginas principais
+
+Carrega Dashboard, lista de obras e programação com a rede limitada via
+CDP (perfis 4G e 3G), sempre em um contexto novo (cache vazio) já
+autenticado, e coleta:
+
+- Navigation Timing (TTFB, DOMContentLoaded, load);
+- FCP e LCP (``PerformanceObserver``);
+- TTI: fim da última long task antes de uma janela de 5 s sem long tasks,
+  contada a partir do FCP/DOMContentLoaded (a mesma ideia do Lighthouse);
+- Resource Timing: bytes transferidos por recurso e no total.
+
+Cada medição é comparada com os limites de ``perf_budgets.json`` e
+acrescentada como uma linha JSON em ``perf-results.jsonl``, para
+acompanhar a tendência entre execuções::
+
+    python testsprite_tests/perf.py                       # 4G, as três páginas
+    python testsprite_tests/perf.py --profile 3g --page obras
+    python testsprite_tests/perf.py --budgets outro.json --output medições.jsonl
+
+Recursos de outras origens (Supabase) só informam o tamanho se a resposta
+tiver ``Timing-Allow-Origin``; sem isso entram com 0 byte.
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import sys
+from pathlib import Path
+
+from browser_pool import BASE_URL, BrowserPool, new_context
+from waits import settle, track_network
+
+TESTS_DIR = Path(__file__).resolve().parent
+BUDGETS_FILE = TESTS_DIR / "perf_budgets.json"
+RESULTS_FILE = TESTS_DIR / "perf-results.jsonl"
+
+# Páginas medidas: nome -> caminho
+PAGES = {
+    "dashboard": "/",
+    "obras": "/obras",
+    "programacao": "/programacao-pavimentacao",
+}
+
+# Perfis de rede do DevTools: latência (ms) e vazão (bytes/s)
+NETWORK_PROFILES = {
+    "4g": {"latency": 150, "download": 1.6 * 1024 * 1024 / 8, "upload": 750 * 1024 / 8},
+    "3g": {"latency": 562.5, "download": 1.44 * 1024 * 1024 / 8, "upload": 675 * 1024 / 8},
+}
+
+# Janela (ms) sem long tasks que caracteriza a página como interativa
+TTI_QUIET_WINDOW = 5000
+
+# Tempo máximo (s) observando a página à espera dessa janela
+MAX_OBSERVATION = 30
+
+# Registra LCP e long tasks desde o início do carregamento
+_OBSERVERS = """
+(() => {
+    const perf = window.__perf = { lcp: null, longTasks: [] };
+    try {
+        new PerformanceObserver(list => {
+            const entries = list.getEntries();
+            const last = entries[entries.length - 1];
+            perf.lcp = last.renderTime || last.loadTime || last.startTime;
+        }).observe({ type: 'largest-contentful-paint', buffered: true });
+        new PerformanceObserver(list => {
+            for (const entry of list.getEntries()) {
+                perf.longTasks.push([entry.startTime, entry.duration]);
+            }
+        }).observe({ type: 'longtask', buffered: true });
+    } catch (error) {
+        // Navegador sem suporte a algum dos tipos: a métrica fica vazia
+    }
+})();
+"""
+
+_COLLECT = """
+() => {
+    const navigation = performance.getEntriesByType('navigation')[0];
+    const fcp = performance.getEntriesByName('first-contentful-paint')[0];
+    return {
+        navigation: navigation ? navigation.toJSON() : null,
+        fcp: fcp ? fcp.startTime : null,
+        lcp: window.__perf ? window.__perf.lcp : null,
+        longTasks: window.__perf ? window.__perf.longTasks : [],
+        resources: performance.getEntriesByType('resource').map(entry => ({
+            name: entry.name,
+            type: entry.initiatorType,
+            transferSize: entry.transferSize,
+            duration: entry.duration,
+        })),
+        now: performance.now(),
+    };
+}
+"""
+
+
+def load_budgets(path=BUDGETS_FILE):
+    """Limites por perfil de rede: {"4g": {"lcp": 3000, ...}, ...}"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def time_to_interactive(start, long_tasks, quiet=TTI_QUIET_WINDOW):
+    """Fim da última long task antes da primeira janela de ``quiet`` ms sem nenhuma"""
+    tti = start
+    for task_start, duration in sorted(long_tasks):
+        if task_start + duration <= tti:
+            continue
+        if task_start - tti >= quiet:
+            break
+        tti = task_start + duration
+    return tti
+
+
+def summarize(raw):
+    """Métricas (ms e bytes) a partir do que foi coletado na página"""
+    navigation = raw["navigation"] or {}
+    start = max(raw["fcp"] or 0, navigation.get("domContentLoadedEventEnd", 0))
+    resources = raw["resources"]
+    transfer = navigation.get("transferSize", 0) + sum(item["transferSize"] for item in resources)
+    return {
+        "ttfb": navigation.get("responseStart"),
+        "dom_content_loaded": navigation.get("domContentLoadedEventEnd"),
+        "load": navigation.get("loadEventEnd"),
+        "fcp": raw["fcp"],
+        "lcp": raw["lcp"],
+        "tti": time_to_interactive(start, raw["longTasks"]),
+        "long_tasks": len(raw["longTasks"]),
+        "requests": len(resources) + 1,
+        "transfer_kb": round(transfer / 1024, 1),
+    }
+
+
+def check_budget(metrics, budget):
+    """Lista de violações legíveis (vazia quando tudo cabe no orçamento)"""
+    violations = []
+    for name, limit in budget.items():
+        value = metrics.get(name)
+        if value is not None and value > limit:
+            violations.append(f"{name} {value:.0f} > {limit}")
+    return violations
+
+
+async def _throttle(context, page, profile):
+    conditions = NETWORK_PROFILES[profile]
+    cdp = await context.new_cdp_session(page)
+    await cdp.send("Network.enable")
+    await cdp.send("Network.emulateNetworkConditions", {
+        "offline": False,
+        "latency": conditions["latency"],
+        "downloadThroughput": conditions["download"],
+        "uploadThroughput": conditions["upload"],
+    })
+
+
+async def _observe(page):
+    """Coleta as métricas quando a janela do TTI fecha (ou o tempo máximo estoura)"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + MAX_OBSERVATION
+    while True:
+        raw = await page.evaluate(_COLLECT)
+        metrics = summarize(raw)
+        waited = raw["now"] - metrics["tti"]
+        if waited >= TTI_QUIET_WINDOW or loop.time() >= deadline:
+            return raw, metrics
+        await asyncio.sleep(min(TTI_QUIET_WINDOW - waited, 1000) / 1000)
+
+
+async def measure(browser, storage_state, page_name, profile):
+    """Carrega uma página com cache vazio e a rede limitada; retorna o registro da medição"""
+    context = await new_context(browser, storage_state=storage_state)
+    try:
+        await context.add_init_script(_OBSERVERS)
+        track_network(context)
+        page = await context.new_page()
+        await _throttle(context, page, profile)
+        url = BASE_URL + PAGES[page_name]
+        await page.goto(url, wait_until="load", timeout=60000)
+        await settle(page, timeout=30000)
+        raw, metrics = await _observe(page)
+    finally:
+        await context.close()
+
+    largest = sorted(raw["resources"], key=lambda item: item["transferSize"], reverse=True)[:5]
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "profile": profile,
+        "page": page_name,
+        "url": url,
+        "metrics": metrics,
+        "largest_resources": [
+            {"name": item["name"], "type": item["type"], "transfer_kb": round(item["transferSize"] / 1024, 1)}
+            for item in largest
+        ],
+    }
+
+
+async def measure_pages(context, pages=tuple(PAGES), profiles=("4g",), budgets=None):
+    """
+    Mede cada página em cada perfil, com a mesma sessão de ``context``
+    mas sempre em um contexto novo. Cada registro recebe o orçamento
+    aplicado e as violações encontradas.
+    """
+    budgets = load_budgets() if budgets is None else budgets
+    storage_state = await context.storage_state()
+    results = []
+    for profile in profiles:
+        for page_name in pages:
+            result = await measure(context.browser, storage_state, page_name, profile)
+            result["budget"] = budgets.get(profile, {})
+            result["violations"] = check_budget(result["metrics"], result["budget"])
+            results.append(result)
+    return results
+
+
+def record_results(results, path=RESULTS_FILE):
+    """Acrescenta as medições ao histórico (uma linha JSON por medição)"""
+    with open(path, 'a', encoding='utf-8') as f:
+        for result in results:
+            f.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+
+def failures(results):
+    return [
+        f"{result['page']} ({result['profile']}): {', '.join(result['violations'])}"
+        for result in results if result["violations"]
+    ]
+
+
+def print_results(results):
+    print(f"   {'página':<12} {'perfil':<6} {'TTFB':>6} {'FCP':>6} {'LCP':>6} {'TTI':>6} {'load':>6} {'KB':>8}")
+    for result in results:
+        metrics = result["metrics"]
+        values = [metrics[name] for name in ("ttfb", "fcp", "lcp", "tti", "load")]
+        cells = " ".join(f"{value:>6.0f}" if value is not None else f"{'-':>6}" for value in values)
+        icon = "❌" if result["violations"] else "✅"
+        print(f"{icon} {result['page']:<12} {result['profile']:<6} {cells} {metrics['transfer_kb']:>8.1f}")
+
+
+def main(argv=None):
+    # Import tardio: auth_state importa browser_pool, que este módulo também usa
+    from auth_state import session_options
+
+    parser = argparse.ArgumentParser(description="Mede o carregamento das páginas principais com a rede limitada")
+    parser.add_argument(
+        "--profile", action="append", choices=sorted(NETWORK_PROFILES),
+        help="perfil de rede (pode repetir; padrão: 4g)",
+    )
+    parser.add_argument(
+        "--page", action="append", choices=sorted(PAGES),
+        help="página medida (pode repetir; padrão: todas)",
+    )
+    parser.add_argument("--budgets", default=BUDGETS_FILE, help="arquivo JSON com os limites por perfil")
+    parser.add_argument("--output", default=RESULTS_FILE, help="histórico JSONL onde as medições são acrescentadas")
+    parser.add_argument("--role", default="user", help="papel cuja sessão é usada (padrão: user)")
+    args = parser.parse_args(argv)
+
+    async def run():
+        async with BrowserPool(size=1) as pool:
+            options = await session_options(pool, args.role)
+            async with pool.context(**options) as context:
+                return await measure_pages(
+                    context, tuple(args.page or PAGES), tuple(args.profile or ["4g"]),
+                    load_budgets(args.budgets),
+                )
+
+    results = asyncio.run(run())
+    record_results(results, args.output)
+    print_results(results)
+    problems = failures(results)
+    for problem in problems:
+        print(f"   ⚠️  {problem}")
+    print(f"\n💾 {len(results)} medição(ões) acrescentada(s) em {args.output}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
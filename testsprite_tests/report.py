@@ -0,0 +1,167 @@
+"""
+Relatório de execução no formato do testsprite-mcp-test-report.md
+
+Junta os resultados de uma execução de ``run_suite.py`` (de um ou de
+vários processos) e escreve o markdown com as mesmas seções do relatório
+do TestSprite: metadados, resumo executivo, resultado por requisito e
+cobertura por requisito.
+"""
+
+import datetime
+import json
+from pathlib import Path
+
+from browser_pool import BASE_URL
+
+TESTS_DIR = Path(__file__).resolve().parent
+PLAN_FILE = TESTS_DIR / "testsprite_frontend_test_plan.json"
+
+# Requisitos do relatório do TestSprite: (nome, descrição, testes)
+REQUIREMENTS = [
+    ("Autenticação e Segurança",
+     "Sistema de login, controle de acesso e gestão de sessões com JWT.",
+     ["TC001", "TC002", "TC013", "TC019"]),
+    ("Gestão de Obras/Projetos",
+     "CRUD completo de obras, medições, faturamento e controle de progresso.",
+     ["TC003", "TC004", "TC005"]),
+    ("Programação e Controle de Atividades",
+     "Calendário drag-and-drop, programação de equipes e equipamentos.",
+     ["TC006", "TC007", "TC008"]),
+    ("Gestão de Recursos",
+     "Maquinários, clientes, colaboradores e documentação.",
+     ["TC009", "TC010", "TC017"]),
+    ("Gestão Financeira",
+     "Contas a pagar, fornecedores, dashboard financeiro.",
+     ["TC011", "TC018"]),
+    ("Dashboard e Relatórios",
+     "KPIs em tempo real, exportação, catálogo de serviços.",
+     ["TC012", "TC015", "TC016"]),
+    ("PWA e Performance",
+     "Modo offline, performance, sincronização.",
+     ["TC014", "TC020"]),
+    ("Validação e UX",
+     "Validação de formulários, notificações, sistema de notas.",
+     ["TC021", "TC022", "TC023"]),
+]
+
+STATUS_LABELS = {
+    "passed": "✅ **Passed**",
+    "failed": "❌ **Failed**",
+    "error": "⚠️ **Error**",
+}
+
+
+def load_plan(path=PLAN_FILE):
+    """Casos do plano de testes por id (TC001 -> {title, priority, ...})"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return {case["id"]: case for case in json.load(f)}
+    except (OSError, ValueError):
+        return {}
+
+
+def _test_id(result):
+    return result.name.split("_", 1)[0]
+
+
+def _percent(count, total):
+    return f"{count / total * 100:.2f}%" if total else "0%"
+
+
+def group_by_requirement(results):
+    """[(nome, descrição, resultados)] na ordem do relatório; testes sem requisito vão para "Outros" """
+    by_id = {_test_id(result): result for result in results}
+    groups = []
+    for name, description, ids in REQUIREMENTS:
+        found = [by_id.pop(test_id) for test_id in ids if test_id in by_id]
+        if found:
+            groups.append((name, description, found))
+    if by_id:
+        groups.append(("Outros", "Testes sem requisito associado.", list(by_id.values())))
+    return groups
+
+
+def _test_section(result, plan):
+    test_id = _test_id(result)
+    case = plan.get(test_id, {})
+    title = case.get("title", result.name.split("_", 1)[-1].replace("_", " "))
+    lines = [
+        f"#### Test {test_id} - {title}",
+        f"- **Test Code:** [{result.name}.py](./{result.name}.py)",
+        f"- **Status:** {STATUS_LABELS[result.status]}",
+    ]
+    if case.get("priority"):
+        lines.append(f"- **Priority:** {case['priority']}")
+    lines.append(f"- **Duration:** {result.duration:.1f}s")
+    if result.error:
+        lines += ["- **Error:**", "```", result.error.strip(), "```"]
+    return lines + ["", "---", ""]
+
+
+def render(results, elapsed, processes=1, plan=None):
+    """Markdown do relatório para ``results`` (lista de ``TestResult``)"""
+    plan = load_plan() if plan is None else plan
+    total = len(results)
+    counts = {status: sum(1 for result in results if result.status == status) for status in STATUS_LABELS}
+    serial = sum(result.duration for result in results)
+
+    lines = [
+        "# 🧪 TestSprite AI Testing Report (MCP)",
+        "## WorldPav - Sistema de Gestão de Pavimentação Asfáltica",
+        "",
+        "---",
+        "",
+        "## 1️⃣ Document Metadata",
+        "- **Project Name:** WorldPav",
+        f"- **Date:** {datetime.date.today().isoformat()}",
+        "- **Prepared by:** run_suite.py",
+        f"- **Test Environment:** {BASE_URL}",
+        f"- **Total Tests Executed:** {total}",
+        f"- **Test Execution Time:** {elapsed:.1f}s ({serial:.1f}s somando os testes, {processes} processo(s))",
+        "",
+        "---",
+        "",
+        "## 2️⃣ Executive Summary",
+        "",
+        "### 📊 Overall Test Results",
+        "| Metric | Value | Percentage |",
+        "|--------|-------|------------|",
+        f"| **Total Tests** | {total} | 100% |",
+        f"| **✅ Passed** | {counts['passed']} | {_percent(counts['passed'], total)} |",
+        f"| **❌ Failed** | {counts['failed']} | {_percent(counts['failed'], total)} |",
+        f"| **⚠️ Error** | {counts['error']} | {_percent(counts['error'], total)} |",
+        "",
+        "---",
+        "",
+        "## 3️⃣ Requirements Validation Summary",
+        "",
+    ]
+
+    groups = group_by_requirement(results)
+    for number, (name, description, group) in enumerate(groups, 1):
+        lines += [f"### Requirement {number}: {name}", f"**Description:** {description}", ""]
+        for result in group:
+            lines += _test_section(result, plan)
+
+    lines += [
+        "## 4️⃣ Coverage & Matching Metrics",
+        "",
+        "| Requirement | Total Tests | ✅ Passed | ❌ Failed | 📊 Coverage |",
+        "|-------------|-------------|-----------|-----------|-------------|",
+    ]
+    for name, _, group in groups:
+        passed = sum(1 for result in group if result.status == "passed")
+        lines.append(
+            f"| **{name}** | {len(group)} | {passed} | {len(group) - passed} | {_percent(passed, len(group))} |"
+        )
+    lines += [
+        f"| **TOTAL** | **{total}** | **{counts['passed']}** | **{total - counts['passed']}** | "
+        f"**{_percent(counts['passed'], total)}** |",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+def write_report(results, elapsed, path, processes=1):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(render(results, elapsed, processes))
@@ -0,0 +1,294 @@
+"""
+Executa os testes TC0xx do testsprite_tests em um único navegador
+
+Todos os testes compartilham um Chromium aquecido (``BrowserPool``) e
+rodam em paralelo, cada um no seu próprio contexto isolado, no mesmo event
+loop::
+
+    python testsprite_tests/run_suite.py               # todos, 4 por vez
+    python testsprite_tests/run_suite.py -j 8          # 8 contextos por vez
+    python testsprite_tests/run_suite.py TC001 TC013   # só alguns testes
+    python testsprite_tests/run_suite.py -p 8          # 8 processos, um navegador cada
+    python testsprite_tests/run_suite.py --fake-backend --latency 800   # sem rede (fake_supabase.py)
+    python testsprite_tests/run_suite.py --network fail --max-requests 30  # N+1 reprova (netlog.py)
+    python testsprite_tests/run_suite.py --trace slow --slow 20  # trace/HAR dos lentos (hotspots.py)
+
+Com ``-p`` os testes são divididos em fatias, uma por processo, e cada
+processo tem seu próprio navegador. As fatias são equilibradas pela
+duração de cada teste nas execuções anteriores (``.durations.json``), de
+modo que o tempo total fique perto da soma dos testes dividida pelos
+processos. Os resultados de todos os processos são juntados em um
+relatório no formato do ``testsprite-mcp-test-report.md`` (``--report``).
+
+Sai com código 1 se algum teste falhar.
+"""
+
+import argparse
+import asyncio
+import heapq
+import importlib.util
+import json
+import os
+import sys
+import time
+import traceback
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from auth_state import session_options
+import hotspots
+from browser_pool import BrowserPool
+from hotspots import NO_TRACING, SLOW_TEST, Capture, Tracing
+from netlog import DEFAULT_POLICY, MAX_REQUESTS, N_PLUS_ONE, NetworkRecorder, Policy
+from report import write_report
+
+TESTS_DIR = Path(__file__).resolve().parent
+DURATIONS_FILE = TESTS_DIR / ".durations.json"
+REPORT_FILE = TESTS_DIR / "testsprite-run-report.md"
+HOTSPOTS_REPORT = "testsprite-hotspots.md"
+
+# Tempo máximo (s) de um teste antes de ser contado como erro
+DEFAULT_TEST_TIMEOUT = 180
+
+# Duração (s) presumida de um teste que ainda não tem histórico
+DEFAULT_DURATION = 30.0
+
+# status: passed, failed (asserção) ou error (exceção/timeout)
+TestResult = namedtuple("TestResult", ["name", "status", "duration", "error"])
+
+STATUS_ICONS = {"passed": "✅", "failed": "❌", "error": "💥"}
+
+
+def discover(selected=()):
+    """Arquivos TC0xx_*.py em ordem; ``selected`` filtra por prefixo (ex.: TC001)"""
+    paths = sorted(TESTS_DIR.glob("TC[0-9][0-9][0-9]_*.py"))
+    if selected:
+        paths = [path for path in paths if path.stem.startswith(tuple(selected))]
+    return paths
+
+
+def load_test(path):
+    """
+    Importa um arquivo de teste e retorna ``(run_test, papel)``; o papel
+    (constante ``ROLE`` do módulo) é None nos testes que fazem o próprio login.
+    """
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.run_test, getattr(module, "ROLE", None)
+
+
+async def run_one(pool, path, timeout=DEFAULT_TEST_TIMEOUT, policy=DEFAULT_POLICY, tracing=NO_TRACING):
+    """
+    Executa um teste em um contexto do pool; nunca propaga a falha. Com
+    ``policy.mode`` "warn" ou "fail", as chamadas ao Supabase são
+    conferidas (netlog.py) depois de um teste que passou; com
+    ``tracing.mode`` diferente de "off", trace e HAR são gravados (hotspots.py).
+    """
+    status, error = "passed", None
+    started = recorder = None
+    capture = Capture(path.stem, tracing) if tracing.mode != "off" else None
+    try:
+        test, role = load_test(path)
+        options = await session_options(pool, role)
+        if capture is not None:
+            options.update(capture.context_options())
+        async with pool.context(**options) as context:
+            if policy.mode != "off":
+                recorder = NetworkRecorder(context)
+            if capture is not None:
+                await capture.start(context)
+            started = time.monotonic()
+            try:
+                await asyncio.wait_for(test(context), timeout)
+            finally:
+                if capture is not None:
+                    await capture.stop(context)
+    except AssertionError as e:
+        status, error = "failed", str(e) or "AssertionError"
+    except asyncio.TimeoutError:
+        status, error = "error", f"excedeu {timeout}s"
+    except Exception as e:
+        status, error = "error", f"{type(e).__name__}: {e}"
+        traceback.print_exc()
+    duration = time.monotonic() - started if started is not None else 0.0
+    if recorder is not None and status == "passed":
+        problems = recorder.problems(policy.max_requests, policy.n_plus_one)
+        if problems and policy.mode == "fail":
+            status, error = "failed", "\n".join(problems)
+        if problems and policy.mode == "warn":
+            lines = [f"⚠️  {path.stem}: {problem}" for problem in problems] + recorder.summary()
+            print("\n".join(lines), flush=True)
+    if capture is not None:
+        capture.finish(status, duration, error)
+    return TestResult(path.stem, status, duration, error)
+
+
+async def run_suite(paths, jobs=4, timeout=DEFAULT_TEST_TIMEOUT, headless=True, policy=DEFAULT_POLICY,
+                    tracing=NO_TRACING):
+    """Executa os testes com até ``jobs`` contextos simultâneos; resultados na ordem de ``paths``"""
+    async with BrowserPool(size=jobs, headless=headless) as pool:
+        tasks = [asyncio.ensure_future(run_one(pool, path, timeout, policy, tracing)) for path in paths]
+        for finished in asyncio.as_completed(tasks):
+            result = await finished
+            print(f"{STATUS_ICONS[result.status]} {result.name} ({result.duration:.1f}s)", flush=True)
+        return [task.result() for task in tasks]
+
+
+def _run_shard(paths, jobs, timeout, headless, policy, tracing):
+    """Executa uma fatia da suíte em um processo separado, com seu próprio navegador"""
+    return asyncio.run(run_suite(paths, jobs, timeout, headless, policy, tracing))
+
+
+def load_durations(path=DURATIONS_FILE):
+    """Duração (s) de cada teste nas execuções anteriores: {nome: segundos}"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_durations(results, path=DURATIONS_FILE):
+    """
+    Atualiza o histórico com a média entre a duração anterior e a desta
+    execução. Testes que estouraram o tempo entram com a duração medida.
+    """
+    durations = load_durations(path)
+    for result in results:
+        previous = durations.get(result.name)
+        durations[result.name] = round(
+            result.duration if previous is None else (previous + result.duration) / 2, 2
+        )
+    temp = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(temp, 'w', encoding='utf-8') as f:
+        json.dump(durations, f, indent=2, sort_keys=True)
+    os.replace(temp, path)
+
+
+def plan_shards(paths, shards, durations):
+    """
+    Divide os testes em até ``shards`` fatias de duração parecida: do mais
+    demorado para o mais rápido, cada teste vai para a fatia mais leve até
+    então. Testes sem histórico contam com a mediana dos conhecidos.
+    """
+    known = sorted(durations[path.stem] for path in paths if path.stem in durations)
+    fallback = known[len(known) // 2] if known else DEFAULT_DURATION
+    weighted = sorted(
+        ((durations.get(path.stem, fallback), path) for path in paths),
+        key=lambda item: item[0], reverse=True,
+    )
+    heap = [(0.0, index, []) for index in range(min(shards, len(paths)))]
+    for duration, path in weighted:
+        load, index, shard = heapq.heappop(heap)
+        shard.append(path)
+        heapq.heappush(heap, (load + duration, index, shard))
+    return [sorted(shard) for _, _, shard in sorted(heap, key=lambda item: item[1])]
+
+
+def run_sharded(paths, processes, jobs=4, timeout=DEFAULT_TEST_TIMEOUT, headless=True, policy=DEFAULT_POLICY,
+                tracing=NO_TRACING):
+    """Executa as fatias em ``processes`` processos; resultados na ordem de ``paths``"""
+    shards = plan_shards(paths, processes, load_durations())
+    with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+        futures = [
+            executor.submit(_run_shard, shard, jobs, timeout, headless, policy, tracing) for shard in shards
+        ]
+        by_name = {result.name: result for future in futures for result in future.result()}
+    return [by_name[path.stem] for path in paths]
+
+
+def print_summary(results, elapsed):
+    passed = sum(1 for result in results if result.status == "passed")
+    print(f"\n📊 {passed}/{len(results)} teste(s) passaram em {elapsed:.1f}s")
+    for result in results:
+        if result.status != "passed":
+            print(f"   {STATUS_ICONS[result.status]} {result.name}: {result.error}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Executa a suíte testsprite_tests em um único navegador")
+    parser.add_argument("tests", nargs="*", help="prefixos dos testes (ex.: TC001); padrão: todos")
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=4, metavar="N",
+        help="contextos do navegador em paralelo (padrão: 4)",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=DEFAULT_TEST_TIMEOUT, metavar="SEGUNDOS",
+        help=f"tempo máximo por teste (padrão: {DEFAULT_TEST_TIMEOUT})",
+    )
+    parser.add_argument(
+        "--processes", "-p", type=int, default=1, metavar="N",
+        help="processos, cada um com seu navegador (0 = um por CPU; padrão: 1)",
+    )
+    parser.add_argument("--headed", action="store_true", help="mostra a janela do navegador")
+    parser.add_argument(
+        "--fake-backend", action="store_true",
+        help="usa o Supabase falso em processo (fake_supabase.py), sem rede",
+    )
+    parser.add_argument(
+        "--latency", type=float, metavar="MS",
+        help="latência injetada em cada resposta do Supabase falso",
+    )
+    parser.add_argument(
+        "--network", choices=("off", "warn", "fail"), default="off",
+        help="confere as chamadas ao Supabase por página: limite e N+1 (padrão: off)",
+    )
+    parser.add_argument(
+        "--max-requests", type=int, default=MAX_REQUESTS, metavar="N",
+        help=f"requisições ao Supabase aceitas por página (padrão: {MAX_REQUESTS})",
+    )
+    parser.add_argument(
+        "--n-plus-one", type=int, default=N_PLUS_ONE, metavar="N",
+        help=f"consultas iguais por valor a partir das quais é N+1 (padrão: {N_PLUS_ONE})",
+    )
+    parser.add_argument(
+        "--trace", choices=("off", "slow", "all"), default="off",
+        help="grava trace e HAR; slow guarda só os testes lentos ou com falha (padrão: off)",
+    )
+    parser.add_argument(
+        "--slow", type=float, default=SLOW_TEST, metavar="SEGUNDOS",
+        help=f"duração a partir da qual um teste é lento para --trace slow (padrão: {SLOW_TEST:.0f})",
+    )
+    parser.add_argument(
+        "--report", default=REPORT_FILE, metavar="ARQUIVO",
+        help=f"relatório markdown da execução (padrão: {REPORT_FILE.name})",
+    )
+    args = parser.parse_args(argv)
+
+    paths = discover(args.tests)
+    if not paths:
+        parser.error("nenhum teste encontrado")
+    processes = min(args.processes or os.cpu_count() or 1, len(paths))
+    # Pelo ambiente, para valer também nos processos das fatias
+    if args.fake_backend:
+        os.environ["TESTSPRITE_FAKE_BACKEND"] = "1"
+    if args.latency is not None:
+        os.environ["TESTSPRITE_FAKE_LATENCY"] = str(args.latency)
+
+    print(f"🧪 {len(paths)} teste(s), {processes} processo(s) com {args.jobs} contexto(s) em paralelo\n")
+    policy = Policy(args.network, args.max_requests, args.n_plus_one)
+    tracing = Tracing(args.trace, args.slow)
+    if tracing.mode != "off":
+        hotspots.clear(path.stem for path in paths)
+    started = time.monotonic()
+    if processes > 1:
+        results = run_sharded(paths, processes, args.jobs, args.timeout, not args.headed, policy, tracing)
+    else:
+        results = asyncio.run(run_suite(paths, args.jobs, args.timeout, not args.headed, policy, tracing))
+    elapsed = time.monotonic() - started
+    print_summary(results, elapsed)
+
+    save_durations(results)
+    write_report(results, elapsed, args.report, processes)
+    print(f"📝 Relatório: {args.report}")
+    if tracing.mode != "off":
+        hotspots_report = Path(args.report).resolve().parent / HOTSPOTS_REPORT
+        kept = hotspots.write_report([path.stem for path in paths], hotspots_report)
+        print(f"🔥 Hot spots de {kept} teste(s): {hotspots_report}")
+    return 0 if all(result.status == "passed" for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+"""
+Soak de navegação: procura vazamentos de memória na SPA
+
+O app fica aberto o dia todo nos tablets das obras. Este modo percorre o
+ciclo Dashboard → obras → programação → relatórios diários centenas de
+vezes na mesma aba, sempre pela navegação da SPA (``history.pushState``,
+sem recarregar: um reload zeraria justamente o que se quer medir), e a
+cada ``--sample-every`` ciclos mede, depois de forçar a coleta de lixo:
+
+- heap JS (CDP ``Runtime.getHeapUsage``; ``performance.memory`` como
+  referência);
+- nós do DOM, listeners e documentos vivos (CDP ``Performance.getMetrics``);
+- canais do Realtime inscritos: os ``phx_join`` menos os ``phx_leave``
+  vistos no WebSocket (ou direto do ``fake_supabase``, no modo offline).
+
+Cada série vira uma reta (mínimos quadrados, sem os ciclos de
+aquecimento); uma inclinação acima do limite por ciclo aponta
+vazamento::
+
+    python testsprite_tests/soak.py                        # 300 ciclos
+    python testsprite_tests/soak.py --cycles 500 --sample-every 25
+    python testsprite_tests/soak.py --fake-backend --snapshots
+
+Sai com código 1 se alguma série crescer além do limite. O resultado vai
+para ``soak-results.json`` (e os heap snapshots, com ``--snapshots``,
+para ``artifacts/soak/``).
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import sys
+from pathlib import Path
+
+import fake_supabase
+from browser_pool import BrowserPool, open_app
+from waits import settle
+
+TESTS_DIR = Path(__file__).resolve().parent
+RESULTS_FILE = TESTS_DIR / "soak-results.json"
+SNAPSHOTS_DIR = TESTS_DIR / "artifacts" / "soak"
+
+# Ciclo de rotas percorrido: nome -> caminho
+ROUTES = [
+    ("dashboard", "/"),
+    ("obras", "/obras"),
+    ("programacao", "/programacao-pavimentacao"),
+    ("relatorios", "/relatorios-diarios"),
+]
+
+# Fração inicial dos ciclos ignorada no ajuste (caches e lazy loading se acomodando)
+WARMUP = 0.1
+
+# Crescimento máximo aceito por ciclo em cada série
+LIMITS = {
+    "heap_bytes": 20 * 1024,
+    "dom_nodes": 5,
+    "listeners": 2,
+    "documents": 0.05,
+    "channels": 0.05,
+}
+
+# Navegação client-side do React Router (BrowserRouter escuta o popstate)
+_NAVIGATE = """
+path => {
+    history.pushState({}, '', path);
+    window.dispatchEvent(new PopStateEvent('popstate', { state: {} }));
+}
+"""
+
+
+class ChannelCounter:
+    """Canais do Realtime inscritos, pelos frames enviados no WebSocket"""
+
+    def __init__(self, page):
+        self.topics = {}
+        page.on("websocket", self._watch)
+
+    def _watch(self, socket):
+        if "/realtime/" in socket.url:
+            socket.on("framesent", self._frame)
+            # Socket fechado derruba todos os canais dele
+            socket.on("close", lambda *args: self.topics.clear())
+
+    def _frame(self, payload):
+        try:
+            data = json.loads(payload)
+        except (TypeError, ValueError):
+            return
+        if isinstance(data, list) and len(data) == 5:
+            topic, event = data[2], data[3]
+        elif isinstance(data, dict):
+            topic, event = data.get("topic"), data.get("event")
+        else:
+            return
+        if event == "phx_join":
+            self.topics[topic] = self.topics.get(topic, 0) + 1
+        elif event == "phx_leave" and self.topics.get(topic):
+            self.topics[topic] -= 1
+
+    def live(self):
+        return sum(self.topics.values())
+
+
+def slope(points):
+    """Inclinação da reta de mínimos quadrados por (x, y)"""
+    if len(points) < 2:
+        return 0.0
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    spread = sum((x - mean_x) ** 2 for x, _ in points)
+    if not spread:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / spread
+
+
+def analyze(samples, cycles, limits=LIMITS, warmup=WARMUP):
+    """Início, fim e crescimento por ciclo de cada série; ``leak`` quando passa do limite"""
+    steady = [sample for sample in samples if sample["cycle"] >= cycles * warmup] or samples
+    series = {}
+    for name, limit in limits.items():
+        points = [(sample["cycle"], sample[name]) for sample in steady if sample.get(name) is not None]
+        if not points:
+            continue
+        growth = slope(points)
+        series[name] = {
+            "start": points[0][1],
+            "end": points[-1][1],
+            "per_cycle": round(growth, 3),
+            "per_100_cycles": round(growth * 100, 1),
+            "limit_per_cycle": limit,
+            "leak": growth > limit,
+        }
+    return series
+
+
+async def _heap_snapshot(session, path):
+    chunks = []
+    session.on("HeapProfiler.addHeapSnapshotChunk", lambda event: chunks.append(event["chunk"]))
+    await session.send("HeapProfiler.takeHeapSnapshot", {"reportProgress": False})
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("".join(chunks))
+
+
+async def sample(page, session, cycle, channels):
+    """Mede a página depois de forçar a coleta de lixo"""
+    await session.send("HeapProfiler.collectGarbage")
+    heap = await session.send("Runtime.getHeapUsage")
+    metrics = {item["name"]: item["value"] for item in (await session.send("Performance.getMetrics"))["metrics"]}
+    memory = await page.evaluate("() => performance.memory ? performance.memory.usedJSHeapSize : null")
+    return {
+        "cycle": cycle,
+        "heap_bytes": heap["usedSize"],
+        "performance_memory": memory,
+        "dom_nodes": metrics.get("Nodes"),
+        "listeners": metrics.get("JSEventListeners"),
+        "documents": metrics.get("Documents"),
+        "channels": channels(),
+    }
+
+
+async def soak(context, cycles=300, sample_every=10, snapshots=False, log=print):
+    """Percorre ``ROUTES`` ``cycles`` vezes e retorna as amostras"""
+    page = await open_app(context, ROUTES[0][1])
+    counter = ChannelCounter(page)
+    backend = fake_supabase.backend_for(context)
+    channels = (lambda: len(backend.live_channels())) if backend is not None else counter.live
+    await settle(page)
+
+    session = await context.new_cdp_session(page)
+    await session.send("Performance.enable")
+    await session.send("HeapProfiler.enable")
+
+    if snapshots:
+        await _heap_snapshot(session, SNAPSHOTS_DIR / "inicio.heapsnapshot")
+    samples = [await sample(page, session, 0, channels)]
+    for cycle in range(1, cycles + 1):
+        for _, path in ROUTES:
+            await page.evaluate(_NAVIGATE, path)
+            await settle(page, after_action=True)
+        if cycle % sample_every == 0 or cycle == cycles:
+            samples.append(await sample(page, session, cycle, channels))
+            last = samples[-1]
+            log(
+                f"   ciclo {cycle:>4}: heap {last['heap_bytes'] / 1024 / 1024:6.1f} MB, "
+                f"{last['dom_nodes']:.0f} nós, {last['listeners']:.0f} listeners, {last['channels']} canal(is)"
+            )
+    if snapshots:
+        await _heap_snapshot(session, SNAPSHOTS_DIR / "fim.heapsnapshot")
+    return samples
+
+
+def print_analysis(series):
+    print(f"\n   {'série':<12} {'início':>14} {'fim':>14} {'por ciclo':>12} {'limite':>10}")
+    for name, item in series.items():
+        icon = "❌" if item["leak"] else "✅"
+        print(
+            f"{icon} {name:<12} {item['start']:>14.0f} {item['end']:>14.0f} "
+            f"{item['per_cycle']:>12.2f} {item['limit_per_cycle']:>10}"
+        )
+
+
+def main(argv=None):
+    # Import tardio: auth_state importa browser_pool, que este módulo também usa
+    from auth_state import session_options
+
+    parser = argparse.ArgumentParser(description="Soak de navegação da SPA em busca de vazamentos de memória")
+    parser.add_argument("--cycles", type=int, default=300, help="ciclos pelas rotas (padrão: 300)")
+    parser.add_argument("--sample-every", type=int, default=10, metavar="N", help="mede a cada N ciclos (padrão: 10)")
+    parser.add_argument("--role", default="user", help="papel cuja sessão é usada (padrão: user)")
+    parser.add_argument("--fake-backend", action="store_true", help="usa o Supabase falso (fake_supabase.py)")
+    parser.add_argument("--snapshots", action="store_true", help="grava heap snapshots no início e no fim")
+    parser.add_argument("--headed", action="store_true", help="mostra a janela do navegador")
+    parser.add_argument("--output", default=RESULTS_FILE, help="arquivo JSON com amostras e análise")
+    args = parser.parse_args(argv)
+
+    if args.fake_backend:
+        os.environ["TESTSPRITE_FAKE_BACKEND"] = "1"
+
+    async def run():
+        async with BrowserPool(size=1, headless=not args.headed) as pool:
+            options = await session_options(pool, args.role)
+            async with pool.context(**options) as context:
+                return await soak(context, args.cycles, args.sample_every, args.snapshots)
+
+    print(f"🔁 {args.cycles} ciclo(s) por {' → '.join(name for name, _ in ROUTES)}\n")
+    samples = asyncio.run(run())
+    series = analyze(samples, args.cycles)
+    print_analysis(series)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "cycles": args.cycles,
+            "routes": [path for _, path in ROUTES],
+            "series": series,
+            "samples": samples,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Resultado: {args.output}")
+    return 1 if any(item["leak"] for item in series.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
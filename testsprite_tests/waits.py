@@ -0,0 +1,137 @@
+"""
+Esperas por eventos para os testes TC0xx, no lugar de pausas fixas
+
+Antes cada interação vinha depois de ``page.wait_for_timeout(3000)`` e
+cada teste terminava com ``asyncio.sleep(5)``: um login de seis passos
+gastava uns 23 s só dormindo. Estes helpers esperam o sinal real de que a
+página está pronta:
+
+- ``fill``/``click``: o locator visível e habilitado (a espera de
+  "actionability" do próprio Playwright);
+- ``settle``: a rede do contexto ociosa, sem requisições em andamento por
+  um pequeno intervalo (o ``networkidle`` do Playwright só vale para
+  navegações, não para as chamadas ao Supabase de uma SPA);
+- ``submit_login``: a resposta do Supabase Auth (``/auth/v1/token``).
+
+Nenhuma espera de rede falha o teste: se a rede não sossegar no tempo
+máximo, o teste segue e as asserções decidem.
+"""
+
+import asyncio
+import weakref
+
+# Intervalo (ms) sem requisições para considerar a rede ociosa
+QUIET_MS = 500
+
+# Tempo máximo (ms) esperando a rede ficar ociosa
+SETTLE_TIMEOUT = 10000
+
+# Tempo máximo (ms) esperando a resposta do Supabase Auth
+AUTH_TIMEOUT = 15000
+
+# Intervalo (s) entre as verificações de ociosidade
+_POLL = 0.05
+
+_trackers = weakref.WeakKeyDictionary()
+
+
+class NetworkTracker:
+    """Requisições em andamento em um ``BrowserContext`` (todas as páginas)"""
+
+    def __init__(self, context):
+        self.in_flight = set()
+        self.last_activity = asyncio.get_running_loop().time()
+        context.on("request", self._started)
+        context.on("requestfinished", self._finished)
+        context.on("requestfailed", self._finished)
+
+    def touch(self):
+        """
+        Marca atividade agora. Chamado logo depois de uma ação, para que as
+        requisições que ela dispara (e que o Playwright só informa um pouco
+        depois) caiam dentro do intervalo de espera.
+        """
+        self.last_activity = asyncio.get_running_loop().time()
+
+    def _started(self, request):
+        self.in_flight.add(request)
+        self.touch()
+
+    def _finished(self, request):
+        self.in_flight.discard(request)
+        self.touch()
+
+    async def wait_idle(self, quiet=QUIET_MS, timeout=SETTLE_TIMEOUT):
+        """Espera ``quiet`` ms sem requisições; retorna False se estourar ``timeout``"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout / 1000
+        while True:
+            now = loop.time()
+            if not self.in_flight and now - self.last_activity >= quiet / 1000:
+                return True
+            if now >= deadline:
+                return False
+            await asyncio.sleep(_POLL)
+
+
+def track_network(context):
+    """Começa (uma vez só) a acompanhar as requisições do contexto"""
+    tracker = _trackers.get(context)
+    if tracker is None:
+        tracker = _trackers[context] = NetworkTracker(context)
+    return tracker
+
+
+async def settle(page, quiet=QUIET_MS, timeout=SETTLE_TIMEOUT, after_action=False):
+    """
+    Espera a rede do contexto da página ficar ociosa. Com ``after_action``,
+    o intervalo sem requisições só começa a contar agora.
+    """
+    tracker = track_network(page.context)
+    if after_action:
+        tracker.touch()
+    return await tracker.wait_idle(quiet, timeout)
+
+
+async def fill(locator, value, timeout=None):
+    """Preenche o campo assim que ele estiver visível, habilitado e editável"""
+    await locator.fill(value, timeout=timeout)
+
+
+async def click(locator, timeout=None):
+    """Clica assim que o elemento puder receber o clique e espera a rede sossegar"""
+    await locator.click(timeout=timeout)
+    await settle(locator.page, after_action=True)
+
+
+def _is_auth_response(response):
+    return "/auth/v1/token" in response.url
+
+
+async def submit_login(locator, timeout=AUTH_TIMEOUT):
+    """
+    Clica no botão de login e espera a resposta do Supabase Auth. Se o
+    formulário barrar o envio (campos vazios, e-mail inválido), nenhuma
+    requisição sai e a espera termina quando a rede fica ociosa.
+    """
+    page = locator.page
+    auth = asyncio.ensure_future(
+        page.wait_for_event("response", predicate=_is_auth_response, timeout=timeout)
+    )
+    try:
+        await locator.click()
+        idle = asyncio.ensure_future(settle(page, timeout=timeout, after_action=True))
+        await asyncio.wait({auth, idle}, return_when=asyncio.FIRST_COMPLETED)
+        idle.cancel()
+        await asyncio.gather(idle, return_exceptions=True)
+    finally:
+        auth.cancel()
+        await asyncio.gather(auth, return_exceptions=True)
+    # Depois do login o app busca perfil e dados da tela inicial
+    await settle(page)
+
+
+async def goto(page, url, timeout=10000):
+    """Navega e espera o DOM e a rede da nova página"""
+    await page.goto(url, wait_until="domcontentloaded", timeout=timeout)
+    await settle(page, after_action=True)